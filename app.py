@@ -1,18 +1,31 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file, g, Response, stream_with_context
 import os
 from werkzeug.utils import secure_filename
 import sys
+import time
+import json
 
 # Add current directory to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
 from config import Config
-from app.database import create_connection, execute_query, fetch_query
+from app.database import create_connection, execute_query, execute_transaction, fetch_query
+from app.red_flag_detector import RedFlagDetector, RedFlagRules, JOB_INDEPENDENT_FLAGS
+from app.scoring import ScoringConfig, DEFAULT_WEIGHTS, DEFAULT_TIER_THRESHOLDS, COMPONENT_COLUMNS
+from app.agent_telemetry import telemetry
+from app.profiling import profiles, profile_requested
+from app.metrics import (registry, RESUMES_PROCESSED, RESUME_FAILURES,
+                         HTTP_REQUESTS, HTTP_LATENCY, HTTP_IN_FLIGHT)
 
 # Import multi-agent orchestrator
 from app.agents.orchestrator import RankingOrchestratorAgent
 from app.agents.rag_agent import RAGAgent
+from app.candidate_snapshot import CandidateSnapshot
+from app.question_cache import QuestionCache
+from app.candidate_skills import save_candidate_skills, backfill_candidate_skills, candidate_role_matches
+from app.database_config import clear_cache
+from app.resume_text import resume_text_statement, load_resume_texts
 
 # Initialize Flask with correct template folder
 app = Flask(__name__, template_folder='app/templates', static_folder='app/static')
@@ -21,14 +34,23 @@ app.config.from_object(Config)
 # Initialize multi-agent orchestrator
 orchestrator = RankingOrchestratorAgent()
 rag_agent = RAGAgent()
+candidate_snapshot = CandidateSnapshot()
+question_cache = QuestionCache()
 print("✅ Multi-Agent System Initialized")
 print("✅ RAG Agent Initialized")
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
 
-def _generate_candidate_profile(skills, experience_years):
-    """Generate a profile summary indicating what roles the candidate would be good for"""
+def _generate_candidate_profile(skills, experience_years, role_matches=None):
+    """
+    Generate a profile summary indicating what roles the candidate would be good for
+    
+    role_matches ({role: matching skills}, from candidate_role_matches) skips matching
+    the skills list against every role profile.
+    """
+    if role_matches is not None:
+        return _profile_summary(role_matches, experience_years)
     skills = [s.strip() for s in skills if s.strip()]
     
     # Try to load role profiles from database, fall back to hardcoded if empty
@@ -59,7 +81,10 @@ def _generate_candidate_profile(skills, experience_years):
         matches = sum(1 for skill in skills if any(req.lower() in skill.lower() for req in required_skills))
         if matches > 0:
             role_matches[role] = matches
-    
+    return _profile_summary(role_matches, experience_years)
+
+def _profile_summary(role_matches, experience_years):
+    """Profile line from {role: matching skills}"""
     # Sort by match count
     sorted_roles = sorted(role_matches.items(), key=lambda x: x[1], reverse=True)
     
@@ -81,6 +106,307 @@ def _generate_candidate_profile(skills, experience_years):
         exp_level = "Senior" if experience_years >= 5 else "Mid-level" if experience_years >= 2 else "Entry-level"
         return f"{exp_level} Professional with {experience_years} years experience"
 
+def _save_analysis_result(conn, candidate_id, job_id, agent_result):
+    """
+    Insert or refresh the analysis row for a candidate/job pair in one statement.
+    
+    Relies on the uq_candidate_job unique key (migrations/001_query_indexes.sql), so
+    repeated or concurrent matches of the same pair update the existing row instead of
+    creating duplicates. semantic_pruned marks analyses whose semantic stage cascade
+    scoring skipped (their semantic score of 0 is not a real score).
+    """
+    scores = agent_result['scores']
+    cascade = agent_result.get('metadata', {}).get('cascade') or {}
+    return execute_query(conn,
+        """INSERT INTO analysis_results (candidate_id, job_description_id, match_score,
+           skill_match_score, experience_match_score, keyword_match_score,
+           semantic_similarity_score, semantic_pruned, tier, red_flags, explanation)
+           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+           ON DUPLICATE KEY UPDATE
+               match_score = VALUES(match_score),
+               skill_match_score = VALUES(skill_match_score),
+               experience_match_score = VALUES(experience_match_score),
+               keyword_match_score = VALUES(keyword_match_score),
+               semantic_similarity_score = VALUES(semantic_similarity_score),
+               semantic_pruned = VALUES(semantic_pruned),
+               tier = VALUES(tier),
+               red_flags = VALUES(red_flags),
+               explanation = VALUES(explanation),
+               analyzed_at = NOW()""",
+        (candidate_id, job_id,
+         scores['overall_score'],
+         scores['skill_match_score'],
+         scores['experience_match_score'],
+         scores['keyword_match_score'],
+         scores['semantic_similarity_score'],
+         bool(cascade.get('pruned')),
+         agent_result['tier'],
+         str(agent_result.get('red_flags', [])),
+         agent_result['explanation'])
+    )
+
+def _save_resume_data(conn, candidate_id, candidate_data):
+    """
+    Store the parsed resume fields, the employment timeline (JSON) and the raw text
+    (resume_text) that later re-matches reuse instead of parsing the file again, and the
+    candidate's canonical skill ids (candidate_skills).
+    
+    The resume_data and resume_text rows are written in one transaction: a snapshot
+    refresh in between would index the resume without its text and, its updated_at
+    already indexed, never re-index it.
+    """
+    timeline = candidate_data.get('employment_timeline')
+    committed = execute_transaction(conn, [(
+        """INSERT INTO resume_data (candidate_id, skills, experience_years, education,
+           projects, certifications, job_titles, employment_timeline)
+           VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+        (candidate_id,
+         candidate_data['skills'],  # Already a comma-separated string from parser
+         candidate_data['experience_years'],
+         candidate_data['education'],
+         candidate_data.get('projects', ''),
+         candidate_data.get('certifications', ''),
+         candidate_data.get('job_titles', ''),
+         json.dumps(timeline) if timeline is not None else None)
+    ), resume_text_statement(candidate_data.get('raw_text', ''))])
+    if not committed:
+        return None
+    resume_id = fetch_query(conn, "SELECT LAST_INSERT_ID() AS id")[0]['id']
+    save_candidate_skills(conn, candidate_id, candidate_data['skills'])
+    return resume_id
+
+def _load_resume_data(conn, candidate):
+    """
+    Parsed resume of a saved candidate for the orchestrator, or None when it was saved
+    without raw text or timeline (older rows) and the file has to be parsed again
+    """
+    return _load_resume_data_many(conn, [candidate])[candidate['id']]
+
+def _load_resume_data_many(conn, candidates):
+    """
+    _load_resume_data for many candidates in two queries (resume fields, then the texts
+    of the resumes that have a timeline): {candidate id: resume_data or None}
+    """
+    loaded = {candidate['id']: None for candidate in candidates}
+    if not candidates:
+        return loaded
+    placeholders = ", ".join(["%s"] * len(loaded))
+    rows = fetch_query(conn,
+        f"""SELECT id, candidate_id, skills, experience_years, education, projects, certifications,
+                   job_titles, employment_timeline
+            FROM resume_data WHERE candidate_id IN ({placeholders})""",
+        tuple(loaded))
+    rows = [row for row in rows if row.get('employment_timeline')]
+    texts = load_resume_texts(conn, [row['id'] for row in rows])
+    by_id = {candidate['id']: candidate for candidate in candidates}
+    for row in rows:
+        raw_text = texts.get(row.pop('id'))
+        if not raw_text:
+            continue
+        candidate = by_id[row.pop('candidate_id')]
+        loaded[candidate['id']] = {
+            **row,
+            'raw_text': raw_text,
+            'name': candidate['name'],
+            'email': candidate.get('email'),
+            'phone': candidate.get('phone'),
+            'employment_timeline': json.loads(row['employment_timeline'])
+        }
+    return loaded
+
+def _reflag_candidates(conn, rules):
+    """
+    Re-evaluate the red flags of every stored candidate from resume_data alone.
+    
+    Candidates are grouped by the job of their most recent analysis and each group is
+    one vectorized batch; candidates never matched to a job (bulk uploads) get the
+    job-independent flags only. The old flags are replaced in one transaction, so a
+    failed insert leaves them in place. Returns (candidates, flags written), with None
+    flags when the transaction was rolled back.
+    """
+    rows = fetch_query(conn, """
+        SELECT rd.id, rd.candidate_id, rd.skills, rd.experience_years, rd.job_titles,
+               COALESCE(rt.text_length, 0) AS text_length, rd.employment_timeline,
+               latest.job_description_id
+        FROM resume_data rd
+        LEFT JOIN resume_text rt ON rt.resume_id = rd.id
+        LEFT JOIN (
+            SELECT candidate_id, job_description_id,
+                   ROW_NUMBER() OVER (PARTITION BY candidate_id ORDER BY analyzed_at DESC, id DESC) AS recency
+            FROM analysis_results
+        ) latest ON latest.candidate_id = rd.candidate_id AND latest.recency = 1
+    """)
+    jobs = {job['id']: job['description']
+            for job in fetch_query(conn, "SELECT id, description FROM job_descriptions")}
+    
+    # The text is only needed to build the timeline of resumes stored without one
+    texts = load_resume_texts(conn, [row['id'] for row in rows if row['employment_timeline'] is None])
+    for row in rows:
+        row['raw_text'] = texts.get(row.pop('id')) if row['employment_timeline'] is None else None
+    
+    by_job = {}
+    for row in rows:
+        by_job.setdefault(row['job_description_id'], []).append(row)
+    
+    detector = RedFlagDetector(rules)
+    flag_rows = []
+    for job_id, group in by_job.items():
+        for row, flags in zip(group, detector.detect_batch(group, jobs.get(job_id))):
+            flag_rows.extend((row['candidate_id'], flag['type'], flag['description'], flag['severity'])
+                             for flag in flags)
+    
+    committed = execute_transaction(conn, [
+        ("DELETE rf FROM red_flags rf JOIN resume_data rd ON rd.candidate_id = rf.candidate_id", None),
+        ("INSERT INTO red_flags (candidate_id, flag_type, description, severity) VALUES (%s, %s, %s, %s)",
+         flag_rows),
+    ])
+    return len(rows), len(flag_rows) if committed else None
+
+# Per-job scoring columns of job_descriptions (NULL = default weights / cutoffs)
+JOB_SCORING_COLUMNS = """weight_semantic, weight_keyword, weight_skill, weight_experience,
+                         top_tier_threshold, medium_tier_threshold"""
+
+def _scoring_from_form(form):
+    """
+    ScoringConfig from the optional create-job fields (weights in percent); None when
+    all are blank so the job keeps the defaults. Raises ValueError on invalid input.
+    """
+    weights = {name: form.get(f'weight_{name}', '').strip() for name in DEFAULT_WEIGHTS}
+    thresholds = {name: form.get(f'{name}_tier_threshold', '').strip() for name in DEFAULT_TIER_THRESHOLDS}
+    if not any(weights.values()) and not any(thresholds.values()):
+        return None
+    if any(weights.values()) and not all(weights.values()):
+        raise ValueError("Set all four weights or none")
+    return ScoringConfig({name: float(value) / 100 for name, value in weights.items() if value},
+                         {name: float(value) for name, value in thresholds.items() if value})
+
+def _save_job_scoring(conn, job_id, scoring):
+    """Store a job's weights and tier cutoffs (None resets the job to the defaults)"""
+    weights = scoring.weights if scoring else {}
+    thresholds = scoring.tier_thresholds if scoring else {}
+    return execute_query(conn,
+        """UPDATE job_descriptions
+           SET weight_semantic = %s, weight_keyword = %s, weight_skill = %s, weight_experience = %s,
+               top_tier_threshold = %s, medium_tier_threshold = %s
+           WHERE id = %s""",
+        (weights.get('semantic'), weights.get('keyword'), weights.get('skill'),
+         weights.get('experience'), thresholds.get('top'), thresholds.get('medium'), job_id)
+    )
+
+def _rematch_pruned(conn, job_id, scoring):
+    """
+    Re-run the full pipeline for the analyses of a job whose semantic stage cascade
+    scoring skipped, so they get a real semantic score under the job's current weights
+    and cutoffs. Candidates whose resume is neither stored nor on disk stay pruned.
+    Returns the number of re-matched analyses.
+    """
+    job = fetch_query(conn, "SELECT description, required_experience FROM job_descriptions WHERE id = %s",
+                      (job_id,))
+    candidates = fetch_query(conn, """
+        SELECT c.id, c.name, c.email, c.phone, c.resume_path
+        FROM analysis_results ar
+        JOIN candidates c ON c.id = ar.candidate_id
+        WHERE ar.job_description_id = %s AND ar.semantic_pruned = 1
+    """, (job_id,))
+    if not job or not candidates:
+        return 0
+    
+    stored = _load_resume_data_many(conn, candidates)
+    batch, runnable = [], []
+    for candidate in candidates:
+        if stored[candidate['id']] is not None:
+            batch.append({"resume_data": stored[candidate['id']]})
+        elif candidate.get('resume_path') and os.path.exists(candidate['resume_path']):
+            batch.append({"file_path": candidate['resume_path']})
+        else:
+            continue
+        runnable.append(candidate)
+    
+    rematched = 0
+    for index, agent_result in orchestrator.execute_batch(batch, job[0]['description'],
+                                                          int(job[0].get('required_experience') or 0),
+                                                          scoring, Config.MATCH_BATCH_SIZE):
+        if agent_result.get("success"):
+            db_write_start = time.time()
+            _save_analysis_result(conn, runnable[index]['id'], job_id, agent_result)
+            telemetry.record_run(agent_result, runnable[index]['id'], job_id,
+                                 db_write_time=time.time() - db_write_start)
+            rematched += 1
+    return rematched
+
+def _rescore_job(conn, job_id, scoring):
+    """
+    Recompute match_score, tier and the explanation's headline for every stored
+    analysis of a job from its component scores, in one set-based UPDATE.
+    
+    Single-table UPDATE assigns left to right, so tier and explanation already see the
+    new match_score. Nothing is parsed or embedded: analyses pruned by cascade scoring
+    are left out (their semantic score of 0 is a placeholder) and keep their score until
+    re-matched through POST /api/jobs/<id>/rematch_pruned.
+    Returns (tier distribution after the re-score, analyses still pruned).
+    """
+    weights = scoring.weights
+    score_expr = " + ".join(f"{COMPONENT_COLUMNS[name]} * %s" for name in weights)
+    execute_query(conn,
+        f"""UPDATE analysis_results
+            SET match_score = ROUND({score_expr}, 2),
+                tier = CASE WHEN match_score >= %s THEN 'Top Tier'
+                            WHEN match_score >= %s THEN 'Medium Tier'
+                            ELSE 'Low Tier' END,
+                explanation = CASE
+                    WHEN explanation LIKE 'This candidate is rated as %%' THEN
+                        CONCAT('This candidate is rated as ', tier, ' with an overall score of ',
+                               FORMAT(match_score, 1), '%%.',
+                               SUBSTRING(explanation, LOCATE('%%.', explanation) + 2))
+                    ELSE explanation END
+            WHERE job_description_id = %s AND semantic_pruned = 0""",
+        (*weights.values(), scoring.tier_thresholds['top'], scoring.tier_thresholds['medium'], job_id)
+    )
+    tiers = fetch_query(conn,
+        """SELECT tier, COUNT(*) as count, SUM(semantic_pruned) as pruned
+           FROM analysis_results WHERE job_description_id = %s GROUP BY tier""",
+        (job_id,))
+    return ({row['tier']: row['count'] for row in tiers},
+            sum(int(row['pruned'] or 0) for row in tiers))
+
+def _run_orchestrator(input_data, route, label=""):
+    """Run the orchestrator, under cProfile when the request asks for it"""
+    if profile_requested(request):
+        return profiles.profile_run(orchestrator, input_data, route, label)
+    return orchestrator.execute(input_data)
+
+def _failure_reason(agent_result):
+    """Low-cardinality failure label: the stage that failed, or invalid_input"""
+    errors = agent_result.get('errors') or []
+    return errors[0]['agent'] if errors else 'invalid_input'
+
+def _route_label():
+    """Route pattern (not the concrete URL) so ids don't create new series"""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+@app.before_request
+def _start_request_metrics():
+    g.request_start = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+
+@app.after_request
+def _record_request_metrics(response):
+    if 'request_start' in g:
+        route = _route_label()
+        HTTP_LATENCY.observe(time.perf_counter() - g.request_start, route=route, method=request.method)
+        HTTP_REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+    return response
+
+@app.teardown_request
+def _finish_request_metrics(exc):
+    if 'request_start' in g:
+        HTTP_IN_FLIGHT.dec()
+
+@app.route('/metrics')
+def metrics():
+    """Process metrics in the Prometheus text exposition format"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/')
 def index():
     """Home page / Dashboard"""
@@ -133,10 +459,12 @@ def index():
     
     # Generate profiles for bulk candidates
     if bulk_candidates:
+        role_matches = candidate_role_matches(conn, [candidate['id'] for candidate in bulk_candidates])
         for candidate in bulk_candidates:
             candidate['profile'] = _generate_candidate_profile(
-                candidate.get('skills', ''),
-                candidate.get('experience_years', 0)
+                (candidate.get('skills') or '').split(','),
+                candidate.get('experience_years', 0),
+                role_matches.get(candidate['id'])
             )
             # Get skill count
             skills = candidate.get('skills', '')
@@ -156,6 +484,12 @@ def create_job():
             flash('Please provide both job title and description', 'error')
             return redirect(url_for('create_job'))
         
+        try:
+            scoring = _scoring_from_form(request.form)
+        except ValueError as e:
+            flash(f'Invalid scoring settings: {e}', 'error')
+            return redirect(url_for('create_job'))
+        
         conn = create_connection()
         if not conn:
             flash('Database connection error', 'error')
@@ -165,6 +499,8 @@ def create_job():
             "INSERT INTO job_descriptions (title, description) VALUES (%s, %s)",
             (job_title, job_description)
         )
+        if scoring and jd_id:
+            _save_job_scoring(conn, jd_id, scoring)
         
         conn.close()
         flash(f'Job description "{job_title}" created successfully!', 'success')
@@ -223,6 +559,7 @@ def bulk_upload():
                         print(f"   Skill Assessment Score: {scores['skill_match_score']}%")
                         
                         # Save candidate
+                        db_write_start = time.time()
                         candidate_id = execute_query(conn,
                             "INSERT INTO candidates (name, email, phone, resume_path) VALUES (%s, %s, %s, %s)",
                             (candidate_data['name'], candidate_data.get('email'), 
@@ -230,33 +567,21 @@ def bulk_upload():
                         )
                         
                         # Save resume data with comprehensive analysis
-                        execute_query(conn,
-                            """INSERT INTO resume_data (candidate_id, skills, experience_years, education, 
-                               projects, certifications, job_titles, raw_text) 
-                               VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
-                            (candidate_id, 
-                             candidate_data['skills'],
-                             candidate_data['experience_years'],
-                             candidate_data['education'], 
-                             candidate_data.get('projects', ''),  # projects
-                             candidate_data.get('certifications', ''),  # certifications
-                             candidate_data.get('job_titles', ''),  # job_titles
-                             candidate_data.get('raw_text', ''))  # raw_text
-                        )
+                        _save_resume_data(conn, candidate_id, candidate_data)
                         
                         # Filter red flags - only save job-independent flags for bulk upload
                         # Exclude: "Irrelevant Experience", "Missing Skills", "Minimal Experience"
-                        job_independent_flag_types = ['Job Hopping', 'Career Gap', 'Frequent Job Changes', 
-                                                      'Employment Gap', 'Short Tenure']
-                        
                         for flag in agent_result.get('red_flags', []):
                             # Only save flags that don't require job description context
-                            if any(flag_type.lower() in flag['type'].lower() for flag_type in job_independent_flag_types):
+                            if flag['type'] in JOB_INDEPENDENT_FLAGS:
                                 execute_query(conn,
                                     "INSERT INTO red_flags (candidate_id, flag_type, description, severity) VALUES (%s, %s, %s, %s)",
                                     (candidate_id, flag['type'], flag['description'], flag['severity'])
                                 )
                         
+                        telemetry.record_run(agent_result, candidate_id,
+                                             db_write_time=time.time() - db_write_start)
+                        
                         # Generate candidate profile summary based on skills
                         skills_list = candidate_data['skills'].split(',') if isinstance(candidate_data['skills'], str) else candidate_data['skills']
                         profile_summary = _generate_candidate_profile(skills_list, candidate_data['experience_years'])
@@ -265,16 +590,21 @@ def bulk_upload():
                         print(f"✅ Successfully processed: {candidate_data['name']}")
                         
                         processed_count += 1
+                        RESUMES_PROCESSED.inc(route='bulk_upload')
                     else:
                         failed_count += 1
+                        RESUME_FAILURES.inc(route='bulk_upload', reason=_failure_reason(agent_result))
                         error_msg = agent_result.get('error', 'Unknown error')
                         print(f"❌ Agent processing failed: {filename} - {error_msg}")
                         
                 except Exception as e:
                     failed_count += 1
+                    RESUME_FAILURES.inc(route='bulk_upload', reason='exception')
                     print(f"❌ Error processing {filename}: {str(e)}")
                     import traceback
                     traceback.print_exc()
+            elif file and file.filename:
+                RESUME_FAILURES.inc(route='bulk_upload', reason='unsupported_file')
         
         conn.close()
         flash(f'Successfully processed {processed_count} resumes. Failed: {failed_count}', 'success' if failed_count == 0 else 'error')
@@ -304,17 +634,21 @@ def upload():
             return redirect(url_for('upload'))
         
         # Get the job description text
-        job_data = fetch_query(conn, "SELECT description FROM job_descriptions WHERE id = %s", (jd_id,))
+        job_data = fetch_query(conn, f"SELECT description, {JOB_SCORING_COLUMNS} FROM job_descriptions WHERE id = %s", (jd_id,))
         if not job_data:
             flash('Job description not found', 'error')
             conn.close()
             return redirect(url_for('upload'))
         
         job_description = job_data[0]['description']
+        scoring = ScoringConfig.from_job(job_data[0])
         
         # Process uploaded resumes
         files = request.files.getlist('resumes')
         processed_count = 0
+        pruned_count = 0
+        time_saved = 0.0
+        profiled_runs = []
         
         for file in files:
             if file and allowed_file(file.filename):
@@ -324,17 +658,27 @@ def upload():
                 
                 # ===== MULTI-AGENT WORKFLOW =====
                 # Execute orchestrator with all agents
-                agent_result = orchestrator.execute({
+                agent_result = _run_orchestrator({
                     "file_path": filepath,
                     "job_description": job_description,
-                    "required_experience": 0  # Can extract from JD in future
-                })
+                    "required_experience": 0,  # Can extract from JD in future
+                    "scoring": scoring,
+                    "cascade": Config.CASCADE_SCORING
+                }, 'upload', filename)
+                if agent_result.get('profile_run_id'):
+                    profiled_runs.append(agent_result['profile_run_id'])
                 
                 if agent_result.get("success"):
                     candidate_data = agent_result['candidate_data']
                     scores = agent_result['scores']
                     
+                    cascade_info = agent_result.get('metadata', {}).get('cascade')
+                    if cascade_info and cascade_info['pruned']:
+                        pruned_count += 1
+                        time_saved += cascade_info['estimated_time_saved']
+                    
                     # Save candidate
+                    db_write_start = time.time()
                     candidate_id = execute_query(conn,
                         "INSERT INTO candidates (name, email, phone, resume_path) VALUES (%s, %s, %s, %s)",
                         (candidate_data['name'], candidate_data['email'], 
@@ -342,36 +686,10 @@ def upload():
                     )
                     
                     # Save resume data
-                    execute_query(conn,
-                        """INSERT INTO resume_data (candidate_id, skills, experience_years, education, 
-                           projects, certifications, job_titles, raw_text) 
-                           VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
-                        (candidate_id, 
-                         candidate_data['skills'],  # Already a comma-separated string from parser
-                         candidate_data['experience_years'],
-                         candidate_data['education'], 
-                         candidate_data.get('projects', ''),  # projects
-                         candidate_data.get('certifications', ''),  # certifications
-                         candidate_data.get('job_titles', ''),  # job_titles
-                         candidate_data.get('raw_text', ''))  # raw_text (stored in state but not needed here)
-                    )
+                    _save_resume_data(conn, candidate_id, candidate_data)
                     
                     # Save analysis results
-                    execute_query(conn,
-                        """INSERT INTO analysis_results (candidate_id, job_description_id, match_score,
-                           skill_match_score, experience_match_score, keyword_match_score, 
-                           semantic_similarity_score, tier, red_flags, explanation)
-                           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-                        (candidate_id, jd_id, 
-                         scores['overall_score'],
-                         scores['skill_match_score'], 
-                         scores['experience_match_score'],
-                         scores['keyword_match_score'], 
-                         scores['semantic_similarity_score'],
-                         agent_result['tier'], 
-                         str(agent_result['red_flags']), 
-                         agent_result['explanation'])
-                    )
+                    _save_analysis_result(conn, candidate_id, jd_id, agent_result)
                     
                     # Save individual red flags
                     for flag in agent_result['red_flags']:
@@ -380,11 +698,25 @@ def upload():
                             (candidate_id, flag['type'], flag['description'], flag['severity'])
                         )
                     
+                    telemetry.record_run(agent_result, candidate_id, jd_id,
+                                         db_write_time=time.time() - db_write_start)
+                    
                     processed_count += 1
+                    RESUMES_PROCESSED.inc(route='upload')
                     print(f"✅ Multi-Agent processed: {candidate_data['name']} - Score: {scores['overall_score']:.2f}%")
+                else:
+                    RESUME_FAILURES.inc(route='upload', reason=_failure_reason(agent_result))
+            elif file and file.filename:
+                RESUME_FAILURES.inc(route='upload', reason='unsupported_file')
         
         conn.close()
-        flash(f'Successfully processed {processed_count} resume(s)', 'success')
+        message = f'Successfully processed {processed_count} resume(s)'
+        if pruned_count:
+            message += (f' ({pruned_count} below the {scoring.tier_thresholds["medium"]:.0f}% cutoff skipped '
+                        f'AI semantic matching, ~{time_saved:.1f}s saved)')
+        if profiled_runs:
+            message += f'. Profiled {len(profiled_runs)} run(s) - see Admin > Profiles'
+        flash(message, 'success')
         return redirect(url_for('candidates', job_id=jd_id))
     
     conn.close()
@@ -416,6 +748,8 @@ def bulk_analysis():
     """
     candidates_list = fetch_query(conn, query)
     
+    role_matches = candidate_role_matches(conn, [candidate['id'] for candidate in candidates_list])
+    
     # Enhance each candidate with profile analysis and detailed red flags
     for candidate in candidates_list:
         # Fetch detailed red flags for each candidate
@@ -434,7 +768,8 @@ def bulk_analysis():
         if candidate.get('skills'):
             skills_list = [s.strip() for s in candidate['skills'].split(',') if s.strip()]
             candidate['skills_list'] = skills_list
-            candidate['profile'] = _generate_candidate_profile(skills_list, candidate.get('experience_years', 0))
+            candidate['profile'] = _generate_candidate_profile(skills_list, candidate.get('experience_years', 0),
+                                                               role_matches.get(candidate['id']))
             candidate['skills_count'] = len(skills_list)
         else:
             candidate['skills_list'] = []
@@ -653,27 +988,105 @@ def download_resume(candidate_id):
 @app.route('/agent_monitoring')
 def agent_monitoring():
     """Multi-Agent System Monitoring Dashboard"""
+    hours = request.args.get('hours', 24, type=int)
+    empty = dict(executions=[], stage_stats=[], throughput=[], slowest=[], hours=hours)
+    
     conn = create_connection()
     if not conn:
         flash('Database connection error', 'error')
-        return render_template('agent_monitoring.html', executions=[])
+        return render_template('agent_monitoring.html', **empty)
+    
+    # Make the latest runs visible before aggregating
+    telemetry.flush()
     
-    # Get recent candidate analyses with timing information
+    # Recent analyses with the end-to-end time of their latest run
     executions = fetch_query(conn, """
         SELECT 
             c.id as candidate_id,
             c.name as candidate_name,
             ar.analyzed_at as timestamp,
             ar.match_score as score,
-            0.5 as execution_time
+            (SELECT ae.duration_ms / 1000
+             FROM agent_executions ae
+             WHERE ae.candidate_id = ar.candidate_id
+               AND ae.job_description_id = ar.job_description_id
+               AND ae.stage = 'Workflow'
+             ORDER BY ae.executed_at DESC
+             LIMIT 1) as execution_time
         FROM candidates c
         JOIN analysis_results ar ON c.id = ar.candidate_id
         ORDER BY ar.analyzed_at DESC
         LIMIT 20
     """)
     
+    # p50/p95/p99 per stage (nearest rank via CUME_DIST over each stage's durations)
+    stage_stats = fetch_query(conn, """
+        SELECT 
+            stage,
+            COUNT(*) as executions,
+            MIN(CASE WHEN pct >= 0.50 THEN duration_ms END) as p50,
+            MIN(CASE WHEN pct >= 0.95 THEN duration_ms END) as p95,
+            MIN(CASE WHEN pct >= 0.99 THEN duration_ms END) as p99,
+            AVG(queue_wait_ms) as avg_queue_wait
+        FROM (
+            SELECT stage, duration_ms, queue_wait_ms,
+                   CUME_DIST() OVER (PARTITION BY stage ORDER BY duration_ms) as pct
+            FROM agent_executions
+            WHERE executed_at >= NOW() - INTERVAL %s HOUR
+        ) ranked
+        GROUP BY stage
+        ORDER BY p95 DESC
+    """, (hours,))
+    
+    # Runs per hour with a 3-hour moving average
+    throughput = fetch_query(conn, """
+        SELECT 
+            bucket,
+            runs,
+            avg_ms,
+            AVG(runs) OVER (ORDER BY bucket ROWS BETWEEN 2 PRECEDING AND CURRENT ROW) as moving_avg
+        FROM (
+            SELECT TIMESTAMP(DATE(executed_at), MAKETIME(HOUR(executed_at), 0, 0)) as bucket,
+                   COUNT(*) as runs,
+                   AVG(duration_ms) as avg_ms
+            FROM agent_executions
+            WHERE stage = 'Workflow' AND executed_at >= NOW() - INTERVAL %s HOUR
+            GROUP BY bucket
+        ) hourly
+        ORDER BY bucket
+    """, (hours,))
+    
+    # Slowest resumes and the stage that dominated each run
+    slowest = fetch_query(conn, """
+        SELECT 
+            w.run_id,
+            c.id as candidate_id,
+            c.name as candidate_name,
+            w.duration_ms,
+            w.executed_at,
+            s.stage as slowest_stage,
+            s.duration_ms as slowest_stage_ms
+        FROM (
+            SELECT run_id, candidate_id, duration_ms, executed_at,
+                   RANK() OVER (ORDER BY duration_ms DESC) as slow_rank
+            FROM agent_executions
+            WHERE stage = 'Workflow' AND executed_at >= NOW() - INTERVAL %s HOUR
+        ) w
+        JOIN candidates c ON c.id = w.candidate_id
+        LEFT JOIN (
+            SELECT run_id, stage, duration_ms,
+                   ROW_NUMBER() OVER (PARTITION BY run_id ORDER BY duration_ms DESC) as stage_rank
+            FROM agent_executions
+            WHERE stage NOT IN ('Workflow', 'DatabaseWrite')
+              AND executed_at >= NOW() - INTERVAL %s HOUR
+        ) s ON s.run_id = w.run_id AND s.stage_rank = 1
+        WHERE w.slow_rank <= 10
+        ORDER BY w.duration_ms DESC
+    """, (hours, hours))
+    
     conn.close()
-    return render_template('agent_monitoring.html', executions=executions)
+    return render_template('agent_monitoring.html', executions=executions, stage_stats=stage_stats,
+                           throughput=throughput, slowest=slowest, hours=hours)
 
 @app.route('/api/agent_logs/<int:candidate_id>')
 def api_agent_logs(candidate_id):
@@ -794,53 +1207,28 @@ def rag_query():
         if not conn:
             return jsonify({"error": "Database connection error"}), 500
         
-        # Get candidates based on job_id (or all if not specified)
-        if job_id and job_id.strip():
-            candidates_query = """
-                SELECT 
-                    c.id,
-                    c.name,
-                    c.email,
-                    rd.skills,
-                    CONCAT(rd.experience_years, ' years') as experience,
-                    rd.raw_text as summary,
-                    COALESCE(ar.match_score, 0) as match_score,
-                    COALESCE(ar.skill_match_score, 0) as skill_match_score,
-                    COALESCE(ar.experience_match_score, 0) as experience_match_score
-                FROM candidates c
-                LEFT JOIN resume_data rd ON c.id = rd.candidate_id
-                LEFT JOIN analysis_results ar ON c.id = ar.candidate_id AND ar.job_description_id = %s
-                WHERE rd.id IS NOT NULL
-                ORDER BY ar.match_score DESC
-            """
-            candidates = fetch_query(conn, candidates_query, (job_id,))
-        else:
-
-            candidates_query = """
-                SELECT 
-                    c.id,
-                    c.name,
-                    c.email,
-                    rd.skills,
-                    CONCAT(rd.experience_years, ' years') as experience,
-                    rd.raw_text as summary,
-                    COALESCE(MAX(ar.match_score), 0) as match_score,
-                    COALESCE(MAX(ar.skill_match_score), 0) as skill_match_score,
-                    COALESCE(MAX(ar.experience_match_score), 0) as experience_match_score
-                FROM candidates c
-                LEFT JOIN resume_data rd ON c.id = rd.candidate_id
-                LEFT JOIN analysis_results ar ON c.id = ar.candidate_id
-                WHERE rd.id IS NOT NULL
-                GROUP BY c.id, c.name, c.email, rd.skills, rd.experience_years, rd.raw_text
-                ORDER BY match_score DESC
-            """
-            candidates = fetch_query(conn, candidates_query)
+        # Candidates from the in-process snapshot (refreshed incrementally), with the
+        # scores of the selected job or each candidate's best score
+        job_id = int(job_id) if job_id and str(job_id).strip() else None
+        snapshot = candidate_snapshot.refresh(conn)
+        
+        # Repeated question on unchanged candidate data: answer from the cache
+        cached = question_cache.get(question, job_id, snapshot.version)
+        if cached is not None:
+            conn.close()
+            print(f"RAG Query: cached answer (snapshot v{snapshot.version}, "
+                  f"hit ratio {question_cache.stats()['hit_ratio']:.0%}) for question: {question}")
+            return jsonify(cached), 200
         
-        print(f"RAG Query: Found {len(candidates)} candidates for question: {question}")
+        # Route the question first so hard constraints (minimum years, required and
+        # excluded skills) select the candidates before their dicts are built and scored
+        plan = rag_agent.plan_query(question, snapshot)
+        candidates = snapshot.candidate_dicts(job_id, **plan['filters'])
+        print(f"RAG Query: {len(candidates)} of {snapshot.size} candidates (snapshot v{snapshot.version}) for question: {question}")
         
         # Get job context if specified
         job_context = None
-        if job_id and job_id.strip():
+        if job_id:
             job_result = fetch_query(conn, 
                 "SELECT title, description FROM job_descriptions WHERE id = %s", 
                 (job_id,)
@@ -850,14 +1238,9 @@ def rag_query():
         
         conn.close()
         
-        # Debug: Print candidate data
-        if candidates:
-            print(f"First candidate sample: {candidates[0]}")
-        else:
-            print("No candidates returned from database query")
-        
         # Process query with RAG agent
-        result = rag_agent.query(question, candidates, job_context)
+        result = rag_agent.query(question, candidates, job_context, plan)
+        question_cache.put(question, job_id, snapshot.version, result)
         
         return jsonify(result), 200
         
@@ -882,7 +1265,7 @@ def match_candidate():
         
         # Get job description
         job_result = fetch_query(conn, 
-            "SELECT title, description, required_skills, required_experience FROM job_descriptions WHERE id = %s", 
+            f"SELECT title, description, required_skills, required_experience, {JOB_SCORING_COLUMNS} FROM job_descriptions WHERE id = %s", 
             (job_id,)
         )
         if not job_result:
@@ -893,7 +1276,7 @@ def match_candidate():
         
         # Get candidate resume data including file path
         candidate_result = fetch_query(conn,
-            "SELECT c.id, c.name, c.resume_path FROM candidates c WHERE c.id = %s",
+            "SELECT c.id, c.name, c.email, c.phone, c.resume_path FROM candidates c WHERE c.id = %s",
             (candidate_id,)
         )
         if not candidate_result:
@@ -902,16 +1285,12 @@ def match_candidate():
         
         candidate = candidate_result[0]
         
-        if not candidate.get('resume_path') or not os.path.exists(candidate['resume_path']):
+        # Reuse the stored parse (text + employment timeline); older rows re-parse the file
+        resume_data = _load_resume_data(conn, candidate)
+        if resume_data is None and (not candidate.get('resume_path') or not os.path.exists(candidate['resume_path'])):
             conn.close()
             return jsonify({"success": False, "error": "Resume file not found"}), 404
         
-        # Check if analysis already exists
-        existing = fetch_query(conn,
-            "SELECT id FROM analysis_results WHERE candidate_id = %s AND job_description_id = %s",
-            (candidate_id, job_id)
-        )
-        
         # Run orchestrator analysis
         print(f"🎯 Matching candidate {candidate['name']} with job {job['title']}")
         
@@ -920,61 +1299,32 @@ def match_candidate():
         if required_exp is None:
             required_exp = 0
         
-        agent_result = orchestrator.execute({
-            "file_path": candidate['resume_path'],
+        match_input = {
             "job_description": job['description'],
-            "required_experience": int(required_exp)
-        })
+            "required_experience": int(required_exp),
+            "scoring": ScoringConfig.from_job(job)
+        }
+        if resume_data is not None:
+            match_input["resume_data"] = resume_data
+        else:
+            match_input["file_path"] = candidate['resume_path']
+        agent_result = _run_orchestrator(match_input, 'match_candidate',
+                                         f"{candidate['name']} / {job['title']}")
         
         if not agent_result.get("success"):
+            RESUME_FAILURES.inc(route='match_candidate', reason=_failure_reason(agent_result))
             conn.close()
             return jsonify({"success": False, "error": "Analysis failed"}), 500
         
         result = agent_result['scores']
         tier = agent_result['tier']
-        explanation = agent_result['explanation']
         
-        # Store or update analysis results
-        if existing:
-            # Update existing analysis
-            update_query = """
-                UPDATE analysis_results 
-                SET match_score = %s, skill_match_score = %s, experience_match_score = %s,
-                    keyword_match_score = %s, semantic_similarity_score = %s, tier = %s,
-                    explanation = %s, analyzed_at = NOW()
-                WHERE candidate_id = %s AND job_description_id = %s
-            """
-            execute_query(conn, update_query, (
-                result['overall_score'],
-                result['skill_match_score'],
-                result['experience_match_score'],
-                result['keyword_match_score'],
-                result['semantic_similarity_score'],
-                tier,
-                explanation,
-                candidate_id,
-                job_id
-            ))
-        else:
-            # Insert new analysis
-            insert_query = """
-                INSERT INTO analysis_results 
-                (candidate_id, job_description_id, match_score, skill_match_score, 
-                experience_match_score, keyword_match_score, semantic_similarity_score, 
-                tier, explanation)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            execute_query(conn, insert_query, (
-                candidate_id,
-                job_id,
-                result['overall_score'],
-                result['skill_match_score'],
-                result['experience_match_score'],
-                result['keyword_match_score'],
-                result['semantic_similarity_score'],
-                tier,
-                explanation
-            ))
+        # Store or update analysis results (single upsert on the candidate/job unique key)
+        db_write_start = time.time()
+        _save_analysis_result(conn, candidate_id, job_id, agent_result)
+        telemetry.record_run(agent_result, candidate_id, job_id,
+                             db_write_time=time.time() - db_write_start)
+        RESUMES_PROCESSED.inc(route='match_candidate')
         
         conn.close()
         
@@ -983,7 +1333,8 @@ def match_candidate():
             "match_score": round(result['overall_score'], 1),
             "tier": tier,
             "candidate_name": candidate['name'],
-            "job_title": job['title']
+            "job_title": job['title'],
+            "profile_run_id": agent_result.get('profile_run_id')
         }), 200
         
     except Exception as e:
@@ -992,6 +1343,121 @@ def match_candidate():
         traceback.print_exc()
         return jsonify({"success": False, "error": str(e)}), 500
 
+def _sse(event, data):
+    """One Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/match_candidates/batch', methods=['POST'])
+def match_candidates_batch():
+    """
+    Match many saved candidates with one job description, streaming progress.
+
+    Body: {"candidate_ids": [...], "job_id": ...}. The response is a text/event-stream
+    with one "result" event per candidate (in completion order, with completed/total
+    counts) and a final "done" event. Candidates go through the orchestrator's batched
+    path on a single database connection, reusing their stored parse.
+    """
+    data = request.get_json(silent=True) or {}
+    candidate_ids = data.get('candidate_ids')
+    job_id = data.get('job_id')
+
+    if not job_id or not isinstance(candidate_ids, list) or not candidate_ids:
+        return jsonify({"success": False, "error": "Missing candidate_ids or job_id"}), 400
+    try:
+        candidate_ids = list(dict.fromkeys(int(cid) for cid in candidate_ids))
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "candidate_ids must be integers"}), 400
+
+    conn = create_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "Database connection error"}), 500
+
+    job_result = fetch_query(conn,
+        f"SELECT title, description, required_skills, required_experience, {JOB_SCORING_COLUMNS} FROM job_descriptions WHERE id = %s",
+        (job_id,)
+    )
+    if not job_result:
+        conn.close()
+        return jsonify({"success": False, "error": "Job description not found"}), 404
+    job = job_result[0]
+    try:
+        scoring = ScoringConfig.from_job(job)
+    except ValueError as e:
+        conn.close()
+        return jsonify({"success": False, "error": f"Invalid scoring configuration: {e}"}), 500
+
+    placeholders = ", ".join(["%s"] * len(candidate_ids))
+    candidates = fetch_query(conn,
+        f"SELECT id, name, email, phone, resume_path FROM candidates WHERE id IN ({placeholders})",
+        tuple(candidate_ids)
+    )
+    found = {candidate['id']: candidate for candidate in candidates}
+
+    def generate():
+        total = len(candidate_ids)
+        completed = matched = 0
+        start = time.time()
+        try:
+            yield _sse('start', {"total": total, "job_title": job['title']})
+
+            # Stored parse where available; older rows re-parse the file
+            stored = _load_resume_data_many(conn, candidates)
+            batch, runnable = [], []
+            for candidate_id in candidate_ids:
+                candidate = found.get(candidate_id)
+                error = None
+                if candidate is None:
+                    error = "Candidate not found"
+                elif stored[candidate_id] is not None:
+                    batch.append({"resume_data": stored[candidate_id]})
+                elif candidate.get('resume_path') and os.path.exists(candidate['resume_path']):
+                    batch.append({"file_path": candidate['resume_path']})
+                else:
+                    error = "Resume file not found"
+                if error:
+                    completed += 1
+                    yield _sse('result', {"candidate_id": candidate_id, "success": False, "error": error,
+                                          "completed": completed, "total": total})
+                else:
+                    runnable.append(candidate)
+
+            print(f"🎯 Batch matching {len(runnable)} candidate(s) with job {job['title']}")
+            required_exp = int(job.get('required_experience') or 0)
+            for index, agent_result in orchestrator.execute_batch(batch, job['description'], required_exp,
+                                                                  scoring, Config.MATCH_BATCH_SIZE):
+                candidate = runnable[index]
+                completed += 1
+                event = {"candidate_id": candidate['id'], "candidate_name": candidate['name'],
+                         "completed": completed, "total": total}
+
+                if not agent_result.get("success"):
+                    RESUME_FAILURES.inc(route='match_candidates_batch', reason=_failure_reason(agent_result))
+                    yield _sse('result', {**event, "success": False, "error": "Analysis failed"})
+                    continue
+
+                db_write_start = time.time()
+                _save_analysis_result(conn, candidate['id'], job_id, agent_result)
+                telemetry.record_run(agent_result, candidate['id'], job_id,
+                                     db_write_time=time.time() - db_write_start)
+                RESUMES_PROCESSED.inc(route='match_candidates_batch')
+                matched += 1
+                yield _sse('result', {**event, "success": True,
+                                      "match_score": round(agent_result['scores']['overall_score'], 1),
+                                      "tier": agent_result['tier']})
+
+            yield _sse('done', {"total": total, "matched": matched, "failed": total - matched,
+                                "elapsed": round(time.time() - start, 2)})
+        except Exception as e:
+            print(f"Batch Match Error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            yield _sse('error', {"error": str(e), "completed": completed, "total": total})
+        finally:
+            conn.close()
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 # ============================================================
 # ADMIN CONFIGURATION ROUTES
 # ============================================================
@@ -1001,6 +1467,170 @@ def admin_config():
     """Admin page for managing skills, variations, and role profiles"""
     return render_template('admin_config.html')
 
+@app.route('/api/jobs/<int:job_id>/scoring', methods=['GET'])
+def get_job_scoring(job_id):
+    """Weights and tier thresholds used for a job"""
+    conn = create_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "Database connection error"}), 500
+    job = fetch_query(conn, f"SELECT id, {JOB_SCORING_COLUMNS} FROM job_descriptions WHERE id = %s", (job_id,))
+    conn.close()
+    if not job:
+        return jsonify({"success": False, "error": "Job description not found"}), 404
+    return jsonify({"success": True, **ScoringConfig.from_job(job[0]).to_dict()})
+
+@app.route('/api/jobs/<int:job_id>/scoring', methods=['PUT'])
+def update_job_scoring(job_id):
+    """
+    Set a job's weights / tier thresholds (fractions summing to 1, cutoffs 0-100;
+    {"reset": true} restores the defaults) and re-score its stored analyses
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "Expected a JSON object"}), 400
+    try:
+        scoring = None if data.get('reset') else ScoringConfig(data.get('weights'), data.get('tier_thresholds'))
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    conn = create_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "Database connection error"}), 500
+    if not fetch_query(conn, "SELECT id FROM job_descriptions WHERE id = %s", (job_id,)):
+        conn.close()
+        return jsonify({"success": False, "error": "Job description not found"}), 404
+    
+    start = time.time()
+    _save_job_scoring(conn, job_id, scoring)
+    scoring = scoring or ScoringConfig()
+    tiers, pruned = _rescore_job(conn, job_id, scoring)
+    conn.close()
+    
+    return jsonify({
+        "success": True,
+        **scoring.to_dict(),
+        "tiers": tiers,
+        "rescored": sum(tiers.values()) - pruned,
+        "pruned": pruned,
+        "execution_time": round(time.time() - start, 3)
+    })
+
+@app.route('/api/jobs/<int:job_id>/rescore', methods=['POST'])
+def rescore_job(job_id):
+    """Re-apply a job's current weights and tier thresholds to its stored analyses"""
+    conn = create_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "Database connection error"}), 500
+    job = fetch_query(conn, f"SELECT id, {JOB_SCORING_COLUMNS} FROM job_descriptions WHERE id = %s", (job_id,))
+    if not job:
+        conn.close()
+        return jsonify({"success": False, "error": "Job description not found"}), 404
+    
+    start = time.time()
+    tiers, pruned = _rescore_job(conn, job_id, ScoringConfig.from_job(job[0]))
+    conn.close()
+    
+    return jsonify({
+        "success": True,
+        "tiers": tiers,
+        "rescored": sum(tiers.values()) - pruned,
+        "pruned": pruned,
+        "execution_time": round(time.time() - start, 3)
+    })
+
+@app.route('/api/jobs/<int:job_id>/rematch_pruned', methods=['POST'])
+def rematch_pruned(job_id):
+    """
+    Run the full pipeline (embeddings included) for the job's analyses that cascade
+    scoring pruned, which re-scoring leaves untouched
+    """
+    conn = create_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "Database connection error"}), 500
+    job = fetch_query(conn, f"SELECT id, {JOB_SCORING_COLUMNS} FROM job_descriptions WHERE id = %s", (job_id,))
+    if not job:
+        conn.close()
+        return jsonify({"success": False, "error": "Job description not found"}), 404
+    
+    start = time.time()
+    rematched = _rematch_pruned(conn, job_id, ScoringConfig.from_job(job[0]))
+    conn.close()
+    
+    return jsonify({
+        "success": True,
+        "rematched": rematched,
+        "execution_time": round(time.time() - start, 3)
+    })
+
+@app.route('/api/admin/reflag', methods=['POST'])
+def reflag_candidates():
+    """Re-flag all stored candidates with the configured (or posted) rule thresholds"""
+    data = request.get_json(silent=True) or {}
+    try:
+        rules = RedFlagRules(**data.get('rules', {}))
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    conn = create_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "Database connection error"}), 500
+    
+    start = time.time()
+    candidate_count, flag_count = _reflag_candidates(conn, rules)
+    conn.close()
+    if flag_count is None:
+        return jsonify({"success": False, "error": "Failed to store red flags; previous flags kept"}), 500
+    
+    return jsonify({
+        "success": True,
+        "candidates": candidate_count,
+        "red_flags": flag_count,
+        "rules": rules.to_dict(),
+        "execution_time": round(time.time() - start, 3)
+    })
+
+@app.route('/api/admin/candidate_skills/backfill', methods=['POST'])
+def backfill_skills():
+    """Rebuild candidate_skills from stored resumes with the current skills and variations"""
+    conn = create_connection()
+    if not conn:
+        return jsonify({"success": False, "error": "Database connection error"}), 500
+    
+    start = time.time()
+    clear_cache()
+    resume_count, row_count = backfill_candidate_skills(conn)
+    conn.close()
+    
+    return jsonify({
+        "success": True,
+        "resumes": resume_count,
+        "candidate_skills": row_count,
+        "execution_time": round(time.time() - start, 3)
+    })
+
+# Profiling
+@app.route('/admin/profiles')
+@app.route('/admin/profiles/<run_id>')
+def admin_profiles(run_id=None):
+    """Profiled orchestrator runs and the top functions of the selected run"""
+    stored = profiles.list()
+    if run_id is None and stored:
+        run_id = stored[0]['run_id']
+    selected = profiles.get(run_id) if run_id else None
+    if run_id and selected is None:
+        flash(f'Profile {run_id} not found (only the last {Config.PROFILE_STORE_SIZE} are kept)', 'error')
+    return render_template('admin_profiles.html', profiles=stored, selected=selected)
+
+@app.route('/admin/profiles/<run_id>/download')
+def download_profile(run_id):
+    """Raw cProfile stats for pstats / snakeviz"""
+    selected = profiles.get(run_id)
+    if not selected or not selected['prof_file'] or not os.path.exists(selected['prof_file']):
+        flash('Profile file not found', 'error')
+        return redirect(url_for('admin_profiles'))
+    return send_file(os.path.abspath(selected['prof_file']), as_attachment=True,
+                     download_name=f"{run_id}.prof")
+
 # Skill Categories Management APIs
 @app.route('/api/admin/categories', methods=['GET'])
 def get_categories():
@@ -1096,16 +1726,22 @@ def delete_category(category_id):
 # Skills Management APIs
 @app.route('/api/admin/skills', methods=['GET'])
 def get_skills():
-    """Get all skills with their variations"""
+    """Get all skills with their variations and the number of candidates having each"""
     conn = create_connection()
     
     query = """
         SELECT s.id, s.skill_name, sc.category_name as category, s.description, s.is_active,
-               GROUP_CONCAT(sv.variation_name SEPARATOR ', ') as variations
+               GROUP_CONCAT(sv.variation_name SEPARATOR ', ') as variations,
+               COALESCE(cs.candidate_count, 0) as candidate_count
         FROM skills s
         JOIN skill_categories sc ON s.category_id = sc.id
         LEFT JOIN skill_variations sv ON s.id = sv.skill_id AND sv.is_active = 1
-        GROUP BY s.id, s.skill_name, sc.category_name, s.description, s.is_active
+        LEFT JOIN (
+            SELECT skill_id, COUNT(*) AS candidate_count
+            FROM candidate_skills
+            GROUP BY skill_id
+        ) cs ON cs.skill_id = s.id
+        GROUP BY s.id, s.skill_name, sc.category_name, s.description, s.is_active, cs.candidate_count
         ORDER BY sc.display_order, s.skill_name
     """
     
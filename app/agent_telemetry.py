@@ -0,0 +1,116 @@
+"""
+Agent execution telemetry
+
+Turns the stage timings of an orchestrator result into agent_executions rows and
+writes them in batches (one executemany per flush) instead of one INSERT per stage.
+A batch the database rejects (e.g. a candidate deleted before the flush breaks the
+foreign key) is retried row by row, so only the offending rows are dropped.
+"""
+
+from datetime import datetime
+import atexit
+import threading
+import time
+
+from app.database import create_connection, execute_many
+from config import Config
+
+# Pseudo stages recorded next to the pipeline stages of a run
+WORKFLOW_STAGE = "Workflow"
+DB_WRITE_STAGE = "DatabaseWrite"
+
+INSERT_QUERY = """
+    INSERT INTO agent_executions (run_id, candidate_id, job_description_id, pipeline, stage,
+                                  duration_ms, queue_wait_ms, start_offset_ms, executed_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def _ms(seconds):
+    return round((seconds or 0.0) * 1000, 2)
+
+
+class AgentTelemetry:
+    """Buffers agent_executions rows and flushes them in batched inserts"""
+
+    def __init__(self, batch_size=50, flush_interval=30):
+        """
+        Args:
+            batch_size: Flush once this many rows are buffered
+            flush_interval: Flush buffered rows at least every N seconds (checked on record)
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._last_flush = time.time()
+
+    def record_run(self, agent_result, candidate_id, job_id=None, db_write_time=0.0):
+        """
+        Buffer the timings of one successful orchestrator run
+
+        Args:
+            agent_result: RankingOrchestratorAgent.execute() result
+            candidate_id: Candidate the run was saved for
+            job_id: Job description id (None for job-independent bulk uploads)
+            db_write_time: Seconds spent saving the run's results
+        """
+        metadata = agent_result.get("metadata", {})
+        run_id = agent_result.get("run_id")
+        pipeline = metadata.get("pipeline", "full")
+        total_time = agent_result.get("total_execution_time", 0.0)
+        executed_at = datetime.now()
+
+        rows = [
+            (run_id, candidate_id, job_id, pipeline, stage,
+             _ms(timing["duration"]), _ms(timing["queue_wait"]), _ms(timing["start"]), executed_at)
+            for stage, timing in metadata.get("stage_timings", {}).items()
+        ]
+        rows.append((run_id, candidate_id, job_id, pipeline, WORKFLOW_STAGE,
+                     _ms(total_time), 0.0, 0.0, executed_at))
+        rows.append((run_id, candidate_id, job_id, pipeline, DB_WRITE_STAGE,
+                     _ms(db_write_time), 0.0, _ms(total_time), executed_at))
+
+        with self._lock:
+            self._buffer.extend(rows)
+            due = (len(self._buffer) >= self.batch_size or
+                   time.time() - self._last_flush >= self.flush_interval)
+
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows in one batch; returns the number of rows written"""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self._last_flush = time.time()
+
+        if not rows:
+            return 0
+
+        conn = create_connection()
+        if not conn:
+            self._requeue(rows)
+            return 0
+
+        try:
+            if execute_many(conn, INSERT_QUERY, rows) is not None:
+                return len(rows)
+            # Telemetry must never break an upload - keep the rows that insert, drop the rest
+            conn.rollback()
+            written = sum(1 for row in rows if execute_many(conn, INSERT_QUERY, [row]) is not None)
+            print(f"Agent telemetry: dropped {len(rows) - written} of {len(rows)} rows")
+            return written
+        finally:
+            conn.close()
+
+    def _requeue(self, rows):
+        """Keep rows for the next flush while the database is unreachable (bounded)"""
+        with self._lock:
+            room = self.batch_size * 10 - len(self._buffer)
+            if room > 0:
+                self._buffer[:0] = rows[-room:]
+
+
+telemetry = AgentTelemetry(Config.TELEMETRY_BATCH_SIZE, Config.TELEMETRY_FLUSH_INTERVAL)
+atexit.register(telemetry.flush)
@@ -4,27 +4,104 @@ Base Agent Class for Multi-Agent System
 All agents inherit from this base class to ensure consistent interface
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
+import contextvars
+import logging
+import threading
+import uuid
 import time
+import sys
+import os
+
+# Add project root to path to import config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import Config
+from app.metrics import AGENT_EXECUTIONS, AGENT_DURATION
+
+# Agent log levels -> logging levels ("success" is an INFO-level completion message)
+LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "success": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR
+}
+
+# Correlation id of the orchestrator run the current thread is working on
+_current_run_id = contextvars.ContextVar("agent_run_id", default=None)
+
+
+def _configure_agent_logger() -> logging.Logger:
+    """Configure the shared 'agents' logger once (level from AGENT_LOG_LEVEL, OFF disables)"""
+    logger = logging.getLogger("agents")
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+        level = Config.AGENT_LOG_LEVEL.upper()
+        logger.setLevel(logging.CRITICAL + 1 if level == "OFF" else getattr(logging, level, logging.INFO))
+    return logger
+
+
+_configure_agent_logger()
+
+
+def new_run_id() -> str:
+    """Generate a correlation id for one orchestrator run"""
+    return uuid.uuid4().hex[:16]
+
+
+def current_run_id() -> Optional[str]:
+    """Correlation id of the run active in this context (None outside a run)"""
+    return _current_run_id.get()
+
+
+@contextmanager
+def agent_run(run_id: str):
+    """Tag every agent log entry emitted inside the block with run_id"""
+    token = _current_run_id.set(run_id)
+    try:
+        yield run_id
+    finally:
+        _current_run_id.reset(token)
+
 
 class BaseAgent:
     """Base class for all agents in the system"""
     
     def __init__(self, name: str):
         self.name = name
-        self.execution_logs = []
+        self.logger = logging.getLogger(f"agents.{name}")
+        # Bounded ring buffer - agents are long-lived singletons, so old entries are dropped
+        self.execution_logs = deque(maxlen=Config.AGENT_LOG_BUFFER_SIZE)
+        self._log_lock = threading.Lock()
+        
+    def log_enabled(self, level: str = "info") -> bool:
+        """Check if a level is printed - guard expensive messages with this (a skipped
+        message is not buffered either)"""
+        return self.logger.isEnabledFor(LOG_LEVELS.get(level, logging.INFO))
         
     def log(self, message: str, level: str = "info"):
-        """Log agent activity"""
+        """
+        Log agent activity: always kept in the ring buffer (agent_execution_log,
+        /api/agent_logs); AGENT_LOG_LEVEL only filters the console output
+        """
+        levelno = LOG_LEVELS.get(level, logging.INFO)
         log_entry = {
             "agent": self.name,
+            "run_id": _current_run_id.get(),
             "timestamp": datetime.now().isoformat(),
             "level": level,
             "message": message
         }
-        self.execution_logs.append(log_entry)
-        print(f"[{self.name}] {level.upper()}: {message}")
+        with self._log_lock:
+            self.execution_logs.append(log_entry)
+        if self.logger.isEnabledFor(levelno):
+            self.logger.log(levelno, "[%s] %s: %s", self.name, level.upper(), message)
         
     def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -38,13 +115,18 @@ class BaseAgent:
         """
         raise NotImplementedError("Subclasses must implement execute()")
     
-    def get_logs(self) -> List[Dict[str, Any]]:
-        """Return execution logs"""
-        return self.execution_logs
+    def get_logs(self, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return buffered execution logs, optionally only those of one run"""
+        with self._log_lock:
+            entries = list(self.execution_logs)
+        if run_id is None:
+            return entries
+        return [entry for entry in entries if entry["run_id"] == run_id]
     
     def clear_logs(self):
         """Clear execution logs"""
-        self.execution_logs = []
+        with self._log_lock:
+            self.execution_logs.clear()
         
     def timed_execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Execute with timing information"""
@@ -59,13 +141,47 @@ class BaseAgent:
             result['metadata']['execution_time'] = round(execution_time, 3)
             result['metadata']['agent_name'] = self.name
             
+            AGENT_DURATION.observe(execution_time, agent=self.name)
+            AGENT_EXECUTIONS.inc(agent=self.name,
+                                 status="success" if result.get("success", True) else "failure")
+            
             self.log(f"Completed in {execution_time:.3f}s", "success")
             return result
             
         except Exception as e:
             execution_time = time.time() - start_time
+            AGENT_EXECUTIONS.inc(agent=self.name, status="error")
             self.log(f"Failed after {execution_time:.3f}s: {str(e)}", "error")
             raise
+    
+    def timed_execute_batch(self, method, *args) -> List[Dict[str, Any]]:
+        """
+        timed_execute() for a batched method returning one result per item: every
+        result counts as one execution, observed with its share of the call's duration
+        """
+        start_time = time.time()
+        self.log(f"Starting batched execution")
+        
+        try:
+            results = method(*args)
+        except Exception as e:
+            execution_time = time.time() - start_time
+            AGENT_EXECUTIONS.inc(agent=self.name, status="error")
+            self.log(f"Batch failed after {execution_time:.3f}s: {str(e)}", "error")
+            raise
+        
+        execution_time = time.time() - start_time
+        share = execution_time / len(results) if results else 0.0
+        for result in results:
+            result['metadata'] = result.get('metadata', {})
+            result['metadata']['execution_time'] = round(share, 3)
+            result['metadata']['agent_name'] = self.name
+            AGENT_DURATION.observe(share, agent=self.name)
+            AGENT_EXECUTIONS.inc(agent=self.name,
+                                 status="success" if result.get("success", True) else "failure")
+        
+        self.log(f"Completed {len(results)} items in {execution_time:.3f}s", "success")
+        return results
 
 
 class AgentState:
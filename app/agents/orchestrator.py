@@ -4,34 +4,51 @@ Ranking Orchestrator Agent
 Coordinates all agents in the multi-agent workflow and produces final candidate ranking
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterator, Tuple
 import sys
 import os
 import time
+import threading
 from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from .base_agent import BaseAgent, AgentState
+from .base_agent import BaseAgent, AgentState, agent_run, new_run_id
 from .resume_parser_agent import ResumeParserAgent
 from .skills_agent import SkillsAssessmentAgent
 from .semantic_agent import SemanticMatchingAgent
 from .red_flag_agent import RedFlagAgent
+from .pipeline import (Pipeline, PipelineStage, PipelineExecutor,
+                       COST_IO, COST_CHEAP, COST_EXPENSIVE)
+from app.scoring import ScoringConfig, DEFAULT_WEIGHTS
+from app.metrics import CASCADE_EVALUATIONS, CASCADE_TIME_SAVED
 
 
 class RankingOrchestratorAgent(BaseAgent):
     """
     Orchestrator that coordinates all agents and produces final rankings
     
-    Workflow:
+    Workflow ("full" pipeline):
     1. ResumeParserAgent: Extract structured data
-    2. SkillsAssessmentAgent: Evaluate skills match
-    3. SemanticMatchingAgent: AI-powered semantic similarity
-    4. RedFlagAgent: Detect potential issues
+    2. SkillsAssessmentAgent: Evaluate skills match          (concurrent with 3, 4)
+    3. SemanticMatchingAgent: AI-powered semantic similarity (concurrent with 2, 4)
+    4. RedFlagAgent: Detect potential issues                 (concurrent with 2, 3)
     5. Calculate final weighted score and tier
+    
+    Other pipelines:
+    - "screening": full pipeline without the semantic stage (cheap pre-screening)
+    - "rescore": no parsing - expects already parsed resume_data in the input
     """
     
-    def __init__(self):
+    DEFAULT_PIPELINE = "full"
+    
+    # Default weighted average of the score components (jobs can override, see app/scoring.py)
+    SCORE_WEIGHTS = DEFAULT_WEIGHTS
+    
+    # Resumes per semantic forward pass in execute_batch
+    DEFAULT_BATCH_SIZE = 16
+    
+    def __init__(self, max_workers: int = 3):
         super().__init__(name="RankingOrchestratorAgent")
         
         # Initialize all agents
@@ -40,17 +57,57 @@ class RankingOrchestratorAgent(BaseAgent):
         self.semantic_agent = SemanticMatchingAgent()
         self.red_flag_agent = RedFlagAgent()
         
-        self.log("Initialized all sub-agents")
+        self.executor = PipelineExecutor(max_workers=max_workers)
+        self.pipelines = {}
+        
+        full = Pipeline("full", [
+            PipelineStage("ResumeParserAgent", self.resume_parser,
+                          inputs=["file_path"], outputs=["resume_data"],
+                          cost=COST_IO, critical=True),
+            PipelineStage("SkillsAssessmentAgent", self.skills_agent,
+                          inputs=["resume_data", "job_description"], outputs=["skills_result"],
+                          cost=COST_CHEAP, build_input=self._skills_input),
+            PipelineStage("SemanticMatchingAgent", self.semantic_agent,
+                          inputs=["resume_data", "job_description"], outputs=["semantic_result"],
+                          cost=COST_EXPENSIVE, build_input=self._semantic_input),
+            PipelineStage("RedFlagAgent", self.red_flag_agent,
+                          inputs=["resume_data", "job_description", "required_experience"],
+                          outputs=["red_flag_result"], cost=COST_CHEAP),
+        ])
+        self.register_pipeline(full)
+        self.register_pipeline(full.without("screening", "SemanticMatchingAgent"))
+        self.register_pipeline(full.without("rescore", "ResumeParserAgent"))
+        
+        # Semantic stage timings for the cascade savings estimate (shared across requests)
+        self._cascade_lock = threading.Lock()
+        self._semantic_runs = 0
+        self._semantic_total_time = 0.0
+        
+        self.log(f"Initialized all sub-agents (pipelines: {', '.join(self.pipelines)}, "
+                 f"stage pool: {max_workers} workers)")
+    
+    def register_pipeline(self, pipeline: Pipeline):
+        """Add or replace a named pipeline (e.g. one with an extra scoring agent)"""
+        self.pipelines[pipeline.name] = pipeline
         
     def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Execute full multi-agent workflow
+        Execute a multi-agent pipeline
         
         Args:
             input_data: {
                 "file_path": str - Path to resume file,
+                "resume_data": dict - Already parsed resume (optional, skips parsing),
                 "job_description": str - Job description text,
-                "required_experience": int - Years required (optional)
+                "required_experience": int - Years required (optional),
+                "pipeline": str - "full" (default), "screening" or "rescore",
+                "cascade": bool - Only run semantic matching when the candidate can
+                           still reach the job's Medium Tier cutoff (optional, full
+                           pipeline only),
+                "scoring": ScoringConfig or {"weights", "tier_thresholds"} - Job-specific
+                           weights and tier cutoffs (optional, defaults otherwise),
+                "run_id": str - Correlation id for the agent logs (optional, generated),
+                "sequential": bool - Run all stages in the calling thread (profiling)
             }
             
         Returns:
@@ -61,88 +118,301 @@ class RankingOrchestratorAgent(BaseAgent):
                 "overall_score": float,
                 "tier": str,
                 "red_flags": list,
-                "agent_execution_log": list,
-                "total_execution_time": float
+                "agent_execution_log": list - log entries of this run only,
+                "run_id": str,
+                "total_execution_time": float,
+                "metadata": dict with pipeline, stage_timings, critical_path, cached_stages
+                            and (cascade mode) cascade: {pruned, upper_bound, threshold}
             }
         """
+        run_id = input_data.get("run_id") or new_run_id()
+        with agent_run(run_id):
+            result = self._execute_run(input_data, run_id)
+        result["run_id"] = run_id
+        return result
+    
+    def _execute_run(self, input_data: Dict[str, Any], run_id: str) -> Dict[str, Any]:
+        """Run the selected pipeline; every agent log entry is tagged with run_id"""
         start_time = time.time()
         state = AgentState()
         
         file_path = input_data.get("file_path")
+        resume_data = input_data.get("resume_data")
         job_description = input_data.get("job_description", "")
         required_experience = input_data.get("required_experience", 0)
+        pipeline_name = input_data.get("pipeline", self.DEFAULT_PIPELINE)
+        sequential = input_data.get("sequential", False)
         
-        if not file_path or not job_description:
-            self.log("Missing required inputs: file_path or job_description", "error")
+        pipeline = self.pipelines.get(pipeline_name)
+        if pipeline is None:
+            self.log(f"Unknown pipeline: {pipeline_name}", "error")
             return {
                 "success": False,
-                "error": "Missing file_path or job_description"
+                "error": f"Unknown pipeline '{pipeline_name}'"
             }
         
-        self.log(f"Starting workflow for: {os.path.basename(file_path)}")
-        
-        # ===== STEP 1: Parse Resume =====
-        parse_result = self.resume_parser.timed_execute({"file_path": file_path})
-        state.add_agent_result("ResumeParserAgent", parse_result)
+        try:
+            scoring = self._resolve_scoring(input_data.get("scoring"))
+        except ValueError as e:
+            self.log(f"Invalid scoring configuration: {e}", "error")
+            return {
+                "success": False,
+                "error": f"Invalid scoring configuration: {e}"
+            }
         
-        if not parse_result.get("success"):
-            self.log("Resume parsing failed, aborting workflow", "error")
-            return self._build_error_response(state, start_time)
+        if not (file_path or resume_data) or not job_description:
+            self.log("Missing required inputs: file_path/resume_data or job_description", "error")
+            return {
+                "success": False,
+                "error": "Missing file_path or job_description"
+            }
         
-        resume_data = parse_result.get("resume_data")
+        source = os.path.basename(file_path) if file_path else resume_data.get("name", "parsed resume")
+        self.log(f"Starting '{pipeline.name}' pipeline for: {source}")
+        state.set("file_path", file_path)
         state.set("resume_data", resume_data)
-        
-        # ===== STEP 2: Assess Skills =====
-        # Convert skills string to list (skills are comma-separated in resume_data)
-        skills_str = resume_data.get("skills", "")
-        if isinstance(skills_str, str):
-            resume_skills = [s.strip() for s in skills_str.split(',') if s.strip() and s.strip() != 'Not specified']
+        state.set("job_description", job_description)
+        state.set("required_experience", required_experience)
+        state.set("scoring", scoring)
+        
+        # ===== STEPS 1-4: Run pipeline stages as a dependency graph =====
+        cascade_info = None
+        if input_data.get("cascade") and pipeline.name == "full":
+            # Lowest cutoff above Low Tier: a pruned candidate is Low Tier either way
+            threshold = scoring.tier_thresholds["medium"]
+            run_info, cascade_info = self._run_cascade(state, start_time, threshold, sequential)
         else:
-            resume_skills = skills_str  # Already a list
-            
-        skills_result = self.skills_agent.timed_execute({
-            "resume_skills": resume_skills,
-            "job_description": job_description
-        })
-        state.add_agent_result("SkillsAssessmentAgent", skills_result)
-        
-        # ===== STEP 3: Semantic Matching =====
-        semantic_result = self.semantic_agent.timed_execute({
-            "resume_text": resume_data.get("raw_text", ""),
-            "job_description": job_description
-        })
-        state.add_agent_result("SemanticMatchingAgent", semantic_result)
-        
-        # ===== STEP 4: Red Flag Detection =====
-        red_flag_result = self.red_flag_agent.timed_execute({
-            "resume_data": resume_data,
-            "job_description": job_description,
-            "required_experience": required_experience
-        })
-        state.add_agent_result("RedFlagAgent", red_flag_result)
+            run_info = self.executor.run(pipeline, state, start_time, sequential)
+        self._record_semantic_time(run_info["stage_timings"])
+        
+        if run_info["aborted"] or state.get("resume_data") is None:
+            self.log("Resume parsing failed, aborting workflow", "error")
+            return self._build_error_response(state, start_time)
         
         # ===== STEP 5: Calculate Final Score =====
         final_result = self._calculate_final_score(state, job_description, required_experience)
         
         total_time = time.time() - start_time
         final_result["total_execution_time"] = round(total_time, 3)
+        final_result["metadata"] = {
+            "pipeline": pipeline.name,
+            "stage_timings": run_info["stage_timings"],
+            "cached_stages": run_info["cached_stages"],
+            "blocked_stages": run_info["blocked_stages"],
+            **self.executor.timing_summary(pipeline, run_info["stage_timings"], total_time)
+        }
+        if cascade_info is not None:
+            final_result["metadata"]["cascade"] = cascade_info
         
-        # Collect all agent logs
-        final_result["agent_execution_log"] = self._collect_agent_logs()
+        # Collect the agent logs of this run
+        final_result["agent_execution_log"] = self._collect_agent_logs(pipeline, run_id)
         
         self.log(f"Workflow completed in {total_time:.3f}s - "
                 f"Final Score: {final_result.get('overall_score', 0):.2f}%", "success")
         
         return final_result
     
+    @staticmethod
+    def _resolve_scoring(scoring) -> ScoringConfig:
+        """ScoringConfig from the "scoring" input (raises ValueError when invalid)"""
+        if isinstance(scoring, dict):
+            return ScoringConfig(scoring.get("weights"), scoring.get("tier_thresholds"))
+        return scoring or ScoringConfig()
+
+    def execute_batch(self, candidates: List[Dict[str, Any]], job_description: str,
+                      required_experience: int = 0, scoring=None,
+                      batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Match many candidates against one job description, yielding results as they finish
+
+        Candidates are processed in chunks of batch_size. Every candidate of a chunk runs
+        the "screening" pipeline (parse unless resume_data is given, skills, red flags)
+        under its own run id, then the whole chunk goes through one batched semantic
+        pass - a single encode call for the JD and all resumes - before the chunk's
+        final scores are yielded. The semantic stage timing of each run (and its
+        agent_execution_seconds observation) is its share of the batched call.
+
+        Cascade scoring is not applied: the batched encode already amortizes the
+        semantic cost, so every candidate gets a real semantic score (re-scoring relies
+        on this to re-match pruned analyses).
+
+        Args:
+            candidates: [{"file_path" or "resume_data"}] - same inputs as execute()
+            job_description: Job description text
+            required_experience: Years required
+            scoring: ScoringConfig or {"weights", "tier_thresholds"} (optional)
+            batch_size: Resumes per semantic pass
+
+        Yields:
+            (candidate index, execute()-shaped result with run_id), in input order
+        """
+        scoring = self._resolve_scoring(scoring)
+        full = self.pipelines["full"]
+
+        for chunk_start in range(0, len(candidates), batch_size):
+            screened = []
+            for index in range(chunk_start, min(chunk_start + batch_size, len(candidates))):
+                item = candidates[index]
+                run_id = item.get("run_id") or new_run_id()
+                start_time = time.time()
+                state = AgentState()
+                with agent_run(run_id):
+                    self.log(f"Starting batched '{full.name}' pipeline "
+                             f"({index + 1}/{len(candidates)})")
+                    state.set("file_path", item.get("file_path"))
+                    state.set("resume_data", item.get("resume_data"))
+                    state.set("job_description", job_description)
+                    state.set("required_experience", required_experience)
+                    state.set("scoring", scoring)
+                    run_info = self.executor.run(self.pipelines["screening"], state, start_time)
+
+                if run_info["aborted"] or state.get("resume_data") is None:
+                    with agent_run(run_id):
+                        self.log("Resume parsing failed, skipping candidate", "error")
+                    result = self._build_error_response(state, start_time)
+                    result["run_id"] = run_id
+                    yield index, result
+                    continue
+                screened.append((index, run_id, start_time, state, run_info))
+
+            if not screened:
+                continue
+
+            semantic_start = time.time()
+            semantic_results = self.semantic_agent.timed_execute_batch(
+                self.semantic_agent.score_batch,
+                [state.get("resume_data").get("raw_text", "") for _, _, _, state, _ in screened],
+                job_description)
+            semantic_end = time.time()
+            share = (semantic_end - semantic_start) / len(screened)
+
+            for (index, run_id, start_time, state, run_info), semantic_result in zip(screened, semantic_results):
+                with agent_run(run_id):
+                    state.set("semantic_result", semantic_result)
+                    state.add_agent_result("SemanticMatchingAgent", semantic_result)
+                    run_info["stage_timings"]["SemanticMatchingAgent"] = {
+                        "start": round(semantic_start - start_time, 4),
+                        "end": round(semantic_end - start_time, 4),
+                        "duration": round(share, 4),
+                        "queue_wait": 0.0
+                    }
+
+                    final_result = self._calculate_final_score(state, job_description, required_experience)
+                    total_time = time.time() - start_time
+                    final_result["total_execution_time"] = round(total_time, 3)
+                    final_result["metadata"] = {
+                        "pipeline": full.name,
+                        "stage_timings": run_info["stage_timings"],
+                        "cached_stages": run_info["cached_stages"],
+                        "blocked_stages": run_info["blocked_stages"],
+                        "batch_size": len(screened),
+                        **self.executor.timing_summary(full, run_info["stage_timings"], total_time)
+                    }
+                    self.log(f"Batched workflow completed - "
+                             f"Final Score: {final_result['overall_score']:.2f}%", "success")
+                    final_result["agent_execution_log"] = self._collect_agent_logs(full, run_id)
+                final_result["run_id"] = run_id
+                yield index, final_result
+
+    def _run_cascade(self, state: AgentState, start_time: float, threshold: float,
+                     sequential: bool = False):
+        """
+        Two-phase scoring: cheap stages first, semantic matching only if it can matter
+        
+        Phase 1 runs the "screening" pipeline (parse, skills, red flags) and the TF-IDF
+        keyword score. The upper bound of the overall score assumes semantic = 100; if
+        even that stays below the threshold the transformer forward pass is skipped and
+        the semantic score is recorded as 0 (the tier is unaffected - it is below the
+        threshold either way).
+        """
+        run_info = self.executor.run(self.pipelines["screening"], state, start_time, sequential)
+        resume_data = state.get("resume_data")
+        if run_info["aborted"] or resume_data is None:
+            return run_info, None
+        
+        keyword_score = self.semantic_agent.keyword_match_score(
+            resume_data.get("raw_text", "") or "", state.get("job_description")
+        )
+        # Handed to the semantic stage so it doesn't compute the TF-IDF score again
+        state.set("keyword_score", keyword_score)
+        skill_score = (state.get("skills_result") or {}).get("skill_match_score", 0.0)
+        experience_score = self._calculate_experience_score(
+            resume_data.get("experience_years", 0), state.get("required_experience", 0)
+        )
+        weights = state.get("scoring").weights
+        upper_bound = (100.0 * weights["semantic"] + keyword_score * weights["keyword"] +
+                       skill_score * weights["skill"] + experience_score * weights["experience"])
+        
+        pruned = upper_bound < threshold
+        time_saved = 0.0
+        if pruned:
+            time_saved = self._average_semantic_time()
+            state.set("semantic_result", {
+                "success": True,
+                "semantic_similarity_score": 0.0,
+                "keyword_match_score": round(keyword_score, 2),
+                "pruned": True
+            })
+            self.log(f"Cascade: pruned semantic stage (upper bound {upper_bound:.1f} < {threshold})")
+        else:
+            # Skills and red flag outputs are cached in the state, so only semantic runs
+            semantic_info = self.executor.run(self.pipelines["full"], state, start_time, sequential)
+            run_info["stage_timings"].update(semantic_info["stage_timings"])
+        
+        CASCADE_EVALUATIONS.inc(result="pruned" if pruned else "semantic")
+        CASCADE_TIME_SAVED.inc(time_saved)
+        
+        return run_info, {
+            "pruned": pruned,
+            "upper_bound": round(upper_bound, 2),
+            "threshold": threshold,
+            "estimated_time_saved": round(time_saved, 3)
+        }
+    
+    def _record_semantic_time(self, stage_timings: Dict[str, Dict[str, float]]):
+        """Track the semantic stage duration used to estimate cascade savings"""
+        timing = stage_timings.get("SemanticMatchingAgent")
+        if timing:
+            with self._cascade_lock:
+                self._semantic_runs += 1
+                self._semantic_total_time += timing["duration"]
+    
+    def _average_semantic_time(self) -> float:
+        """Mean semantic stage duration so far (0 until the stage has run once)"""
+        with self._cascade_lock:
+            if not self._semantic_runs:
+                return 0.0
+            return self._semantic_total_time / self._semantic_runs
+    
+    def _skills_input(self, state: AgentState) -> Dict[str, Any]:
+        """Build SkillsAssessmentAgent input from the parsed resume"""
+        # Convert skills string to list (skills are comma-separated in resume_data)
+        skills_str = state.get("resume_data").get("skills", "")
+        if isinstance(skills_str, str):
+            resume_skills = [s.strip() for s in skills_str.split(',') if s.strip() and s.strip() != 'Not specified']
+        else:
+            resume_skills = skills_str  # Already a list
+        return {
+            "resume_skills": resume_skills,
+            "job_description": state.get("job_description")
+        }
+    
+    def _semantic_input(self, state: AgentState) -> Dict[str, Any]:
+        """Build SemanticMatchingAgent input from the parsed resume"""
+        return {
+            "resume_text": state.get("resume_data").get("raw_text", ""),
+            "job_description": state.get("job_description"),
+            "keyword_match_score": state.get("keyword_score")
+        }
+    
     def _calculate_final_score(self, state: AgentState, job_description: str, 
                                required_experience: int) -> Dict[str, Any]:
         """Calculate final weighted score from all agent results"""
         
         resume_data = state.get("resume_data")
-        skills_result = state.get_agent_result("SkillsAssessmentAgent")
-        semantic_result = state.get_agent_result("SemanticMatchingAgent")
-        red_flag_result = state.get_agent_result("RedFlagAgent")
+        skills_result = state.get("skills_result") or {}
+        semantic_result = state.get("semantic_result") or {}
+        red_flag_result = state.get("red_flag_result") or {}
         
         # Extract scores
         skill_score = skills_result.get("skill_match_score", 0.0)
@@ -153,13 +423,19 @@ class RankingOrchestratorAgent(BaseAgent):
             required_experience
         )
         
-        # Weighted average (same as original system)
-        weights = {
-            "semantic": 0.30,
-            "keyword": 0.25,
-            "skill": 0.30,
-            "experience": 0.15
-        }
+        scoring = state.get("scoring") or ScoringConfig()
+        weights = dict(scoring.weights)
+        
+        # Pipelines without the semantic stage (e.g. "screening") have no semantic/keyword
+        # scores - spread their weight over the components that were actually computed
+        if not semantic_result:
+            remaining = weights["skill"] + weights["experience"]
+            weights = {
+                "semantic": 0.0,
+                "keyword": 0.0,
+                "skill": round(weights["skill"] / remaining, 4),
+                "experience": round(weights["experience"] / remaining, 4)
+            }
         
         overall_score = (
             semantic_score * weights["semantic"] +
@@ -169,7 +445,7 @@ class RankingOrchestratorAgent(BaseAgent):
         )
         
         # Determine tier
-        tier = self._determine_tier(overall_score)
+        tier = scoring.tier(overall_score)
         
         # Generate explanation
         explanation = self._generate_explanation(
@@ -187,7 +463,12 @@ class RankingOrchestratorAgent(BaseAgent):
                 "phone": resume_data.get("phone", ""),
                 "experience_years": resume_data.get("experience_years", 0),
                 "education": resume_data.get("education", ""),
-                "skills": resume_data.get("skills", [])
+                "skills": resume_data.get("skills", []),
+                "projects": resume_data.get("projects", ""),
+                "certifications": resume_data.get("certifications", ""),
+                "job_titles": resume_data.get("job_titles", ""),
+                "raw_text": resume_data.get("raw_text", ""),
+                "employment_timeline": resume_data.get("employment_timeline")
             },
             "scores": {
                 "overall_score": round(overall_score, 2),
@@ -201,7 +482,8 @@ class RankingOrchestratorAgent(BaseAgent):
             "explanation": explanation,
             "red_flags": red_flag_result.get("red_flags", []),
             "red_flag_count": red_flag_result.get("red_flag_count", 0),
-            "weights_used": weights
+            "weights_used": weights,
+            "tier_thresholds_used": dict(scoring.tier_thresholds)
         }
     
     def _calculate_experience_score(self, candidate_years: int, required_years: int) -> float:
@@ -215,15 +497,6 @@ class RankingOrchestratorAgent(BaseAgent):
             # Partial credit for close matches
             return max(0.0, (candidate_years / required_years) * 100)
     
-    def _determine_tier(self, score: float) -> str:
-        """Determine candidate tier based on score"""
-        if score >= 75:
-            return "Top Tier"
-        elif score >= 50:
-            return "Medium Tier"
-        else:
-            return "Low Tier"
-    
     def _generate_explanation(self, overall_score: float, tier: str, 
                              skill_score: float, semantic_score: float,
                              experience_score: float, matched_skills: List[str],
@@ -256,14 +529,14 @@ class RankingOrchestratorAgent(BaseAgent):
         
         return " ".join(explanation_parts)
     
-    def _collect_agent_logs(self) -> List[Dict[str, Any]]:
-        """Collect logs from all agents"""
-        all_logs = []
+    def _collect_agent_logs(self, pipeline: Pipeline, run_id: str) -> List[Dict[str, Any]]:
+        """Collect one run's logs from the orchestrator and the agents of a pipeline"""
+        all_logs = self.get_logs(run_id)
         
-        for agent in [self.resume_parser, self.skills_agent, 
-                     self.semantic_agent, self.red_flag_agent]:
-            all_logs.extend(agent.get_logs())
+        for agent in pipeline.agents:
+            all_logs.extend(agent.get_logs(run_id))
         
+        all_logs.sort(key=lambda entry: entry["timestamp"])
         return all_logs
     
     def _build_error_response(self, state: AgentState, start_time: float) -> Dict[str, Any]:
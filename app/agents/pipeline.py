@@ -0,0 +1,218 @@
+"""
+Declarative Agent Pipelines
+
+A pipeline is a list of stages. Each stage wraps a BaseAgent and declares which
+AgentState keys it reads (inputs), which keys it writes (outputs) and how expensive
+it is. Stage dependencies are derived from inputs/outputs, so adding an agent only
+means declaring a new stage - no orchestrator changes.
+"""
+
+from typing import Dict, Any, List, Callable, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+import contextvars
+import time
+
+from .base_agent import BaseAgent, AgentState
+
+
+# Cost classes, cheapest first
+COST_IO = "io"                # file / network bound (document parsing)
+COST_CHEAP = "cheap"          # regex and set operations
+COST_EXPENSIVE = "expensive"  # transformer forward passes
+
+
+class PipelineStage:
+    """One agent step in a pipeline"""
+
+    def __init__(self, name: str, agent: BaseAgent, inputs: List[str], outputs: List[str],
+                 cost: str = COST_CHEAP,
+                 build_input: Optional[Callable[[AgentState], Dict[str, Any]]] = None,
+                 critical: bool = False):
+        """
+        Args:
+            name: Stage name (also used as the AgentState result key)
+            agent: Agent that does the work
+            inputs: State keys this stage reads
+            outputs: State keys this stage writes - the first output receives the
+                     agent result unless the agent returns the key itself
+            cost: COST_IO, COST_CHEAP or COST_EXPENSIVE
+            build_input: Builds the agent input from the state (default: the input keys)
+            critical: Abort the pipeline when this stage does not succeed
+        """
+        self.name = name
+        self.agent = agent
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.cost = cost
+        self.build_input = build_input or (lambda state: {key: state.get(key) for key in self.inputs})
+        self.critical = critical
+
+    def is_cached(self, state: AgentState) -> bool:
+        """True when every output of this stage is already present in the state"""
+        return all(state.get(key) is not None for key in self.outputs)
+
+    def store_result(self, state: AgentState, result: Dict[str, Any]):
+        """Write the agent result into the state under the declared output keys"""
+        state.add_agent_result(self.name, result)
+        for key in self.outputs:
+            if key in result:
+                state.set(key, result[key])
+        if self.outputs and self.outputs[0] not in result:
+            state.set(self.outputs[0], result)
+
+
+class Pipeline:
+    """Named collection of stages; dependencies are derived from inputs/outputs"""
+
+    def __init__(self, name: str, stages: List[PipelineStage]):
+        self.name = name
+        self.stages = list(stages)
+
+        producers = {}
+        for stage in self.stages:
+            for key in stage.outputs:
+                producers[key] = stage.name
+
+        # stage -> stages that produce one of its inputs
+        self.dependencies = {
+            stage.name: sorted({producers[key] for key in stage.inputs
+                                if key in producers and producers[key] != stage.name})
+            for stage in self.stages
+        }
+
+    @property
+    def agents(self) -> List[BaseAgent]:
+        """Distinct agents used by this pipeline, in stage order"""
+        agents = []
+        for stage in self.stages:
+            if stage.agent not in agents:
+                agents.append(stage.agent)
+        return agents
+
+    def stage_names(self) -> List[str]:
+        return [stage.name for stage in self.stages]
+
+    def without(self, name: str, *stage_names: str) -> "Pipeline":
+        """Derive a new pipeline that drops the given stages"""
+        return Pipeline(name, [s for s in self.stages if s.name not in stage_names])
+
+
+class PipelineExecutor:
+    """Runs a pipeline's stages on a thread pool as soon as their inputs are available"""
+
+    def __init__(self, max_workers: int = 3):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix="pipeline-stage")
+
+    @staticmethod
+    def _run_stage(stage: PipelineStage, stage_input: Dict[str, Any]):
+        """Run one stage on a pool thread and return (result, start, end)"""
+        started = time.time()
+        result = stage.agent.timed_execute(stage_input)
+        return result, started, time.time()
+
+    def _run_inline(self, stage: PipelineStage, stage_input: Dict[str, Any]) -> Future:
+        """Run one stage in the calling thread, wrapped in an already completed future"""
+        future = Future()
+        try:
+            future.set_result(self._run_stage(stage, stage_input))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def run(self, pipeline: Pipeline, state: AgentState, workflow_start: float,
+            sequential: bool = False) -> Dict[str, Any]:
+        """
+        Execute a pipeline against the shared state
+
+        Stages whose outputs are already in the state are skipped (cached). Stages whose
+        inputs can never become available (a critical stage failed or the input was not
+        provided) are reported as blocked. With sequential=True every stage runs in the
+        calling thread (profilers such as cProfile only see that thread).
+
+        Returns:
+            {
+                "stage_timings": {stage: {start, end, duration, queue_wait}},
+                "cached_stages": list,
+                "blocked_stages": list,
+                "aborted": bool
+            }
+        """
+        cached = [s.name for s in pipeline.stages if s.is_cached(state)]
+        pending = [s for s in pipeline.stages if s.name not in cached]
+        running = {}
+        timings = {}
+        aborted = False
+
+        while pending or running:
+            # Submit every stage whose inputs are all available
+            for stage in list(pending):
+                if all(state.get(key) is not None for key in stage.inputs):
+                    pending.remove(stage)
+                    if sequential:
+                        future = self._run_inline(stage, stage.build_input(state))
+                    else:
+                        # Run in a copy of the caller's context so agent logs keep the run id
+                        context = contextvars.copy_context()
+                        future = self._pool.submit(context.run, self._run_stage, stage, stage.build_input(state))
+                    running[future] = (stage, time.time())
+
+            if not running:
+                break  # Remaining stages are waiting on inputs nobody will produce
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, submitted = running.pop(future)
+                result, started, ended = future.result()
+                timings[stage.name] = {
+                    "start": round(started - workflow_start, 4),
+                    "end": round(ended - workflow_start, 4),
+                    "duration": round(ended - started, 4),
+                    "queue_wait": round(started - submitted, 4)
+                }
+
+                if stage.critical and not result.get("success"):
+                    state.add_agent_result(stage.name, result)
+                    state.add_error(stage.name, result.get("error") or "Stage failed")
+                    pending.clear()
+                    aborted = True
+                    continue
+
+                stage.store_result(state, result)
+
+        return {
+            "stage_timings": timings,
+            "cached_stages": cached,
+            "blocked_stages": [s.name for s in pending],
+            "aborted": aborted
+        }
+
+    @staticmethod
+    def timing_summary(pipeline: Pipeline, stage_timings: Dict[str, Dict[str, float]],
+                       total_time: float) -> Dict[str, Any]:
+        """Compute the critical path through the stage graph from measured durations"""
+        finish = {}
+        previous = {}
+        for stage in pipeline.stage_names():
+            if stage not in stage_timings:
+                continue
+            deps = [d for d in pipeline.dependencies[stage] if d in finish]
+            slowest_dep = max(deps, key=lambda d: finish[d]) if deps else None
+            previous[stage] = slowest_dep
+            finish[stage] = (finish[slowest_dep] if slowest_dep else 0.0) + stage_timings[stage]["duration"]
+
+        critical_path = []
+        stage = max(finish, key=finish.get) if finish else None
+        while stage:
+            critical_path.insert(0, stage)
+            stage = previous[stage]
+
+        sequential_time = sum(t["duration"] for t in stage_timings.values())
+
+        return {
+            "critical_path": critical_path,
+            "critical_path_time": round(finish[critical_path[-1]], 4) if critical_path else 0.0,
+            "sequential_stage_time": round(sequential_time, 4),
+            "parallel_speedup": round(sequential_time / total_time, 2) if total_time > 0 else 1.0
+        }
@@ -3,13 +3,31 @@ RAG (Retrieval Augmented Generation) Agent for Resume Querying
 Uses AI-powered semantic search to find relevant candidates based on natural language questions
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
+from collections import OrderedDict
 import re
+import threading
 from fuzzywuzzy import fuzz
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
+from config import Config
+from app.metrics import MODEL_LOAD_SECONDS, ENCODE_SECONDS, ENCODE_BATCH_SIZE, CACHE_REQUESTS, timer
+from app.inverted_index import tokenize
+from app.skill_bitmap import SkillBitmap
+from app.candidate_snapshot import SnapshotCandidates
+from app.name_index import NameIndex
+
+# Keyword points for one occurrence of the rarest query keyword in an average-length resume
+KEYWORD_POINTS = 5
+
+# Boolean skill questions: text between two named skills that joins them into a list
+# ("python, docker and aws", "go or rust"), and a negation right before a skill
+# ("not java", "doesn't know java", "without any java")
+SKILL_LIST_JOIN = re.compile(r'^[\s,]*(and|&|plus|as well as|or)?[\s,]*$')
+SKILL_NEGATION = re.compile(r"(?:\b(?:not|without|except|excluding|no)|n't)(?:\s+\w+){0,2}\s*$")
+
 
 class RAGAgent:
     """
@@ -80,6 +98,29 @@ class RAGAgent:
             'listing': r'\b(list all|show all|display all|enumerate)\b'
         }
         
+        # Words that make a question a skills/role query rather than a person query
+        self.role_keywords = ['role', 'position', 'job', 'engineer', 'developer', 'analyst', 'scientist',
+                              'manager', 'architect', 'specialist', 'consultant', 'devops', 'qa', 'tester',
+                              'skills', 'experience', 'knows', 'knowledge']
+        
+        # Every routing pattern in one regex, each as an optional lookahead: a single scan of
+        # the question reports all routes and intents that match anywhere in it
+        routes = {
+            'greeting': r'hello|hi|hey|good morning|good afternoon|good evening|greetings',
+            'help': (r'\b(help|guide|how to use|what can you do|how does this work|explain)\b'
+                     r'|^(what|how)\s+(can|do|does|should|could)\s+(i|you)'),
+            'count': r'\b(how many|count|number of|total)\b',
+            'role': r'\b(' + '|'.join(re.escape(keyword) for keyword in self.role_keywords) + r')\b',
+            **self.query_patterns
+        }
+        self.routing_pattern = re.compile(''.join(f'(?:(?=(?P<{name}>{pattern})))?'
+                                                  for name, pattern in routes.items()))
+        
+        # Question embeddings of recent questions (LRU)
+        self._embedding_cache = OrderedDict()
+        self._embedding_cache_size = Config.RAG_EMBEDDING_CACHE_SIZE
+        self._embedding_lock = threading.Lock()
+        
         print("[RAG Agent] Initialized with AI-powered semantic search")
     
     def _load_model(self):
@@ -87,7 +128,8 @@ class RAGAgent:
         if not self._model_loaded:
             try:
                 print("[RAG Agent] Loading AI model (all-MiniLM-L6-v2)...")
-                self.model = SentenceTransformer('all-MiniLM-L6-v2')
+                with timer(MODEL_LOAD_SECONDS, agent="RAGAgent"):
+                    self.model = SentenceTransformer('all-MiniLM-L6-v2')
                 self._model_loaded = True
                 print("[RAG Agent] ✅ AI model loaded successfully!")
             except Exception as e:
@@ -96,7 +138,53 @@ class RAGAgent:
                 self.model = None
                 self._model_loaded = True
     
-    def query(self, question: str, candidates: List[Dict[str, Any]], job_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _encode(self, texts: List[str]):
+        """Encode texts with the AI model, recording call time and batch size"""
+        ENCODE_BATCH_SIZE.observe(len(texts), agent="RAGAgent")
+        with timer(ENCODE_SECONDS, agent="RAGAgent"):
+            return self.model.encode(texts)
+    
+    def plan_query(self, question: str, snapshot=None) -> Dict[str, Any]:
+        """
+        Route a question and derive the hard constraints every answer candidate must meet
+        
+        The filters (minimum whole years, skills required / excluded by AND / NOT) are only
+        set for routes that rank candidates and never look beyond the ones passing them
+        (skill counts, comparison, recommendation, search), so the caller can select just
+        those candidates from the snapshot before building and scoring them. Greetings,
+        help, totals, listings and questions naming a candidate get no filters.
+        
+        Args:
+            question: Natural language question about resumes
+            snapshot: SnapshotVersion the candidates will come from (its name index tells
+                      person questions apart); without it no filters are derived
+            
+        Returns:
+            {'routes', 'intent', 'search_terms', 'filters': {min_years, all_skills, none_skills}}
+        """
+        question_lower = question.lower().strip()
+        routes = self._match_routes(question_lower)
+        intent = self._detect_query_intent(question_lower, routes)
+        search_terms = self._extract_search_terms(question)
+        plan = {'routes': routes, 'intent': intent, 'search_terms': search_terms, 'filters': {}}
+        
+        if snapshot is None or self._is_greeting(question_lower, routes) or self._is_help_query(question_lower, routes):
+            return plan
+        if 'count' in routes:
+            ranks = bool(search_terms['skills'] or search_terms['excluded_skills'])
+        else:
+            names_candidate = 'role' not in routes and bool(snapshot.name_index().mentioned(question_lower))
+            ranks = not names_candidate and intent != 'listing'
+        if ranks:
+            plan['filters'] = {
+                'min_years': search_terms['experience_years'],
+                'all_skills': search_terms['required_groups'],
+                'none_skills': search_terms['excluded_groups']
+            }
+        return plan
+    
+    def query(self, question: str, candidates: List[Dict[str, Any]], job_context: Optional[Dict[str, Any]] = None,
+              plan: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Process a natural language question and return relevant candidates
         
@@ -104,11 +192,14 @@ class RAGAgent:
             question: Natural language question about resumes
             candidates: List of candidate dictionaries with resume data
             job_context: Optional job description for context
+            plan: plan_query() result the candidates were selected with (computed here
+                  when not given)
             
         Returns:
             Dictionary with answer and ranked candidates
         """
-        if not candidates:
+        plan = plan or self.plan_query(question)
+        if not candidates and not any(plan['filters'].values()):
             return {
                 'answer': 'I don\'t see any candidates in the database yet. Please upload some resumes first, and I\'ll be happy to help you find the right match! 😊',
                 'candidates': [],
@@ -121,12 +212,13 @@ class RAGAgent:
         print(f"[RAG Agent] Question: '{question}'")
         print(f"[RAG Agent] Candidates available: {len(candidates)}")
         
-        # Detect query intent
-        query_intent = self._detect_query_intent(question_lower)
+        # Detect query intent and extract search terms (one scan for every route)
+        routes = plan['routes']
+        query_intent = plan['intent']
         print(f"[RAG Agent] Detected intent: {query_intent}")
-        
-        # Extract search intent and keywords from question first
-        search_terms = self._extract_search_terms(question)
+        search_terms = plan['search_terms']
+        if any(plan['filters'].values()):
+            print(f"[RAG Agent] Candidates pre-selected by: {plan['filters']}")
         print(f"[RAG Agent] Extracted skills: {search_terms['skills']}")
         print(f"[RAG Agent] Extracted keywords: {search_terms['keywords'][:10] if len(search_terms['keywords']) > 10 else search_terms['keywords']}")
         print(f"[RAG Agent] Experience requirement: {search_terms['experience_years']} years" if search_terms['experience_years'] else "")
@@ -134,21 +226,20 @@ class RAGAgent:
         # Handle different query types
         
         # 1. Greeting/Conversational queries
-        if self._is_greeting(question_lower):
+        if self._is_greeting(question_lower, routes):
             return self._handle_greeting(candidates)
         
         # 2. Help/Guidance queries
-        if self._is_help_query(question_lower):
+        if self._is_help_query(question_lower, routes):
             return self._handle_help_query()
         
         # 3. Count/Statistics queries
-        is_count_query = re.search(r'\b(how many|count|number of|total)\b', question_lower)
-        if is_count_query:
+        if 'count' in routes:
             return self._handle_count_query(candidates, search_terms, question)
         
         # 4. Specific person query - only if name is actually in question
         # Check candidate names FIRST, before using intent pattern
-        if self._contains_candidate_name(question_lower, candidates):
+        if self._contains_candidate_name(question_lower, candidates, routes):
             return self._handle_specific_person_query(candidates, question)
         
         # 5. Comparison queries (best, top, strongest)
@@ -185,21 +276,29 @@ class RAGAgent:
         """
         question_lower = question.lower()
         
-        # Extract skills mentioned in question
+        # Extract skills mentioned in question (and where, for AND/OR/NOT between them)
         skills = []
+        mentions = []
         for skill in self.common_skills:
             # Use word boundary for single-letter or short skills to avoid false matches
             if len(skill) <= 2:
-                if re.search(r'\b' + re.escape(skill.lower()) + r'\b', question_lower):
+                match = re.search(r'\b' + re.escape(skill.lower()) + r'\b', question_lower)
+                if match:
                     skills.append(skill)
+                    mentions.append((match.start(), match.end(), skill))
             else:
-                if skill.lower() in question_lower:
+                start = question_lower.find(skill.lower())
+                if start >= 0:
                     skills.append(skill)
+                    mentions.append((start, start + len(skill), skill))
         
         # Check for skill variations
         for abbr, full_name in self.skill_variations.items():
-            if re.search(r'\b' + re.escape(abbr) + r'\b', question_lower):
+            match = re.search(r'\b' + re.escape(abbr) + r'\b', question_lower)
+            if match:
                 skills.append(full_name)
+                mentions.append((match.start(), match.end(), full_name))
+        required_skills, excluded_skills = self._skill_operators(question_lower, mentions)
         
         # Handle broader terms that map to multiple skills
         if re.search(r'\b(cloud|cloud platform|cloud computing|cloud engineer|cloud architect)\b', question_lower):
@@ -252,12 +351,61 @@ class RAGAgent:
         # Filter out stop words and only keep words that might be actual skills/technologies
         keywords = [w for w in words if w not in stop_words and len(w) > 3]
         
+        excluded_groups = [self._skill_aliases(skill) for skill in excluded_skills]
+        excluded_lower = {alias for group in excluded_groups for alias in group}
         return {
-            'skills': list(set(skills)),
+            'skills': [skill for skill in set(skills) if skill.lower() not in excluded_lower],
+            'required_skills': required_skills,
+            'excluded_skills': excluded_skills,
+            'required_groups': [self._skill_aliases(skill) for skill in required_skills],
+            'excluded_groups': excluded_groups,
             'experience_years': experience_years,
             'keywords': keywords
         }
     
+    def _skill_aliases(self, skill: str) -> tuple:
+        """Alias group of a skill: its abbreviation and full name from skill_variations ("ml", "machine learning")"""
+        skill_lower = skill.lower()
+        group = {skill_lower}
+        for abbr, full_name in self.skill_variations.items():
+            if skill_lower in (abbr, full_name):
+                group.update((abbr, full_name))
+        return tuple(sorted(group))
+    
+    def _skill_operators(self, question_lower: str, mentions: List[tuple]) -> tuple:
+        """
+        Boolean structure between the skills named in a question
+        
+        A skill right after a negation ("not", "without", "doesn't know") is excluded.
+        When the other named skills form one list joined by "and" (with commas, "&" or
+        "plus", but no "or"), every one of them is required; otherwise any one will do.
+        
+        Returns:
+            (required skills, excluded skills)
+        """
+        # Named skills in question order, dropping names inside a longer one (Java in JavaScript)
+        ordered = []
+        for start, end, skill in sorted(mentions, key=lambda m: (m[0], m[0] - m[1])):
+            if ordered and end <= ordered[-1][1]:
+                continue
+            ordered.append((start, end, skill))
+        
+        positive, excluded, joins = [], [], []
+        previous_end = 0
+        for start, end, skill in ordered:
+            between = question_lower[previous_end:start]
+            if SKILL_NEGATION.search(between):
+                excluded.append(skill)
+            else:
+                if positive:
+                    join = SKILL_LIST_JOIN.match(between)
+                    joins.append((join.group(1) or ',') if join else None)
+                positive.append(skill)
+            previous_end = end
+        
+        is_and_list = None not in joins and 'or' not in joins and any(j != ',' for j in joins)
+        return (positive if is_and_list else []), excluded
+    
     def _rank_candidates(self, candidates: List[Dict[str, Any]], search_terms: Dict[str, List[str]], question: str) -> List[Dict[str, Any]]:
         """
         Rank candidates based on relevance to the search terms using AI + keyword matching
@@ -273,7 +421,7 @@ class RAGAgent:
         question_embedding = None
         if self.model:
             try:
-                question_embedding = self.model.encode([question])[0]
+                question_embedding = self._question_embedding(question)
             except Exception as e:
                 print(f"[RAG Agent] Error encoding question: {str(e)}")
         
@@ -284,7 +432,58 @@ class RAGAgent:
         if search_terms['experience_years']:
             print(f"[RAG Agent] Experience filter: Minimum {search_terms['experience_years']} years required")
         
-        for candidate in candidates:
+        # Exact and fuzzy skill matches of every candidate, from the skill bitmap
+        bitmap, bitmap_rows = self._skill_bitmap(candidates)
+        has_skill = {skill: bitmap.mask(bitmap.has(skill))[bitmap_rows] for skill in search_terms['skills']}
+        has_fuzzy_skill = {skill: bitmap.mask(bitmap.has_fuzzy(skill))[bitmap_rows] for skill in search_terms['skills']}
+        allowed = None
+        if search_terms['required_skills'] or search_terms['excluded_skills']:
+            print(f"[RAG Agent] Skill filter: all of {search_terms['required_skills']}, none of {search_terms['excluded_skills']}")
+            allowed = bitmap.mask(bitmap.query(all_of=search_terms['required_groups'],
+                                               none_of=search_terms['excluded_groups']))[bitmap_rows]
+        
+        # HARD FILTER: Check skill operators and experience requirement first
+        eligible = []
+        eligible_rows = []
+        for row, candidate in enumerate(candidates):
+            if allowed is not None and not allowed[row]:
+                continue
+            if search_terms['experience_years']:
+                candidate_years = self._candidate_years(candidate)
+                if not candidate_years or candidate_years < search_terms['experience_years']:
+                    print(f"[RAG Agent] {candidate.get('name')}: Excluded - has {candidate_years} years, need {search_terms['experience_years']}+ years")
+                    continue  # Skip this candidate entirely
+            eligible.append(candidate)
+            eligible_rows.append(row)
+        
+        # Keyword retrieval from the snapshot's inverted index: only candidates whose skills
+        # or resume contain a query term go on to semantic scoring
+        snapshot = getattr(candidates, 'snapshot', None)
+        index = snapshot.index if snapshot is not None and snapshot.index.size else None
+        keyword_scores = None
+        if index is not None:
+            query_terms = list(search_terms['keywords'])
+            for skill in search_terms['skills']:
+                query_terms.extend(tokenize(skill))
+            if query_terms:
+                matching = set(index.union(query_terms).tolist())
+                kept = [i for i, c in enumerate(eligible) if c.get('id') in matching]
+                eligible = [eligible[i] for i in kept]
+                eligible_rows = [eligible_rows[i] for i in kept]
+                print(f"[RAG Agent] Inverted index: {len(eligible)} candidates contain a query term")
+            keyword_scores = self._keyword_scores(index, search_terms['keywords'])
+        
+        # AI-powered semantic similarity of every remaining candidate in one batch
+        similarities = None
+        if question_embedding is not None and eligible:
+            try:
+                profile_embeddings = self._profile_embeddings(eligible, getattr(candidates, 'snapshot', None))
+                similarities = cosine_similarity(question_embedding.reshape(1, -1), profile_embeddings)[0]
+            except Exception as e:
+                print(f"[RAG Agent] Error calculating semantic similarity: {str(e)}")
+        
+        for position, candidate in enumerate(eligible):
+            row = eligible_rows[position]
             score = 0
             matched_skills = []
             
@@ -293,33 +492,21 @@ class RAGAgent:
             candidate_experience = candidate.get('experience', '').lower()
             candidate_summary = candidate.get('summary', '').lower()
             
-            # HARD FILTER: Check experience requirement first
-            if search_terms['experience_years']:
-                candidate_years = self._extract_years_experience(candidate_experience)
-                if not candidate_years or candidate_years < search_terms['experience_years']:
-                    print(f"[RAG Agent] {candidate.get('name')}: Excluded - has {candidate_years} years, need {search_terms['experience_years']}+ years")
-                    continue  # Skip this candidate entirely
-            
             # Combine all candidate text for keyword matching
             candidate_text = f"{candidate_skills} {candidate_experience} {candidate_summary}".lower()
             
             # Score based on skill matches
             for skill in search_terms['skills']:
-                # Use word boundary for single-letter skills to avoid false matches
-                if len(skill) <= 2:
-                    if re.search(r'\b' + re.escape(skill.lower()) + r'\b', candidate_skills):
-                        score += 30  # High weight for exact skill match
-                        matched_skills.append(skill)
-                elif skill.lower() in candidate_skills:
+                if has_skill[skill][row]:
                     score += 30  # High weight for exact skill match
                     matched_skills.append(skill)
-                elif self._fuzzy_match(skill, candidate_skills):
+                elif has_fuzzy_skill[skill][row]:
                     score += 20  # Medium weight for fuzzy skill match
                     matched_skills.append(skill)
             
             # Bonus score for meeting/exceeding experience requirement
             if search_terms['experience_years']:
-                candidate_years = self._extract_years_experience(candidate_experience)
+                candidate_years = self._candidate_years(candidate)
                 if candidate_years and candidate_years >= search_terms['experience_years']:
                     score += 25  # Bonus for meeting requirement
                     # Additional bonus for significantly more experience
@@ -328,9 +515,12 @@ class RAGAgent:
             
             # Score based on keyword matches in all text (only if we have skill matches)
             keyword_score = 0
-            for keyword in search_terms['keywords']:
-                if keyword in candidate_text:
-                    keyword_score += 5
+            if keyword_scores is not None:
+                keyword_score = keyword_scores.get(candidate.get('id'), 0)
+            else:
+                for keyword in search_terms['keywords']:
+                    if keyword in candidate_text:
+                        keyword_score += KEYWORD_POINTS
             
             # Only add keyword score if we have at least some skill match
             if matched_skills or keyword_score >= 15:
@@ -338,25 +528,9 @@ class RAGAgent:
             
             # AI-powered semantic similarity
             semantic_score = 0
-            if question_embedding is not None and self.model:
-                try:
-                    # Create candidate profile text
-                    candidate_profile = f"Skills: {candidate_skills}. Experience: {candidate_experience}. {candidate_summary[:200]}"
-                    
-                    # Encode candidate profile
-                    candidate_embedding = self.model.encode([candidate_profile])[0]
-                    
-                    # Calculate cosine similarity
-                    similarity = cosine_similarity(
-                        question_embedding.reshape(1, -1),
-                        candidate_embedding.reshape(1, -1)
-                    )[0][0]
-                    
-                    # Convert to score (0-30 points for semantic match)
-                    semantic_score = float(similarity * 30)
-                    
-                except Exception as e:
-                    print(f"[RAG Agent] Error calculating semantic similarity: {str(e)}")
+            if similarities is not None:
+                # Convert to score (0-30 points for semantic match)
+                semantic_score = float(similarities[position] * 30)
             
             # Add semantic score intelligently
             if search_terms['skills']:
@@ -400,18 +574,73 @@ class RAGAgent:
         
         return ranked
     
-    def _fuzzy_match(self, skill: str, text: str) -> bool:
+    def _skill_bitmap(self, candidates: List[Dict[str, Any]]) -> tuple:
         """
-        Check if skill fuzzy matches any part of the text
+        SkillBitmap covering the candidates and each candidate's row in it: the snapshot's
+        bitmap when the candidates come from the candidate snapshot, else one built here
         """
-        if len(skill) <= 2:
-            return False
-        
-        words = text.split()
-        for word in words:
-            if fuzz.ratio(skill.lower(), word.lower()) > 80:
-                return True
-        return False
+        snapshot = getattr(candidates, 'snapshot', None)
+        if snapshot is not None:
+            return snapshot.skill_bitmap(), np.array([c['snapshot_row'] for c in candidates], dtype=np.int64)
+        bitmap = SkillBitmap([(c.get('skills') or '').lower() for c in candidates])
+        return bitmap, np.arange(len(candidates))
+    
+    def _experience_mask(self, candidates: List[Dict[str, Any]], rows: np.ndarray, size: int, years: int) -> np.ndarray:
+        """Bool array over the bitmap rows: candidates with at least the given whole years"""
+        snapshot = getattr(candidates, 'snapshot', None)
+        if snapshot is not None:
+            return np.floor(snapshot.candidates['experience_years']) >= years
+        mask = np.zeros(size, dtype=bool)
+        mask[rows] = [bool(self._candidate_years(c)) and self._candidate_years(c) >= years for c in candidates]
+        return mask
+    
+    def _keyword_scores(self, index, keywords: List[str]) -> Dict[int, float]:
+        """
+        BM25 keyword score per candidate id, scaled so one occurrence of the rarest
+        keyword in an average-length resume is worth KEYWORD_POINTS (the old flat
+        per-keyword points, which the relevance thresholds are tuned to)
+        """
+        top_idf = max([index.idf(keyword) for keyword in keywords] or [0.0])
+        if not top_idf:
+            return {}
+        ids, scores = index.score(keywords)
+        return dict(zip(ids.tolist(), (scores * KEYWORD_POINTS / top_idf).tolist()))
+    
+    def _profile_text(self, candidate: Dict[str, Any]) -> str:
+        """Text embedded for a candidate's semantic match"""
+        return (f"Skills: {candidate.get('skills', '').lower()}. "
+                f"Experience: {candidate.get('experience', '').lower()}. "
+                f"{candidate.get('summary', '').lower()[:200]}")
+    
+    def _profile_embeddings(self, candidates: List[Dict[str, Any]], snapshot=None) -> np.ndarray:
+        """
+        Profile embedding of every candidate: embeddings cached on the candidate snapshot
+        are reused, the rest are encoded in a single batch (and cached when possible)
+        """
+        vectors = [None] * len(candidates)
+        rows = None
+        if snapshot is not None:
+            rows = np.array([c['snapshot_row'] for c in candidates], dtype=np.int64)
+            cached, has_embedding = snapshot.get_embeddings(rows)
+            for i in np.flatnonzero(has_embedding):
+                vectors[i] = cached[i]
+        
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = self._encode([self._profile_text(candidates[i]) for i in missing])
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+            if snapshot is not None:
+                snapshot.store_embeddings(rows[missing], encoded)
+        
+        return np.vstack(vectors)
+    
+    def _candidate_years(self, candidate: Dict[str, Any]) -> Optional[int]:
+        """Whole years of experience (numeric from the snapshot, else parsed from the text)"""
+        years = candidate.get('experience_years')
+        if years is not None:
+            return int(years)
+        return self._extract_years_experience(candidate.get('experience', ''))
     
     def _extract_years_experience(self, experience_text: str) -> Optional[int]:
         """
@@ -422,66 +651,67 @@ class RAGAgent:
             return int(match.group(1))
         return None
     
-    def _detect_query_intent(self, question: str) -> str:
-        """Detect the intent of the query"""
-        for intent, pattern in self.query_patterns.items():
-            if re.search(pattern, question):
+    def _match_routes(self, question: str) -> Set[str]:
+        """Names of the routing patterns (greeting, help, count, role, intents) found in the question"""
+        routes = set()
+        for match in self.routing_pattern.finditer(question):
+            routes.update(name for name, value in match.groupdict().items() if value is not None)
+        return routes
+    
+    def _detect_query_intent(self, question: str, routes: Optional[Set[str]] = None) -> str:
+        """Detect the intent of the query (first matching intent in query_patterns order)"""
+        routes = self._match_routes(question) if routes is None else routes
+        for intent in self.query_patterns:
+            if intent in routes:
                 return intent
         return 'search'
     
-    def _is_greeting(self, question: str) -> bool:
+    def _is_greeting(self, question: str, routes: Optional[Set[str]] = None) -> bool:
         """Check if query is a greeting"""
-        greetings = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening', 'greetings']
-        return any(greeting in question for greeting in greetings) and len(question.split()) <= 5
+        routes = self._match_routes(question) if routes is None else routes
+        return 'greeting' in routes and len(question.split()) <= 5
     
-    def _is_help_query(self, question: str) -> bool:
+    def _is_help_query(self, question: str, routes: Optional[Set[str]] = None) -> bool:
         """Check if user is asking for help"""
-        help_patterns = [
-            r'\b(help|guide|how to use|what can you do|how does this work|explain)\b',
-            r'^(what|how)\s+(can|do|does|should|could)\s+(i|you)',
-        ]
-        return any(re.search(pattern, question) for pattern in help_patterns) and len(question.split()) <= 10
+        routes = self._match_routes(question) if routes is None else routes
+        return 'help' in routes and len(question.split()) <= 10
     
-    def _contains_candidate_name(self, question: str, candidates: List[Dict[str, Any]]) -> bool:
+    def _contains_candidate_name(self, question: str, candidates: List[Dict[str, Any]],
+                                 routes: Optional[Set[str]] = None) -> bool:
         """Check if the question contains a candidate's name"""
         # First check if question has role/skill keywords - if so, it's NOT a specific person query
-        role_keywords = ['role', 'position', 'job', 'engineer', 'developer', 'analyst', 'scientist', 
-                        'manager', 'architect', 'specialist', 'consultant', 'devops', 'qa', 'tester',
-                        'skills', 'experience', 'knows', 'knowledge']
-        
-        for keyword in role_keywords:
-            if re.search(r'\b' + re.escape(keyword) + r'\b', question.lower()):
-                return False  # This is a skills/role query, not a person query
-        
-        # Remove common words
-        question_clean = re.sub(r'\b(show|me|tell|about|who|is|the|profile|full|information|details|good|best|for)\b', '', question)
-        question_clean = question_clean.strip()
+        routes = self._match_routes(question) if routes is None else routes
+        if 'role' in routes:
+            return False  # This is a skills/role query, not a person query
         
-        # Check if at least 2 consecutive words match a candidate name
-        for candidate in candidates:
-            name = candidate.get('name', '').lower()
-            if not name:
-                continue
-            
-            # Split name into words
-            name_words = name.split()
-            
-            # If name has 2+ words and both appear in question
-            if len(name_words) >= 2:
-                if all(word in question for word in name_words):
-                    return True
-            
-            # Or if full name is in question
-            if name in question:
-                return True
-            
-            # Or if single name word appears in specific patterns like "show [name]", "about [name]"
-            for name_word in name_words:
-                if len(name_word) >= 4:  # Only match significant name parts (not "jr", "sr", etc)
-                    if re.search(r'\b(show|tell|about|who is|profile of)\s+' + re.escape(name_word), question):
-                        return True
-        
-        return False
+        # Full name (all name words) in the question, or a significant name word right after
+        # "show", "about", "profile of"... looked up in the name token index
+        return bool(self._name_index(candidates).mentioned(question))
+    
+    def _name_index(self, candidates: List[Dict[str, Any]]) -> NameIndex:
+        """NameIndex of the candidates (the snapshot's, built once per version, when available)"""
+        snapshot = getattr(candidates, 'snapshot', None)
+        if snapshot is not None:
+            return snapshot.name_index()
+        return NameIndex([c.get('name', '') for c in candidates])
+    
+    def _question_embedding(self, question: str) -> np.ndarray:
+        """Embedding of the question, from the LRU cache of recent questions when possible"""
+        with self._embedding_lock:
+            embedding = self._embedding_cache.get(question)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(question)
+        if embedding is not None:
+            CACHE_REQUESTS.inc(cache="rag_question_embeddings", result="hit")
+            return embedding
+        CACHE_REQUESTS.inc(cache="rag_question_embeddings", result="miss")
+        
+        embedding = self._encode([question])[0]
+        with self._embedding_lock:
+            self._embedding_cache[question] = embedding
+            while len(self._embedding_cache) > self._embedding_cache_size:
+                self._embedding_cache.popitem(last=False)
+        return embedding
     
     def _handle_greeting(self, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Handle greeting queries"""
@@ -502,15 +732,31 @@ class RAGAgent:
     
     def _handle_count_query(self, candidates: List[Dict[str, Any]], search_terms: Dict[str, List[str]], question: str) -> Dict[str, Any]:
         """Handle count/statistics queries"""
-        if search_terms['skills']:
-            # Rank candidates based on skill match
-            ranked_candidates = self._rank_candidates(candidates, search_terms, question)
-            skills_str = ', '.join(search_terms['skills'])
+        if search_terms['skills'] or search_terms['excluded_skills']:
+            # Count from the skill bitmap: any named skill, all required, none excluded
+            bitmap, rows = self._skill_bitmap(candidates)
+            bits = bitmap.query(any_of=search_terms['skills'], all_of=search_terms['required_groups'],
+                                none_of=search_terms['excluded_groups'])
+            if search_terms['experience_years']:
+                bits &= np.packbits(self._experience_mask(candidates, rows, bitmap.size,
+                                                          search_terms['experience_years']))
+            in_bitmap = bitmap.mask(bits)[rows]
+            matched = [c for c, found in zip(candidates, in_bitmap) if found]
+            print(f"[RAG Agent] Skill bitmap: {bitmap.count(bits)} of {bitmap.size} candidates match")
+            skills_str = ', '.join(search_terms['skills']) or 'any skills'
+            if search_terms['excluded_skills']:
+                skills_str += f" (but not {', '.join(search_terms['excluded_skills'])})"
             
             # Get unique candidates (in case of duplicates)
-            unique_names = set(c['name'] for c in ranked_candidates)
+            unique_names = set(c['name'] for c in matched)
             unique_count = len(unique_names)
             
+            # Rank the matching candidates for display
+            snapshot = getattr(candidates, 'snapshot', None)
+            if snapshot is not None:
+                matched = SnapshotCandidates(matched, snapshot)
+            ranked_candidates = self._rank_candidates(matched, search_terms, question) if matched else []
+            
             if unique_count == 0:
                 answer = f"I couldn't find any candidates with {skills_str} experience. Would you like me to search for similar skills?"
             elif unique_count == 1:
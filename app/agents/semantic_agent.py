@@ -4,13 +4,14 @@ Semantic Matching Agent
 Uses transformer models for AI-powered semantic similarity between resume and job description
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from .base_agent import BaseAgent
+from app.metrics import MODEL_LOAD_SECONDS, ENCODE_SECONDS, ENCODE_BATCH_SIZE, timer
 from sentence_transformers import SentenceTransformer
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
@@ -31,7 +32,8 @@ class SemanticMatchingAgent(BaseAgent):
         if not self._model_loaded:
             try:
                 self.log("Loading sentence-transformers model (all-MiniLM-L6-v2)...")
-                self.model = SentenceTransformer('all-MiniLM-L6-v2')
+                with timer(MODEL_LOAD_SECONDS, agent=self.name):
+                    self.model = SentenceTransformer('all-MiniLM-L6-v2')
                 self._model_loaded = True
                 self.log("AI model loaded successfully!", "success")
             except Exception as e:
@@ -46,7 +48,9 @@ class SemanticMatchingAgent(BaseAgent):
         Args:
             input_data: {
                 "resume_text": str - Full resume text,
-                "job_description": str - Job description text
+                "job_description": str - Job description text,
+                "keyword_match_score": float (optional) - Already computed
+                                       keyword_match_score() of the same texts
             }
             
         Returns:
@@ -80,8 +84,10 @@ class SemanticMatchingAgent(BaseAgent):
         # Calculate semantic similarity
         semantic_score = self._calculate_semantic_similarity(resume_text, job_description)
         
-        # Calculate keyword-based similarity (TF-IDF)
-        keyword_score = self._calculate_keyword_match(resume_text, job_description)
+        # Calculate keyword-based similarity (TF-IDF) unless the caller already did
+        keyword_score = input_data.get("keyword_match_score")
+        if keyword_score is None:
+            keyword_score = self.keyword_match_score(resume_text, job_description)
         
         self.log(f"Semantic: {semantic_score:.2f}%, Keywords: {keyword_score:.2f}%")
         
@@ -93,6 +99,64 @@ class SemanticMatchingAgent(BaseAgent):
             "model_name": "all-MiniLM-L6-v2" if self.model else "TF-IDF only"
         }
     
+    def score_batch(self, resume_texts: List[str], job_description: str) -> List[Dict[str, Any]]:
+        """
+        Score many resumes against one job description with a single forward pass
+
+        The job description and all resumes are encoded in one model call instead of
+        two calls per resume. Returns one execute()-shaped result per resume, in order.
+        """
+        results = [{
+            "success": False,
+            "error": "Missing required text inputs",
+            "semantic_similarity_score": 0.0,
+            "keyword_match_score": 0.0
+        } for _ in resume_texts]
+        scored = [i for i, text in enumerate(resume_texts) if text] if job_description else []
+        if not scored:
+            self.log("Missing resume_text or job_description", "error")
+            return results
+
+        self.log(f"Analyzing semantic similarity of {len(scored)} resumes "
+                 f"(JD: {len(job_description)} chars)")
+
+        if not self._model_loaded:
+            self._load_model()
+
+        semantic_scores = self._batch_semantic_similarity([resume_texts[i] for i in scored],
+                                                          job_description)
+        for i, semantic_score in zip(scored, semantic_scores):
+            keyword_score = self.keyword_match_score(resume_texts[i], job_description)
+            results[i] = {
+                "success": True,
+                "semantic_similarity_score": round(semantic_score, 2),
+                "keyword_match_score": round(keyword_score, 2),
+                "embedding_dimension": 384 if self.model else None,
+                "model_name": "all-MiniLM-L6-v2" if self.model else "TF-IDF only"
+            }
+        return results
+
+    def _batch_semantic_similarity(self, resume_texts: List[str], job_description: str) -> List[float]:
+        """Semantic similarity of every resume to the JD from one encode call"""
+        if not self.model:
+            self.log("Model not available, returning default score", "warning")
+            return [50.0] * len(resume_texts)
+
+        try:
+            embeddings = self._encode([job_description] + list(resume_texts))
+            similarities = cosine_similarity(embeddings[1:], embeddings[:1])[:, 0]
+            return [max(0.0, min(100.0, float(s * 100))) for s in similarities]
+
+        except Exception as e:
+            self.log(f"Semantic similarity calculation failed: {str(e)}", "error")
+            return [50.0] * len(resume_texts)
+
+    def _encode(self, texts):
+        """Encode texts with the transformer model, recording call time and batch size"""
+        ENCODE_BATCH_SIZE.observe(len(texts), agent=self.name)
+        with timer(ENCODE_SECONDS, agent=self.name):
+            return self.model.encode(texts)
+    
     def _calculate_semantic_similarity(self, resume_text: str, job_description: str) -> float:
         """Calculate semantic similarity using transformer embeddings"""
         if not self.model:
@@ -101,8 +165,8 @@ class SemanticMatchingAgent(BaseAgent):
         
         try:
             # Encode texts to 384-dimensional vectors
-            resume_embedding = self.model.encode([resume_text])
-            jd_embedding = self.model.encode([job_description])
+            resume_embedding = self._encode([resume_text])
+            jd_embedding = self._encode([job_description])
             
             # Calculate cosine similarity
             similarity = cosine_similarity(resume_embedding, jd_embedding)[0][0]
@@ -115,8 +179,8 @@ class SemanticMatchingAgent(BaseAgent):
             self.log(f"Semantic similarity calculation failed: {str(e)}", "error")
             return 50.0
     
-    def _calculate_keyword_match(self, resume_text: str, job_description: str) -> float:
-        """Calculate TF-IDF based keyword matching"""
+    def keyword_match_score(self, resume_text: str, job_description: str) -> float:
+        """TF-IDF keyword match (0-100); cheap, needs no model"""
         try:
             vectorizer = TfidfVectorizer(
                 stop_words='english',
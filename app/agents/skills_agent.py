@@ -61,7 +61,8 @@ class SkillsAssessmentAgent(BaseAgent):
         resume_skills_lower = [s.lower().strip() for s in resume_skills]
         required_skills_lower = [s.lower().strip() for s in required_skills]
         
-        self.log(f"Resume skills: {resume_skills_lower}")
+        if self.log_enabled("debug"):
+            self.log(f"Resume skills: {resume_skills_lower}", "debug")
         
         # Find matches
         matched_skills = []
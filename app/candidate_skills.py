@@ -0,0 +1,127 @@
+"""
+Normalized candidate skills
+
+resume_data.skills is the comma-separated display string written by the parser, so
+skill filters, per-skill counts and role matching had to LIKE-scan it or split it in
+Python for every candidate. candidate_skills (migrations/006_candidate_skills.sql) keeps
+one (candidate_id, skill_id) row per canonical skill of the admin skills table instead,
+written when a resume is saved; skill names and variations ("js", "k8s") resolve to the
+same id, and skills outside the admin vocabulary are not stored.
+
+Resumes saved before the table existed (or before a skill was added to the admin panel)
+are filled by backfill_candidate_skills (POST /api/admin/candidate_skills/backfill).
+
+Role matching (candidate_role_matches) joins canonical ids, so it is exact: a role skill
+counts when the candidate has that skill or one of its variations ("js" counts for
+JavaScript), and no longer when the name merely contains it (JavaScript does not count
+for Java, MySQL not for SQL) as the old substring match of _generate_candidate_profile did.
+
+The other readers of resume_data.skills stay on the string: the orchestrator scores
+freshly parsed resumes before they are saved (no candidate id or rows yet) and agents
+don't query the database, and the RAG chat filters through the snapshot's in-memory
+SkillBitmap, which already is an index and also covers skills outside the admin list.
+"""
+
+from app.database import execute_query, execute_many, fetch_query
+from app.database_config import get_skill_ids, get_role_profiles
+
+# resume_data rows read per backfill batch
+BACKFILL_BATCH_SIZE = 500
+
+INSERT_CANDIDATE_SKILL = "INSERT IGNORE INTO candidate_skills (candidate_id, skill_id) VALUES (%s, %s)"
+
+
+def canonical_skill_ids(skills, skill_ids=None):
+    """
+    Sorted ids of the admin skills named in a skills string or list
+
+    Args:
+        skills: Comma-separated skills string (as stored) or list of skill names
+        skill_ids: {lowercased name or variation: skill id} (default get_skill_ids())
+    """
+    if skill_ids is None:
+        skill_ids = get_skill_ids()
+    if isinstance(skills, str):
+        skills = skills.split(',')
+    names = {skill.strip().lower() for skill in skills or ()}
+    return sorted({skill_ids[name] for name in names if name in skill_ids})
+
+
+def save_candidate_skills(conn, candidate_id, skills):
+    """Replace the candidate_skills rows of one candidate; returns the number of skill ids"""
+    ids = canonical_skill_ids(skills)
+    execute_query(conn, "DELETE FROM candidate_skills WHERE candidate_id = %s", (candidate_id,))
+    execute_many(conn, INSERT_CANDIDATE_SKILL, [(candidate_id, skill_id) for skill_id in ids])
+    return len(ids)
+
+
+def backfill_candidate_skills(conn, batch_size=BACKFILL_BATCH_SIZE):
+    """
+    Rebuild candidate_skills from every stored resume_data row.
+
+    Rows are read in primary key order, batch_size at a time (keyset pagination), and
+    each batch replaces the rows of its candidates, so a candidate with several resumes
+    ends up with the skills of the latest one. Returns (resumes read, skill rows written).
+    """
+    skill_ids = get_skill_ids()
+    last_id, resumes, written = 0, 0, 0
+    while True:
+        rows = fetch_query(conn,
+            "SELECT id, candidate_id, skills FROM resume_data WHERE id > %s ORDER BY id LIMIT %s",
+            (last_id, batch_size))
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+
+        latest = {row['candidate_id']: row['skills'] for row in rows}
+        placeholders = ", ".join(["%s"] * len(latest))
+        execute_query(conn,
+            f"DELETE FROM candidate_skills WHERE candidate_id IN ({placeholders})",
+            tuple(latest))
+        skill_rows = [(candidate_id, skill_id)
+                      for candidate_id, skills in latest.items()
+                      for skill_id in canonical_skill_ids(skills, skill_ids)]
+        execute_many(conn, INSERT_CANDIDATE_SKILL, skill_rows)
+        resumes += len(rows)
+        written += len(skill_rows)
+    return resumes, written
+
+
+def _has_role_profiles():
+    """Whether any active role profile (with skills) is configured"""
+    try:
+        return bool(get_role_profiles())
+    except Exception as e:
+        print(f"Error loading roles from database: {e}")
+        return False
+
+
+def candidate_role_matches(conn, candidate_ids):
+    """
+    Matched skill count per active role for each candidate, in one indexed join:
+    {candidate id: {role name: matching skills}}
+
+    Candidates without candidate_skills rows (not backfilled yet) are left out, so the
+    caller can fall back to matching the skills string; candidates whose skills fit no
+    role map to an empty dict. Without active role profiles every candidate is left
+    out, so the caller's hardcoded fallback roles still apply.
+    """
+    matches = {}
+    candidate_ids = list(dict.fromkeys(candidate_ids))
+    if not candidate_ids or not _has_role_profiles():
+        return matches
+    placeholders = ", ".join(["%s"] * len(candidate_ids))
+    rows = fetch_query(conn,
+        f"""SELECT cs.candidate_id, rp.role_name, COUNT(rp.id) AS matches
+            FROM candidate_skills cs
+            LEFT JOIN role_skills rs ON rs.skill_id = cs.skill_id
+            LEFT JOIN role_profiles rp ON rp.id = rs.role_id AND rp.is_active = 1
+            WHERE cs.candidate_id IN ({placeholders})
+            GROUP BY cs.candidate_id, rp.role_name
+            ORDER BY cs.candidate_id, rp.role_name""",
+        tuple(candidate_ids))
+    for row in rows:
+        roles = matches.setdefault(row['candidate_id'], {})
+        if row['role_name'] is not None:
+            roles[row['role_name']] = int(row['matches'])
+    return matches
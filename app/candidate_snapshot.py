@@ -0,0 +1,387 @@
+"""
+In-process candidate snapshot for the RAG chat
+
+The chat used to pull every candidate (with the full resume text) out of MySQL on each
+question. The snapshot keeps what the chat needs in memory instead, column-wise:
+candidate ids, names, emails, skills (as stored and lowercased), experience years as
+numbers, a truncated resume summary, the analysis scores of every candidate/job pair and
+the profile embeddings computed by the RAG agent.
+
+Each refresh builds a new immutable SnapshotVersion and swaps it in, so a query keeps
+reading the version it started with. Refreshes are incremental: resume_data and
+analysis_results carry updated_at (migrations/005_change_markers.sql), and only rows
+changed since the last refresh are fetched. Deletions are detected from the row counts.
+
+The snapshot also maintains the BM25 inverted index over skills and full resume text
+(app/inverted_index.py): resumes whose updated_at differs from the indexed one are
+re-indexed, deleted candidates dropped, and the index saved to disk. Summaries are
+stored next to the full texts in resume_text (app/resume_text.py); the full texts are
+read only for the resumes the index has to re-index.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from config import Config
+from app.database import fetch_query
+from app.resume_text import load_resume_texts
+from app.inverted_index import InvertedIndex
+from app.skill_bitmap import SkillBitmap
+from app.name_index import NameIndex
+
+# Lowest updated_at, for the first (full) load
+EPOCH = '1970-01-01 00:00:01'
+
+CANDIDATE_COLUMNS = ('id', 'resume_id', 'name', 'email', 'skills', 'skills_lower',
+                     'experience_years', 'summary', 'updated_at')
+SCORE_COLUMNS = ('id', 'candidate_id', 'job_id', 'match_score', 'skill_match_score',
+                 'experience_match_score')
+
+
+class SnapshotCandidates(list):
+    """Candidate dicts of one snapshot version; .snapshot lets the RAG agent reuse its embeddings"""
+
+    def __init__(self, rows, snapshot):
+        super().__init__(rows)
+        self.snapshot = snapshot
+
+
+def _format_years(years):
+    """Display form of the stored FLOAT, e.g. 5 years / 5.5 years"""
+    return f"{years:g} years"
+
+
+def _candidate_columns(rows):
+    """Column arrays from resume rows (one per candidate, latest resume_data row wins)"""
+    latest = {}
+    for row in rows:
+        if row['id'] not in latest or row['resume_id'] > latest[row['id']]['resume_id']:
+            latest[row['id']] = row
+    rows = list(latest.values())
+    skills = [row['skills'] or '' for row in rows]
+    return {
+        'id': np.array([row['id'] for row in rows], dtype=np.int64),
+        'resume_id': np.array([row['resume_id'] for row in rows], dtype=np.int64),
+        'name': np.array([row['name'] or '' for row in rows], dtype=object),
+        'email': np.array([row['email'] or '' for row in rows], dtype=object),
+        'skills': np.array(skills, dtype=object),
+        'skills_lower': np.array([s.lower() for s in skills], dtype=object),
+        'experience_years': np.array([float(row['experience_years'] or 0) for row in rows], dtype=float),
+        'summary': np.array([row['summary'] or '' for row in rows], dtype=object),
+        'updated_at': np.array([row['updated_at'].timestamp() if row.get('updated_at') else 0.0
+                                for row in rows], dtype=float),
+    }
+
+
+def _score_columns(rows):
+    return {
+        'id': np.array([row['id'] for row in rows], dtype=np.int64),
+        'candidate_id': np.array([row['candidate_id'] for row in rows], dtype=np.int64),
+        'job_id': np.array([row['job_description_id'] for row in rows], dtype=np.int64),
+        'match_score': np.array([row['match_score'] for row in rows], dtype=float),
+        'skill_match_score': np.array([row['skill_match_score'] for row in rows], dtype=float),
+        'experience_match_score': np.array([row['experience_match_score'] for row in rows], dtype=float),
+    }
+
+
+def _merge(old, new, alive=None):
+    """
+    Replace/append the rows of `new` in `old` (matched on "id"), drop ids not in
+    `alive` (None keeps all) and return the columns sorted by id plus, for every
+    resulting row, its index in `old` (-1 for new or changed rows)
+    """
+    keep = ~np.isin(old['id'], new['id'])
+    if alive is not None:
+        keep &= np.isin(old['id'], alive)
+    source = np.concatenate([np.flatnonzero(keep), np.full(len(new['id']), -1)])
+    merged = {name: np.concatenate([old[name][keep], new[name]]) for name in old}
+    order = np.argsort(merged['id'], kind='stable')
+    return {name: column[order] for name, column in merged.items()}, source[order]
+
+
+class SnapshotVersion:
+    """
+    One immutable version of the snapshot
+
+    candidates: {column: array} sorted by candidate id (CANDIDATE_COLUMNS)
+    scores: {column: array} one row per analysis_results row (SCORE_COLUMNS)
+    embeddings: float32 matrix aligned with the candidates (filled lazily, see has_embedding)
+    index: InvertedIndex of the candidates' skills and resume text
+    skill bitmap / name index: built from the skills / name column on first use
+    """
+
+    def __init__(self, version, candidates, scores, embeddings=None, has_embedding=None, index=None):
+        self.version = version
+        self.candidates = candidates
+        self.scores = scores
+        self.index = index if index is not None else InvertedIndex()
+        self.size = len(candidates['id'])
+        self.embeddings = embeddings
+        self.has_embedding = has_embedding if has_embedding is not None else np.zeros(self.size, dtype=bool)
+        self._embedding_lock = threading.Lock()
+        self._skill_bitmap = None
+        self._name_index = None
+        self._bitmap_lock = threading.Lock()
+
+    @classmethod
+    def empty(cls, index=None):
+        return cls(0, _candidate_columns([]), _score_columns([]), index=index)
+
+    @classmethod
+    def from_rows(cls, rows, texts, score_rows=()):
+        """
+        Standalone version (no database) from _fetch_candidates-shaped resume rows,
+        their full texts ({resume id: text}) and analysis rows, with the inverted index
+        built over all of them; used by the benchmark
+        """
+        candidates, _ = _merge(_candidate_columns([]), _candidate_columns(rows))
+        documents = [(candidates['id'][row], candidates['updated_at'][row],
+                      f"{candidates['skills'][row]} {texts.get(int(candidates['resume_id'][row]), '')}")
+                     for row in range(len(candidates['id']))]
+        scores, _ = _merge(_score_columns([]), _score_columns(score_rows))
+        return cls(1, candidates, scores, index=InvertedIndex().update(documents))
+
+    def rows_of(self, candidate_ids):
+        """Row index of every candidate id (-1 when not in the snapshot)"""
+        candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+        ids = self.candidates['id']
+        rows = np.searchsorted(ids, candidate_ids)
+        found = rows < self.size
+        found[found] = ids[rows[found]] == candidate_ids[found]
+        return np.where(found, rows, -1)
+
+    def job_scores(self, job_id=None):
+        """
+        (match, skill, experience) score arrays aligned with the candidates: the scores
+        of one job, or each candidate's best score over all jobs; 0 where not analyzed
+        """
+        scores = self.scores
+        mask = np.ones(len(scores['id']), dtype=bool) if job_id is None else scores['job_id'] == int(job_id)
+        rows = self.rows_of(scores['candidate_id'][mask])
+        valid = rows >= 0
+        result = []
+        for column in ('match_score', 'skill_match_score', 'experience_match_score'):
+            values = np.zeros(self.size)
+            np.maximum.at(values, rows[valid], scores[column][mask][valid])
+            result.append(values)
+        return tuple(result)
+
+    def select_rows(self, min_years=None, all_skills=(), none_skills=()):
+        """
+        Bool mask of the candidates with at least min_years whole years of experience,
+        every skill of all_skills and none of none_skills (the RAG plan's hard filters;
+        entries may be alias groups, see SkillBitmap.query)
+        """
+        mask = np.ones(self.size, dtype=bool)
+        if min_years:
+            mask &= np.floor(self.candidates['experience_years']) >= min_years
+        if all_skills or none_skills:
+            bitmap = self.skill_bitmap()
+            mask &= bitmap.mask(bitmap.query(all_of=all_skills, none_of=none_skills))
+        return mask
+
+    def candidate_dicts(self, job_id=None, min_years=None, all_skills=(), none_skills=()):
+        """
+        Candidates in the shape RAGAgent.query() expects, best match score first
+        (scores of job_id when given, else the best score over all jobs); dicts are only
+        built for the candidates passing the hard filters (see select_rows)
+        """
+        match, skill, experience = self.job_scores(job_id)
+        rows = np.flatnonzero(self.select_rows(min_years, all_skills, none_skills))
+        order = rows[np.argsort(-match[rows], kind='stable')]
+        c = self.candidates
+        return SnapshotCandidates([{
+            'id': int(c['id'][i]),
+            'name': c['name'][i],
+            'email': c['email'][i],
+            'skills': c['skills'][i],
+            'experience': _format_years(c['experience_years'][i]),
+            'experience_years': float(c['experience_years'][i]),
+            'summary': c['summary'][i],
+            'match_score': float(match[i]),
+            'skill_match_score': float(skill[i]),
+            'experience_match_score': float(experience[i]),
+            'snapshot_row': int(i)
+        } for i in order], self)
+
+    def skill_bitmap(self):
+        """SkillBitmap over the candidate rows of this version"""
+        with self._bitmap_lock:
+            if self._skill_bitmap is None:
+                self._skill_bitmap = SkillBitmap(self.candidates['skills_lower'])
+            return self._skill_bitmap
+
+    def name_index(self):
+        """NameIndex over the candidate rows of this version"""
+        with self._bitmap_lock:
+            if self._name_index is None:
+                self._name_index = NameIndex(self.candidates['name'])
+            return self._name_index
+
+    def get_embeddings(self, rows):
+        """(matrix of the rows' embeddings, mask of rows that have one)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        with self._embedding_lock:
+            if self.embeddings is None:
+                return None, np.zeros(len(rows), dtype=bool)
+            return self.embeddings[rows], self.has_embedding[rows].copy()
+
+    def store_embeddings(self, rows, vectors):
+        """Cache profile embeddings computed for the given rows"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._embedding_lock:
+            if self.embeddings is None:
+                self.embeddings = np.zeros((self.size, vectors.shape[1]), dtype=np.float32)
+            self.embeddings[rows] = vectors
+            self.has_embedding[rows] = True
+
+
+class CandidateSnapshot:
+    """Versioned, incrementally refreshed candidate snapshot shared by all chat requests"""
+
+    def __init__(self, max_age=None, index_path=None):
+        """
+        Args:
+            max_age: Seconds between change-marker checks (default RAG_SNAPSHOT_MAX_AGE;
+                     0 checks on every query)
+            index_path: Where the inverted index is persisted (default RAG_INDEX_PATH;
+                        empty string keeps it in memory only)
+        """
+        self.max_age = Config.RAG_SNAPSHOT_MAX_AGE if max_age is None else max_age
+        self.index_path = Config.RAG_INDEX_PATH if index_path is None else index_path
+        index = InvertedIndex.load(self.index_path) if self.index_path else None
+        self._current = SnapshotVersion.empty(index)
+        self._markers = None
+        self._checked_at = 0.0
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def current(self):
+        """The latest version (readers keep using the version they got)"""
+        return self._current
+
+    def _read_markers(self, conn):
+        rows = fetch_query(conn, """
+            SELECT (SELECT COUNT(*) FROM resume_data) AS resume_count,
+                   (SELECT MAX(updated_at) FROM resume_data) AS resume_updated,
+                   (SELECT COUNT(*) FROM analysis_results) AS score_count,
+                   (SELECT MAX(updated_at) FROM analysis_results) AS score_updated,
+                   NOW() AS db_now
+        """)
+        if not rows:
+            return None
+        markers = dict(rows[0])
+        # Rows may still be written within the second of the latest change: re-read
+        # that second on the next refresh even if the markers look unchanged
+        db_now = markers.pop('db_now')
+        markers['settled'] = all(markers[key] is None or markers[key] < db_now
+                                 for key in ('resume_updated', 'score_updated'))
+        return markers
+
+    def _fetch_candidates(self, conn, since):
+        """Resume rows changed since the given time, with their stored summaries"""
+        return fetch_query(conn, """
+            SELECT c.id, rd.id AS resume_id, c.name, c.email, rd.skills, rd.experience_years,
+                   rt.summary, rd.updated_at
+            FROM resume_data rd
+            JOIN candidates c ON c.id = rd.candidate_id
+            LEFT JOIN resume_text rt ON rt.resume_id = rd.id
+            WHERE rd.updated_at >= %s
+        """, (since,))
+
+    def _fetch_scores(self, conn, since):
+        return fetch_query(conn, """
+            SELECT id, candidate_id, job_description_id, match_score, skill_match_score,
+                   experience_match_score
+            FROM analysis_results
+            WHERE updated_at >= %s
+        """, (since,))
+
+    def _update_index(self, conn, index, candidates, changed_ids):
+        """
+        Re-index the changed candidates whose resume is newer than the indexed one and
+        drop candidates no longer in the snapshot; returns the (possibly new) index.
+        Full texts are loaded for the re-indexed resumes only.
+        """
+        rows = np.flatnonzero(np.isin(candidates['id'], changed_ids))
+        stale = rows[index.stamps_of(candidates['id'][rows]) != candidates['updated_at'][rows]]
+        removed = index.doc_ids[~np.isin(index.doc_ids, candidates['id'])]
+        if not len(stale) and not len(removed):
+            return index
+
+        texts = load_resume_texts(conn, candidates['resume_id'][stale].tolist())
+        documents = [(candidates['id'][row], candidates['updated_at'][row],
+                      f"{candidates['skills'][row]} {texts.get(int(candidates['resume_id'][row]), '')}")
+                     for row in stale]
+        index = index.update(documents, removed)
+        print(f"[Candidate Snapshot] Inverted index: {len(documents)} resumes indexed, "
+              f"{len(removed)} removed ({index.size} documents, {len(index.postings)} terms)")
+        if self.index_path:
+            try:
+                index.save(self.index_path)
+            except OSError as e:
+                print(f"[Candidate Snapshot] Could not save inverted index: {str(e)}")
+        return index
+
+    def refresh(self, conn, force=False):
+        """
+        Bring the snapshot up to date with the database
+
+        Reads the change markers (row counts and latest updated_at of resume_data and
+        analysis_results) at most every max_age seconds and, when they moved, fetches
+        only the changed rows. Returns the current SnapshotVersion.
+        """
+        if not force and time.time() - self._checked_at < self.max_age:
+            return self._current
+
+        with self._refresh_lock:
+            markers = self._read_markers(conn)
+            self._checked_at = time.time()
+            previous = self._markers
+            if markers is None or (markers == previous and previous['settled']):
+                return self._current
+
+            old = self._current
+            previous = previous or {'resume_updated': None, 'score_updated': None, 'settled': False}
+
+            # Candidates: rows changed since the last refresh, deletions from the count
+            candidates = _candidate_columns([])
+            if markers['resume_updated'] != previous['resume_updated'] or not previous['settled']:
+                rows = self._fetch_candidates(conn, previous['resume_updated'] or EPOCH)
+                candidates = _candidate_columns(rows)
+            alive = None
+            if len(np.union1d(old.candidates['id'], candidates['id'])) != markers['resume_count']:
+                alive = np.array([row['candidate_id'] for row in
+                                  fetch_query(conn, "SELECT candidate_id FROM resume_data")], dtype=np.int64)
+            candidate_columns, source = _merge(old.candidates, candidates, alive)
+            index = self._update_index(conn, old.index, candidate_columns, candidates['id'])
+
+            # Scores: same, keyed by analysis_results.id
+            scores = _score_columns([])
+            if markers['score_updated'] != previous['score_updated'] or not previous['settled']:
+                scores = _score_columns(self._fetch_scores(conn, previous['score_updated'] or EPOCH))
+            alive = None
+            if len(np.union1d(old.scores['id'], scores['id'])) != markers['score_count']:
+                alive = np.array([row['id'] for row in fetch_query(conn, "SELECT id FROM analysis_results")],
+                                 dtype=np.int64)
+            score_columns, _ = _merge(old.scores, scores, alive)
+
+            # Carry over the embeddings of unchanged candidates
+            embeddings = has_embedding = None
+            if old.embeddings is not None:
+                kept = source >= 0
+                embeddings = np.zeros((len(source), old.embeddings.shape[1]), dtype=np.float32)
+                has_embedding = np.zeros(len(source), dtype=bool)
+                with old._embedding_lock:
+                    embeddings[kept] = old.embeddings[source[kept]]
+                    has_embedding[kept] = old.has_embedding[source[kept]]
+
+            self._current = SnapshotVersion(old.version + 1, candidate_columns, score_columns,
+                                            embeddings, has_embedding, index)
+            self._markers = markers
+            print(f"[Candidate Snapshot] v{self._current.version}: {self._current.size} candidates, "
+                  f"{len(score_columns['id'])} scores ({len(candidates['id'])} candidates and "
+                  f"{len(scores['id'])} scores refreshed)")
+            return self._current
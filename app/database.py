@@ -6,14 +6,18 @@ import os
 # Add parent directory to path to import config
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
+from app.metrics import (DB_CONNECT_SECONDS, DB_CONNECT_ERRORS, DB_QUERIES, DB_QUERY_SECONDS,
+                         timer)
 
 def create_connection():
     """Create a database connection"""
     try:
-        connection = mysql.connector.connect(**Config.DB_CONFIG)
+        with timer(DB_CONNECT_SECONDS):
+            connection = mysql.connector.connect(**Config.DB_CONFIG)
         if connection.is_connected():
             return connection
     except Error as e:
+        DB_CONNECT_ERRORS.inc()
         print(f"Error connecting to MySQL: {e}")
         return None
 
@@ -21,28 +25,82 @@ def execute_query(connection, query, params=None):
     """Execute a single query"""
     cursor = connection.cursor()
     try:
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        connection.commit()
+        with timer(DB_QUERY_SECONDS, operation="execute"):
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            connection.commit()
+        DB_QUERIES.inc(operation="execute", status="ok")
         return cursor.lastrowid
     except Error as e:
+        DB_QUERIES.inc(operation="execute", status="error")
         print(f"Error executing query: {e}")
         return None
     finally:
         cursor.close()
 
+def execute_many(connection, query, rows):
+    """Execute one statement for many parameter rows in a single batch"""
+    if not rows:
+        return 0
+    cursor = connection.cursor()
+    try:
+        with timer(DB_QUERY_SECONDS, operation="execute_many"):
+            cursor.executemany(query, rows)
+            connection.commit()
+        DB_QUERIES.inc(operation="execute_many", status="ok")
+        return cursor.rowcount
+    except Error as e:
+        DB_QUERIES.inc(operation="execute_many", status="error")
+        print(f"Error executing batch: {e}")
+        return None
+    finally:
+        cursor.close()
+
+def execute_transaction(connection, statements):
+    """
+    Execute statements on one cursor as a single transaction, rolled back on error.
+    Each statement is (query, params); a list of params rows runs as one batch.
+    Returns True when committed (connections run with autocommit off, so nothing is
+    visible to other sessions before the final commit).
+    """
+    cursor = connection.cursor()
+    try:
+        with timer(DB_QUERY_SECONDS, operation="transaction"):
+            for query, params in statements:
+                if isinstance(params, list):
+                    if params:
+                        cursor.executemany(query, params)
+                elif params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+            connection.commit()
+        DB_QUERIES.inc(operation="transaction", status="ok")
+        return True
+    except Error as e:
+        connection.rollback()
+        DB_QUERIES.inc(operation="transaction", status="error")
+        print(f"Error executing transaction (rolled back): {e}")
+        return False
+    finally:
+        cursor.close()
+
 def fetch_query(connection, query, params=None):
     """Fetch results from a query"""
     cursor = connection.cursor(dictionary=True)
     try:
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        return cursor.fetchall()
+        with timer(DB_QUERY_SECONDS, operation="fetch"):
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            rows = cursor.fetchall()
+        DB_QUERIES.inc(operation="fetch", status="ok")
+        return rows
     except Error as e:
+        DB_QUERIES.inc(operation="fetch", status="error")
         print(f"Error fetching data: {e}")
         return []
     finally:
@@ -4,24 +4,29 @@ This allows dynamic configuration without modifying code
 """
 
 from app.database import create_connection, fetch_query
+from app.metrics import CACHE_REQUESTS
 
 _skills_cache = None
 _variations_cache = None
 _roles_cache = None
+_skill_ids_cache = None
 
 def clear_cache():
     """Clear all cached data - call this when data is updated via admin panel"""
-    global _skills_cache, _variations_cache, _roles_cache
+    global _skills_cache, _variations_cache, _roles_cache, _skill_ids_cache
     _skills_cache = None
     _variations_cache = None
     _roles_cache = None
+    _skill_ids_cache = None
 
 def get_all_skills():
     """Get all active skills from database"""
     global _skills_cache
     
     if _skills_cache is not None:
+        CACHE_REQUESTS.inc(cache="skills", result="hit")
         return _skills_cache
+    CACHE_REQUESTS.inc(cache="skills", result="miss")
     
     conn = create_connection()
     query = """
@@ -44,7 +49,9 @@ def get_skill_variations():
     global _variations_cache
     
     if _variations_cache is not None:
+        CACHE_REQUESTS.inc(cache="skill_variations", result="hit")
         return _variations_cache
+    CACHE_REQUESTS.inc(cache="skill_variations", result="miss")
     
     conn = create_connection()
     query = """
@@ -68,12 +75,46 @@ def get_skill_variations():
     
     return _variations_cache
 
+def get_skill_ids():
+    """Get {lowercased skill name or variation: skill id} of all active skills"""
+    global _skill_ids_cache
+    
+    if _skill_ids_cache is not None:
+        CACHE_REQUESTS.inc(cache="skill_ids", result="hit")
+        return _skill_ids_cache
+    CACHE_REQUESTS.inc(cache="skill_ids", result="miss")
+    
+    conn = create_connection()
+    query = """
+        SELECT s.id, s.skill_name AS name, 0 AS is_variation
+        FROM skills s
+        WHERE s.is_active = 1
+        UNION ALL
+        SELECT s.id, sv.variation_name, 1
+        FROM skill_variations sv
+        JOIN skills s ON sv.skill_id = s.id
+        WHERE s.is_active = 1 AND sv.is_active = 1
+        ORDER BY is_variation
+    """
+    
+    results = fetch_query(conn, query)
+    conn.close()
+    
+    # A skill name wins over another skill's variation of the same spelling
+    _skill_ids_cache = {}
+    for row in results:
+        _skill_ids_cache.setdefault(row['name'].lower(), row['id'])
+    
+    return _skill_ids_cache
+
 def get_role_profiles():
     """Get all role profiles with their associated skills"""
     global _roles_cache
     
     if _roles_cache is not None:
+        CACHE_REQUESTS.inc(cache="role_profiles", result="hit")
         return _roles_cache
+    CACHE_REQUESTS.inc(cache="role_profiles", result="miss")
     
     conn = create_connection()
     query = """
@@ -0,0 +1,147 @@
+"""
+Employment timeline of one resume
+
+Built once while parsing from the date ranges outside the education section, stored
+on resume_data['employment_timeline'] (and in resume_data.employment_timeline in the
+database) as JSON. Experience years, the job hopping check and the career gap check
+all read it, so re-matching a saved candidate never scans the resume text for dates.
+
+Dates are month indexes (year * 12 + month - 1) and intervals are half-open
+[start, end). A bare start year counts from January and a bare end year ends in
+January of that year, so "2015 - 2018" is three years; a month on the end date
+includes that month. Present/current positions end at the current month whenever the
+timeline is loaded.
+"""
+
+from datetime import datetime
+import json
+
+from app.resume_sections import ResumeSections
+from app.resume_patterns import find_employment_periods
+
+# Date ranges starting earlier are treated as noise, not employment
+EARLIEST_YEAR = 1960
+
+
+def month_index(year, month=1):
+    return year * 12 + month - 1
+
+
+def format_month(index):
+    """Storage form, e.g. 2019-03"""
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def parse_month(value):
+    year, month = value.split('-')
+    return month_index(int(year), int(month))
+
+
+def current_month_end():
+    """Exclusive end of a position that is still ongoing"""
+    now = datetime.now()
+    return month_index(now.year, now.month) + 1
+
+
+def describe_month(index):
+    """Display form: the year alone for January (where bare years land), else Mar 2019"""
+    if index % 12 == 0:
+        return str(index // 12)
+    return datetime(index // 12, index % 12 + 1, 1).strftime('%b %Y')
+
+
+class EmploymentTimeline:
+    """Positions of one resume plus their sorted, merged intervals"""
+
+    def __init__(self, positions=None):
+        """
+        Args:
+            positions: [{"start", "end", "current", "span"}] with month indexes
+        """
+        self.positions = sorted(positions or [], key=lambda p: (p['start'], p['end']))
+        self.intervals = self._merge()
+
+    def _merge(self):
+        """Union of the positions as sorted, non-overlapping [start, end) intervals"""
+        intervals = []
+        for position in self.positions:
+            if intervals and position['start'] <= intervals[-1][1]:
+                intervals[-1][1] = max(intervals[-1][1], position['end'])
+            else:
+                intervals.append([position['start'], position['end']])
+        return intervals
+
+    @classmethod
+    def from_periods(cls, periods):
+        """Timeline from find_employment_periods output (education ranges excluded)"""
+        positions = []
+        for period in periods:
+            if period['section'] == 'education' or period['start'] < EARLIEST_YEAR:
+                continue
+            start = month_index(period['start'], period['start_month'] or 1)
+            if period['current']:
+                end = current_month_end()
+            elif period['end_month']:
+                end = month_index(period['end'], period['end_month']) + 1
+            else:
+                end = month_index(period['end'])
+            if end >= start:  # Valid range
+                positions.append({'start': start, 'end': end, 'current': period['current'],
+                                  'span': period['span']})
+        return cls(positions)
+
+    @classmethod
+    def from_text(cls, text, sections=None):
+        return cls.from_periods(find_employment_periods(text, sections))
+
+    @classmethod
+    def from_dict(cls, data):
+        """Load the stored JSON (str or already decoded)"""
+        if isinstance(data, (str, bytes)):
+            data = json.loads(data)
+        positions = []
+        for position in data.get('positions', []):
+            positions.append({
+                'start': parse_month(position['start']),
+                'end': current_month_end() if position['current'] else parse_month(position['end']),
+                'current': position['current'],
+                'span': position.get('span')
+            })
+        return cls(positions)
+
+    @classmethod
+    def from_resume_data(cls, resume_data, sections=None):
+        """Reuse the timeline stored on resume_data (built from raw_text if absent)"""
+        stored = resume_data.get('employment_timeline')
+        if stored:
+            return cls.from_dict(stored)
+        text = resume_data.get('raw_text') or ''
+        return cls.from_text(text, sections or ResumeSections.from_resume_data(resume_data))
+
+    def to_dict(self):
+        """JSON-serialisable form, stored on resume_data['employment_timeline']"""
+        return {
+            'positions': [{'start': format_month(p['start']), 'end': format_month(p['end']),
+                           'current': p['current'], 'span': p['span']} for p in self.positions],
+            'intervals': [[format_month(start), format_month(end)] for start, end in self.intervals]
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def total_months(self):
+        """Months covered by at least one position (overlaps counted once)"""
+        return sum(end - start for start, end in self.intervals)
+
+    def experience_years(self):
+        return round(self.total_months() / 12, 1)
+
+    def tenures(self):
+        """Length of every position in years"""
+        return [(p['end'] - p['start']) / 12 for p in self.positions]
+
+    def gaps(self):
+        """[(gap_start, gap_end, months)] between consecutive merged intervals"""
+        return [(self.intervals[i][1], self.intervals[i + 1][0],
+                 self.intervals[i + 1][0] - self.intervals[i][1])
+                for i in range(len(self.intervals) - 1)]
@@ -0,0 +1,199 @@
+"""
+Inverted index with BM25 scoring for the RAG chat's keyword retrieval
+
+Indexes every candidate's skills and full resume text. Postings are kept per term as
+sorted candidate id arrays with matching term frequencies, so the candidates containing
+any query term are a union of a few arrays and BM25 is a handful of vectorized
+operations per term instead of a substring scan over every candidate.
+
+An InvertedIndex is never modified in place: update() returns a new index sharing the
+postings of untouched terms, so a chat query keeps reading the index it started with
+while the candidate snapshot refreshes. The index is persisted to RAG_INDEX_PATH (one
+.npz file) and reloaded on start, after which only changed resumes are re-indexed.
+"""
+
+import os
+
+import numpy as np
+
+from app.resume_patterns import INDEX_TERM
+
+# BM25 parameters (term frequency saturation and document length normalization)
+K1 = 1.5
+B = 0.75
+
+_EMPTY_IDS = np.zeros(0, dtype=np.int64)
+_EMPTY_TFS = np.zeros(0, dtype=np.int32)
+
+
+def tokenize(text):
+    """Index terms of a text (lowercased word tokens)"""
+    return INDEX_TERM.findall((text or '').lower())
+
+
+class InvertedIndex:
+    """
+    Term -> postings index over candidate documents
+
+    postings: {term: (sorted candidate ids, term frequencies)}
+    doc_ids / doc_lengths / doc_stamps: sorted candidate ids, their token counts and
+        the resume updated_at (epoch seconds) they were indexed from
+    doc_terms: {candidate id: terms of the document} to drop its postings on update
+    """
+
+    def __init__(self, postings=None, doc_ids=None, doc_lengths=None, doc_stamps=None, doc_terms=None):
+        self.postings = postings if postings is not None else {}
+        self.doc_ids = doc_ids if doc_ids is not None else _EMPTY_IDS
+        self.doc_lengths = doc_lengths if doc_lengths is not None else np.zeros(0, dtype=np.int32)
+        self.doc_stamps = doc_stamps if doc_stamps is not None else np.zeros(0)
+        self.doc_terms = doc_terms if doc_terms is not None else {}
+        self.size = len(self.doc_ids)
+        self.average_length = float(self.doc_lengths.mean()) if self.size else 0.0
+
+    def stamps_of(self, candidate_ids):
+        """Indexed updated_at of every candidate id (NaN when not indexed)"""
+        candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+        rows = np.searchsorted(self.doc_ids, candidate_ids)
+        found = rows < self.size
+        found[found] = self.doc_ids[rows[found]] == candidate_ids[found]
+        stamps = np.full(len(candidate_ids), np.nan)
+        stamps[found] = self.doc_stamps[rows[found]]
+        return stamps
+
+    def update(self, documents=(), removed=()):
+        """
+        New index with documents (re)indexed and removed ids dropped
+
+        Args:
+            documents: (candidate id, updated_at epoch seconds, text) tuples
+            removed: Candidate ids to drop from the index
+        """
+        documents = list(documents)
+        dropped = {int(i) for i in removed} | {int(doc_id) for doc_id, _, _ in documents}
+        dropped &= self.doc_terms.keys()
+
+        # Term frequencies of the new documents, grouped by term
+        additions = {}
+        doc_terms = dict(self.doc_terms)
+        lengths = {}
+        for doc_id, _, text in documents:
+            tokens = tokenize(text)
+            terms, counts = np.unique(np.array(tokens, dtype=str), return_counts=True)
+            doc_terms[int(doc_id)] = terms
+            lengths[int(doc_id)] = len(tokens)
+            for term, count in zip(terms.tolist(), counts.tolist()):
+                additions.setdefault(term, ([], []))
+                additions[term][0].append(int(doc_id))
+                additions[term][1].append(count)
+
+        # Only the postings of terms in dropped or added documents change
+        postings = dict(self.postings)
+        dropped_ids = np.array(sorted(dropped), dtype=np.int64)
+        touched = set(additions)
+        for doc_id in dropped:
+            touched.update(self.doc_terms[doc_id].tolist())
+            if doc_id not in lengths:
+                del doc_terms[doc_id]
+        for term in touched:
+            ids, tfs = postings.get(term, (_EMPTY_IDS, _EMPTY_TFS))
+            if len(dropped_ids):
+                keep = ~np.isin(ids, dropped_ids)
+                ids, tfs = ids[keep], tfs[keep]
+            if term in additions:
+                ids = np.concatenate([ids, np.array(additions[term][0], dtype=np.int64)])
+                tfs = np.concatenate([tfs, np.array(additions[term][1], dtype=np.int32)])
+                order = np.argsort(ids, kind='stable')
+                ids, tfs = ids[order], tfs[order]
+            if len(ids):
+                postings[term] = (ids, tfs)
+            else:
+                postings.pop(term, None)
+
+        # Document statistics, sorted by id
+        keep = ~np.isin(self.doc_ids, dropped_ids)
+        new_ids = np.array([int(doc_id) for doc_id, _, _ in documents], dtype=np.int64)
+        doc_ids = np.concatenate([self.doc_ids[keep], new_ids])
+        doc_lengths = np.concatenate([self.doc_lengths[keep],
+                                      np.array([lengths[int(i)] for i in new_ids], dtype=np.int32)])
+        doc_stamps = np.concatenate([self.doc_stamps[keep],
+                                     np.array([float(stamp) for _, stamp, _ in documents])])
+        order = np.argsort(doc_ids, kind='stable')
+        return InvertedIndex(postings, doc_ids[order], doc_lengths[order], doc_stamps[order], doc_terms)
+
+    def idf(self, term):
+        """BM25 inverse document frequency of a term (0 when no document contains it)"""
+        ids, _ = self.postings.get(term, (_EMPTY_IDS, _EMPTY_TFS))
+        if not len(ids):
+            return 0.0
+        return float(np.log(1 + (self.size - len(ids) + 0.5) / (len(ids) + 0.5)))
+
+    def union(self, terms):
+        """Sorted ids of the candidates containing at least one of the terms"""
+        arrays = [self.postings[term][0] for term in set(terms) if term in self.postings]
+        if not arrays:
+            return _EMPTY_IDS
+        return np.unique(np.concatenate(arrays))
+
+    def score(self, terms):
+        """
+        BM25 score of every candidate containing a query term
+
+        Returns (sorted candidate ids, scores); a term repeated in the query counts once
+        per repetition.
+        """
+        ids = self.union(terms)
+        scores = np.zeros(len(ids))
+        if not len(ids):
+            return ids, scores
+        lengths = self.doc_lengths[np.searchsorted(self.doc_ids, ids)]
+        norm = K1 * (1 - B + B * lengths / self.average_length)
+        for term in terms:
+            if term not in self.postings:
+                continue
+            term_ids, tfs = self.postings[term]
+            rows = np.searchsorted(ids, term_ids)
+            scores[rows] += self.idf(term) * tfs * (K1 + 1) / (tfs + norm[rows])
+        return ids, scores
+
+    def save(self, path):
+        """Write the index to one .npz file (atomically replaced)"""
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        terms = sorted(self.postings)
+        posting_lengths = [len(self.postings[term][0]) for term in terms]
+        doc_terms = [self.doc_terms[int(doc_id)] for doc_id in self.doc_ids]
+        tmp = path + '.tmp.npz'
+        np.savez(
+            tmp,
+            terms=np.array(terms, dtype=str),
+            posting_offsets=np.concatenate([[0], np.cumsum(posting_lengths)]).astype(np.int64),
+            posting_ids=np.concatenate([self.postings[t][0] for t in terms] or [_EMPTY_IDS]),
+            posting_tfs=np.concatenate([self.postings[t][1] for t in terms] or [_EMPTY_TFS]),
+            doc_ids=self.doc_ids,
+            doc_lengths=self.doc_lengths,
+            doc_stamps=self.doc_stamps,
+            doc_term_offsets=np.concatenate([[0], np.cumsum([len(t) for t in doc_terms])]).astype(np.int64),
+            doc_term_list=np.concatenate(doc_terms or [np.zeros(0, dtype=str)]).astype(str),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Index saved by save(), or an empty index when the file is missing or unreadable"""
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                offsets = data['posting_offsets']
+                posting_ids, posting_tfs = data['posting_ids'], data['posting_tfs']
+                postings = {term: (posting_ids[offsets[i]:offsets[i + 1]], posting_tfs[offsets[i]:offsets[i + 1]])
+                            for i, term in enumerate(data['terms'].tolist())}
+                doc_ids = data['doc_ids']
+                term_offsets, term_list = data['doc_term_offsets'], data['doc_term_list']
+                doc_terms = {int(doc_id): term_list[term_offsets[i]:term_offsets[i + 1]]
+                             for i, doc_id in enumerate(doc_ids)}
+                return cls(postings, doc_ids, data['doc_lengths'], data['doc_stamps'], doc_terms)
+        except Exception as e:
+            print(f"[Inverted Index] Could not load {path}: {str(e)}")
+            return cls()
@@ -0,0 +1,245 @@
+"""
+In-process metrics registry
+
+Counters, gauges and histograms kept in memory and rendered in the Prometheus text
+exposition format by the /metrics route. Updating a series is a dict lookup and an
+addition under a per-metric lock, cheap enough to stay on permanently.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from contextlib import contextmanager
+import threading
+import time
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Common label handling for all metric types"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}",
+                 f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in items]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution with a running sum and count"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # [per-bucket counts..., sum, count]
+                series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+@contextmanager
+def timer(histogram: Histogram, **labels):
+    """Observe the wall time of the with-block in a histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+
+class MetricsRegistry:
+    """Holds every metric of the process; metric names are unique"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing  # Module reloads re-declare the same metric
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Optional[Sequence[float]] = None) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+# ---- Agents ----
+AGENT_EXECUTIONS = registry.counter(
+    "agent_executions_total", "Agent executions by outcome", ["agent", "status"])
+AGENT_DURATION = registry.histogram(
+    "agent_execution_seconds", "Agent execution time", ["agent"])
+
+# ---- Cascade scoring ----
+CASCADE_EVALUATIONS = registry.counter(
+    "cascade_evaluations_total", "Cascade decisions on the semantic stage", ["result"])
+CASCADE_TIME_SAVED = registry.counter(
+    "cascade_time_saved_seconds_total", "Estimated semantic stage time skipped by pruning")
+
+# ---- Resumes ----
+RESUMES_PROCESSED = registry.counter(
+    "resumes_processed_total", "Resumes analysed and saved", ["route"])
+RESUME_FAILURES = registry.counter(
+    "resume_parse_failures_total", "Resumes that could not be analysed", ["route", "reason"])
+
+# ---- Model ----
+MODEL_LOAD_SECONDS = registry.histogram(
+    "model_load_seconds", "Sentence-transformer model load time", ["agent"],
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+ENCODE_SECONDS = registry.histogram(
+    "model_encode_seconds", "Sentence-transformer encode call time", ["agent"])
+ENCODE_BATCH_SIZE = registry.histogram(
+    "model_encode_batch_size", "Texts per encode call", ["agent"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+
+# ---- Database ----
+DB_CONNECT_SECONDS = registry.histogram(
+    "db_connection_wait_seconds", "Time to obtain a database connection")
+DB_CONNECT_ERRORS = registry.counter(
+    "db_connection_errors_total", "Failed database connection attempts")
+DB_QUERIES = registry.counter(
+    "db_queries_total", "Database statements by helper and outcome", ["operation", "status"])
+DB_QUERY_SECONDS = registry.histogram(
+    "db_query_seconds", "Database statement time", ["operation"])
+
+# ---- Caches ----
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "Cache lookups by result (hit ratio = hit / total)", ["cache", "result"])
+
+# ---- HTTP ----
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route and status", ["route", "method", "status"])
+HTTP_LATENCY = registry.histogram(
+    "http_request_seconds", "HTTP request latency", ["route", "method"])
+HTTP_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "Requests currently being handled")
@@ -0,0 +1,51 @@
+"""
+Candidate name index for routing RAG chat questions
+
+Maps every name token to the candidates whose name contains it, so deciding whether a
+question names a candidate ("tell me about Jane Doe", "show Priya") only looks up the
+question's own tokens instead of scanning every candidate name.
+"""
+
+import re
+
+_TOKEN = re.compile(r'\w+')
+# Word right after a "show"/"about"-style lead-in (lookahead, so "tell about x" sees both)
+_LEAD_IN = re.compile(r'\b(?:show|tell|about|who is|profile of)\s+(?=(\w+))')
+
+# Shortest name token a lead-in alone identifies (skips "jr", "sr", initials)
+MIN_LEAD_IN_TOKEN = 4
+
+
+class NameIndex:
+    """Name token -> candidate positions"""
+
+    def __init__(self, names):
+        """
+        Args:
+            names: Candidate names, the position in the list is the candidate's id here
+        """
+        self.postings = {}
+        self.token_counts = []
+        for position, name in enumerate(names):
+            tokens = set(_TOKEN.findall((name or '').lower()))
+            self.token_counts.append(len(tokens))
+            for token in tokens:
+                self.postings.setdefault(token, []).append(position)
+
+    def mentioned(self, question_lower):
+        """
+        Positions of the candidates the question names: every token of the name appears
+        in the question, or a name token of MIN_LEAD_IN_TOKEN+ letters follows a lead-in
+        such as "show", "about" or "profile of"
+        """
+        tokens = set(_TOKEN.findall(question_lower))
+        found = {}
+        for token in tokens:
+            for position in self.postings.get(token, ()):
+                found[position] = found.get(position, 0) + 1
+        mentioned = {position for position, count in found.items() if count == self.token_counts[position]}
+        for match in _LEAD_IN.finditer(question_lower):
+            token = match.group(1)
+            if len(token) >= MIN_LEAD_IN_TOKEN:
+                mentioned.update(self.postings.get(token, ()))
+        return mentioned
@@ -0,0 +1,136 @@
+"""
+Opt-in profiling of single orchestrator runs
+
+A request with the X-Profile: 1 header or a profile=1 query/form flag runs the
+orchestrator under cProfile. Pipeline stages then run in the request thread so the
+profile covers parsing, skills, semantic matching and red flag detection. Stats are
+kept per run id (summary in memory, raw .prof file in PROFILE_FOLDER) and shown at
+/admin/profiles.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+import cProfile
+import io
+import os
+import pstats
+import threading
+
+from config import Config
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_FLAG = "profile"
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+# Files whose functions are highlighted as application hot spots
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_requested(request) -> bool:
+    """True when the request asks for a profiled run (header or query/form flag)"""
+    if not Config.PROFILING_ENABLED:
+        return False
+    value = request.headers.get(PROFILE_HEADER) or request.values.get(PROFILE_FLAG) or ""
+    return value.lower() in TRUE_VALUES
+
+
+def _function_label(func):
+    filename, line, name = func
+    if filename == "~":
+        return name  # built-in, e.g. <method 'search' of 're.Pattern' objects>
+    path = os.path.relpath(filename, PROJECT_ROOT) if filename.startswith(PROJECT_ROOT) else filename
+    return f"{path}:{line}({name})"
+
+
+def summarize(profile: cProfile.Profile, limit: int = 40):
+    """Top functions by cumulative and by own time, plus the pstats text report"""
+    stats = pstats.Stats(profile)
+    rows = []
+    for func, (primitive_calls, total_calls, own_time, cumulative_time, _) in stats.stats.items():
+        rows.append({
+            "function": _function_label(func),
+            "calls": total_calls,
+            "primitive_calls": primitive_calls,
+            "own_time": round(own_time, 6),
+            "cumulative_time": round(cumulative_time, 6),
+            "app_code": func[0].startswith(PROJECT_ROOT)
+        })
+
+    report = io.StringIO()
+    stats.stream = report
+    stats.sort_stats("cumulative").print_stats(limit)
+
+    return {
+        "total_calls": stats.total_calls,
+        "total_time": round(stats.total_tt, 4),
+        "top_cumulative": sorted(rows, key=lambda r: r["cumulative_time"], reverse=True)[:limit],
+        "top_own_time": sorted(rows, key=lambda r: r["own_time"], reverse=True)[:limit],
+        "report": report.getvalue()
+    }
+
+
+class ProfileStore:
+    """Most recent profiles keyed by orchestrator run id (bounded, oldest evicted)"""
+
+    def __init__(self, max_profiles=20, folder=None):
+        self.max_profiles = max_profiles
+        self.folder = folder
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def profile_run(self, orchestrator, input_data, route, label=""):
+        """
+        Run orchestrator.execute under cProfile and store the stats by run id
+
+        Returns:
+            The orchestrator result with "profile_run_id" added
+        """
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            result = orchestrator.execute({**input_data, "sequential": True})
+        finally:
+            profile.disable()
+
+        run_id = result["run_id"]
+        entry = {
+            "run_id": run_id,
+            "route": route,
+            "label": label,
+            "created_at": datetime.now(),
+            "success": result.get("success", False),
+            "execution_time": result.get("total_execution_time"),
+            "prof_file": self._dump(profile, run_id),
+            **summarize(profile)
+        }
+
+        with self._lock:
+            self._profiles[run_id] = entry
+            while len(self._profiles) > self.max_profiles:
+                _, evicted = self._profiles.popitem(last=False)
+                if evicted["prof_file"] and os.path.exists(evicted["prof_file"]):
+                    os.remove(evicted["prof_file"])
+
+        result["profile_run_id"] = run_id
+        return result
+
+    def _dump(self, profile, run_id):
+        """Write the raw stats (loadable with pstats / snakeviz) when a folder is set"""
+        if not self.folder:
+            return None
+        os.makedirs(self.folder, exist_ok=True)
+        path = os.path.join(self.folder, f"{run_id}.prof")
+        profile.dump_stats(path)
+        return path
+
+    def get(self, run_id):
+        with self._lock:
+            return self._profiles.get(run_id)
+
+    def list(self):
+        """Stored profiles, newest first"""
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+
+profiles = ProfileStore(Config.PROFILE_STORE_SIZE, Config.PROFILE_FOLDER)
@@ -0,0 +1,90 @@
+"""
+Question-level result cache for the RAG chat
+
+Recruiters ask the same questions many times a day. Answers are cached by normalized
+question, job id and the candidate snapshot version, LRU-evicted past RAG_CACHE_SIZE
+entries and expired after RAG_CACHE_TTL seconds. Any candidate insert, delete or
+re-analysis moves the snapshot to a new version, so older answers are never served
+again (and are dropped when the first answer of the new version is stored).
+
+Hits and misses are counted in cache_requests_total{cache="rag_questions"}.
+"""
+
+from collections import OrderedDict
+import re
+import threading
+import time
+
+from config import Config
+from app.metrics import CACHE_REQUESTS
+
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_question(question):
+    """Cache form of a question: lowercased, single-spaced, no trailing ?!. """
+    return _SPACES.sub(' ', question.lower()).strip().rstrip('?!. ')
+
+
+class QuestionCache:
+    """LRU/TTL cache of RAGAgent.query() results"""
+
+    def __init__(self, max_size=None, ttl=None):
+        """
+        Args:
+            max_size: Answers kept (default RAG_CACHE_SIZE; 0 disables the cache)
+            ttl: Seconds an answer is served (default RAG_CACHE_TTL)
+        """
+        self.max_size = Config.RAG_CACHE_SIZE if max_size is None else max_size
+        self.ttl = Config.RAG_CACHE_TTL if ttl is None else ttl
+        self._entries = OrderedDict()
+        self._version = None
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, question, job_id, version):
+        """Cached result for the question, or None"""
+        if not self.max_size:
+            return None
+        key = (normalize_question(question), job_id, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                CACHE_REQUESTS.inc(cache="rag_questions", result="miss")
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        CACHE_REQUESTS.inc(cache="rag_questions", result="hit")
+        return {**entry[1], 'question': question}
+
+    def put(self, question, job_id, version, result):
+        """Store a result, dropping answers of older snapshot versions"""
+        if not self.max_size:
+            return
+        key = (normalize_question(question), job_id, version)
+        with self._lock:
+            if self._version is not None and version < self._version:
+                return  # answered from a snapshot that has since been replaced
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._entries[key] = (time.time(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """Entries, hits, misses and hit ratio since start"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / total, 3) if total else 0.0
+            }
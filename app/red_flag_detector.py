@@ -1,228 +1,279 @@
-import re
-from datetime import datetime
+"""
+Red flag detection
 
-class RedFlagDetector:
-    def __init__(self):
-        self.flags = []
-    
-    def detect_all_flags(self, resume_data, job_description):
-        """Detect all red flags in the resume"""
-        self.flags = []
-        
-        self._check_job_hopping(resume_data['raw_text'])
-        self._check_career_gaps(resume_data['raw_text'])
-        self._check_missing_skills(resume_data['skills'], job_description)
-        self._check_irrelevant_experience(resume_data['job_titles'], job_description)
-        self._check_minimal_experience(resume_data['experience_years'], job_description)
-        
-        return self.flags
-    
-    def _check_job_hopping(self, resume_text):
-        """Detect frequent job changes"""
-        # Find all year ranges
-        year_patterns = re.findall(r'(20\d{2})\s*[-–—]\s*(20\d{2}|present|current)', resume_text.lower())
-        
-        if len(year_patterns) >= 4:
-            # Calculate average tenure
-            tenures = []
-            for start, end in year_patterns:
-                end_year = datetime.now().year if end.lower() in ['present', 'current'] else int(end)
-                tenure = end_year - int(start)
-                tenures.append(tenure)
-            
-            if tenures:
-                avg_tenure = sum(tenures) / len(tenures)
-                if avg_tenure < 1.5:
-                    self.flags.append({
-                        'type': 'Job Hopping',
-                        'severity': 'High',
-                        'description': f'Frequent job changes detected. Average tenure: {avg_tenure:.1f} years across {len(tenures)} positions.'
-                    })
-                elif avg_tenure < 2.5:
-                    self.flags.append({
-                        'type': 'Job Hopping',
-                        'severity': 'Medium',
-                        'description': f'Short job tenure detected. Average: {avg_tenure:.1f} years.'
-                    })
-    
-    def _check_career_gaps(self, resume_text):
-        """Detect unexplained gaps in employment"""
-        # Skip if resume text is empty or too short
-        if not resume_text or len(resume_text.strip()) < 50:
-            return
-        
-        # Split resume into sections
-        lines = resume_text.split('\n')
-        
-        # Find employment date ranges, excluding education section
-        employment_periods = []
-        in_education_section = False
-        in_experience_section = False
-        
-        for i, line in enumerate(lines):
-            line_lower = line.lower().strip()
-            
-            # Detect section headers
-            if any(keyword in line_lower for keyword in ['education', 'academic', 'qualification']):
-                in_education_section = True
-                in_experience_section = False
-            elif any(keyword in line_lower for keyword in ['experience', 'employment', 'work history', 'career']):
-                in_experience_section = True
-                in_education_section = False
-            elif line_lower and any(keyword in line_lower for keyword in ['skills', 'certifications', 'projects']):
-                in_education_section = False
-                in_experience_section = False
-            
-            # Only extract dates from experience section or if no clear sections
-            if not in_education_section:
-                year_matches = re.findall(r'(20\d{2}|19\d{2})\s*[-–—]\s*(20\d{2}|present|current)', line.lower())
-                for start, end in year_matches:
-                    start_year = int(start)
-                    end_year = datetime.now().year if end.lower() in ['present', 'current'] else int(end)
-                    if end_year >= start_year and start_year >= 1990:  # Valid employment date range
-                        employment_periods.append((start_year, end_year))
-        
-        if len(employment_periods) < 2:
-            return  # Need at least 2 jobs to check for gaps
-        
-        # Sort by start year
-        employment_periods.sort()
-        
-        # Merge overlapping periods to handle concurrent jobs or education-work overlap
-        merged_periods = []
-        for start, end in employment_periods:
-            if merged_periods and start <= merged_periods[-1][1] + 1:
-                # Overlapping or adjacent (within 1 year) - merge
-                merged_periods[-1] = (merged_periods[-1][0], max(merged_periods[-1][1], end))
+Rules are evaluated column-wise with NumPy over a batch of candidates: timelines,
+experience years, skill sets and job titles are packed into arrays once and every rule
+is a handful of array operations over the whole batch. The engine keeps no per-call
+state, so one detector can be shared across threads, and re-flagging all stored
+candidates after a threshold change needs no parsing or pipeline run.
+"""
+
+import numpy as np
+
+from config import Config
+from app.resume_patterns import JD_REQUIRED_EXPERIENCE, JD_WORD
+from app.employment_timeline import EmploymentTimeline, describe_month
+from app.resume_text import text_length
+
+# Flags that do not depend on a job description (kept for bulk uploads)
+JOB_INDEPENDENT_FLAGS = ('Job Hopping', 'Career Gap')
+
+CRITICAL_KEYWORDS = ['required', 'must have', 'essential', 'mandatory']
+ROLE_KEYWORDS = ['engineer', 'developer', 'analyst', 'manager', 'designer',
+                 'architect', 'consultant', 'scientist', 'specialist', 'lead']
+
+# Career gap checks need a real resume, not a stub
+MIN_TEXT_LENGTH = 50
+
+
+class RedFlagRules:
+    """Rule thresholds; defaults from the RED_FLAG_* settings, any of them can be overridden"""
+
+    def __init__(self, **overrides):
+        defaults = {
+            'min_positions': Config.RED_FLAG_MIN_POSITIONS,
+            'short_tenure_years': Config.RED_FLAG_SHORT_TENURE_YEARS,
+            'very_short_tenure_years': Config.RED_FLAG_VERY_SHORT_TENURE_YEARS,
+            'gap_months': Config.RED_FLAG_GAP_MONTHS,
+            'long_gap_months': Config.RED_FLAG_LONG_GAP_MONTHS,
+            'experience_ratio': Config.RED_FLAG_EXPERIENCE_RATIO
+        }
+        unknown = set(overrides) - set(defaults)
+        if unknown:
+            raise ValueError(f"Unknown red flag rules: {', '.join(sorted(unknown))}")
+        for name, default in defaults.items():
+            setattr(self, name, type(default)(overrides.get(name, default)))
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def _skill_set(skills):
+    if not skills or skills == 'Not specified':
+        return set()
+    if isinstance(skills, str):
+        skills = skills.split(',')
+    return {s.strip().lower() for s in skills if s.strip()}
+
+
+class CandidateBatch:
+    """
+    Columnar view of many candidates
+
+    Scalar fields are arrays indexed by batch position; timeline positions, merged
+    intervals and skills are flat arrays with an owner column (sorted by owner).
+    """
+
+    def __init__(self, experience_years, skills, job_titles, text_lengths, timelines):
+        self.size = len(experience_years)
+        self.experience_years = np.asarray(experience_years, dtype=float)
+        self.experience_values = list(experience_years)  # As parsed, for flag descriptions
+        self.text_lengths = np.asarray(text_lengths, dtype=int)
+
+        titles = [t if t and t != 'Not specified' else '' for t in job_titles]
+        self.has_titles = np.array([bool(t) for t in titles], dtype=bool)
+        self.job_titles = np.array([t.lower() for t in titles], dtype=str)
+
+        # Skills as (owner, token id) pairs over a shared vocabulary
+        skill_sets = [_skill_set(s) for s in skills]
+        self.has_skills = np.array([bool(s) for s in skill_sets], dtype=bool)
+        self.vocabulary = {token: i for i, token in enumerate(sorted(set().union(*skill_sets)))}
+        self.skill_owner = np.array([owner for owner, s in enumerate(skill_sets) for _ in s], dtype=int)
+        self.skill_token = np.array([self.vocabulary[token] for s in skill_sets for token in s], dtype=int)
+
+        self.position_owner, self.position_start, self.position_end = self._flatten(
+            [[(p['start'], p['end']) for p in t.positions] for t in timelines])
+        self.interval_owner, self.interval_start, self.interval_end = self._flatten(
+            [t.intervals for t in timelines])
+
+    @staticmethod
+    def _flatten(ragged):
+        owner = np.array([i for i, rows in enumerate(ragged) for _ in rows], dtype=int)
+        start = np.array([row[0] for rows in ragged for row in rows], dtype=int)
+        end = np.array([row[1] for rows in ragged for row in rows], dtype=int)
+        return owner, start, end
+
+    @classmethod
+    def from_resume_data(cls, resumes):
+        """
+        Batch from parsed resumes or resume_data rows. A row may carry "text_length"
+        instead of raw_text; the timeline is built from raw_text only if not stored.
+        """
+        timelines, text_lengths = [], []
+        for resume in resumes:
+            if 'text_length' in resume:
+                text_lengths.append(resume['text_length'] or 0)
             else:
-                merged_periods.append((start, end))
-        
-        # Check for gaps between merged employment periods
-        gaps = []
-        for i in range(len(merged_periods) - 1):
-            current_end = merged_periods[i][1]
-            next_start = merged_periods[i + 1][0]
-            gap = next_start - current_end
-            
-            # A gap of 1 year or less is acceptable (could be months, job searching, etc.)
-            if gap > 1:
-                gaps.append((current_end, next_start, gap))
-        
-        for end_year, start_year, gap_size in gaps:
-            if gap_size >= 2:
-                self.flags.append({
-                    'type': 'Career Gap',
-                    'severity': 'High' if gap_size >= 3 else 'Medium',
-                    'description': f'Employment gap detected: {gap_size} year(s) between {end_year} and {start_year}.'
-                })
-    
-    def _check_missing_skills(self, resume_skills, job_description):
-        """Check for missing required skills"""
-        if not resume_skills or resume_skills == 'Not specified':
-            self.flags.append({
+                text_lengths.append(text_length(resume.get('raw_text')))
+            timelines.append(EmploymentTimeline.from_resume_data(resume))
+        return cls([r.get('experience_years') or 0 for r in resumes],
+                   [r.get('skills') for r in resumes],
+                   [r.get('job_titles') for r in resumes],
+                   text_lengths, timelines)
+
+
+def extract_required_experience(job_description):
+    """Extract required years of experience from JD"""
+    jd_lower = job_description.lower()
+    for pattern in JD_REQUIRED_EXPERIENCE:
+        matches = pattern.findall(jd_lower)
+        if matches:
+            return int(matches[0])
+    return 0
+
+
+def _critical_words(jd_lower):
+    """Words (5+ letters) of the JD sentences that state hard requirements"""
+    words = []
+    for line in jd_lower.split('.'):
+        if any(keyword in line for keyword in CRITICAL_KEYWORDS):
+            words.extend(word for word in JD_WORD.findall(line) if len(word) > 4)
+    return set(words)
+
+
+def evaluate(batch, job_description=None, rules=None):
+    """
+    Flags of every candidate in the batch
+
+    Args:
+        batch: CandidateBatch
+        job_description: JD text; None evaluates the job-independent rules only
+        rules: RedFlagRules (defaults from config)
+
+    Returns:
+        One list of {"type", "severity", "description"} per candidate, in batch order
+    """
+    rules = rules or RedFlagRules()
+    n = batch.size
+    flags = [[] for _ in range(n)]
+
+    # ---- Job hopping: mean position tenure ----
+    counts = np.bincount(batch.position_owner, minlength=n)
+    tenure_sums = np.bincount(batch.position_owner,
+                              weights=(batch.position_end - batch.position_start) / 12, minlength=n)
+    avg_tenure = np.divide(tenure_sums, counts, out=np.zeros(n), where=counts > 0)
+    hopping = (counts >= rules.min_positions) & (avg_tenure < rules.short_tenure_years)
+    for i in np.flatnonzero(hopping):
+        if avg_tenure[i] < rules.very_short_tenure_years:
+            flags[i].append({
+                'type': 'Job Hopping',
+                'severity': 'High',
+                'description': f'Frequent job changes detected. Average tenure: {avg_tenure[i]:.1f} years across {counts[i]} positions.'
+            })
+        else:
+            flags[i].append({
+                'type': 'Job Hopping',
+                'severity': 'Medium',
+                'description': f'Short job tenure detected. Average: {avg_tenure[i]:.1f} years.'
+            })
+
+    # ---- Career gaps: between consecutive merged intervals of the same candidate ----
+    if len(batch.interval_owner) > 1:
+        owner = batch.interval_owner[1:]
+        gaps = batch.interval_start[1:] - batch.interval_end[:-1]
+        found = ((owner == batch.interval_owner[:-1]) & (gaps >= rules.gap_months) &
+                 (batch.text_lengths[owner] >= MIN_TEXT_LENGTH))
+        for k in np.flatnonzero(found):
+            months = gaps[k]
+            flags[owner[k]].append({
+                'type': 'Career Gap',
+                'severity': 'High' if months >= rules.long_gap_months else 'Medium',
+                'description': f'Employment gap detected: {months / 12:.1f} year(s) between '
+                               f'{describe_month(batch.interval_end[k])} and {describe_month(batch.interval_start[k + 1])}.'
+            })
+
+    if job_description is None:
+        return flags
+
+    jd_lower = job_description.lower()
+
+    # ---- Skills: every critical JD word must be one of the candidate's skills ----
+    critical = _critical_words(jd_lower)
+    known = [batch.vocabulary[word] for word in critical if word in batch.vocabulary]
+    covered = np.bincount(batch.skill_owner[np.isin(batch.skill_token, known)], minlength=n)
+    missing_critical = covered < len(critical)
+    for i in range(n):
+        if not batch.has_skills[i]:
+            flags[i].append({
                 'type': 'Missing Skills',
                 'severity': 'High',
                 'description': 'No technical skills mentioned in resume.'
             })
-            return
-        
-        # Extract critical skills from JD
-        critical_keywords = ['required', 'must have', 'essential', 'mandatory']
-        jd_lower = job_description.lower()
-        
-        resume_skills_list = [s.strip().lower() for s in resume_skills.split(',')]
-        
-        # Look for required skills in JD
-        missing_critical = []
-        lines = jd_lower.split('.')
-        
-        for line in lines:
-            if any(keyword in line for keyword in critical_keywords):
-                # Extract potential skill words
-                words = re.findall(r'\b[a-z]{3,}\b', line)
-                for word in words:
-                    if word not in resume_skills_list and len(word) > 4:
-                        missing_critical.append(word)
-        
-        if missing_critical:
-            self.flags.append({
+        elif missing_critical[i]:
+            flags[i].append({
                 'type': 'Missing Required Skills',
                 'severity': 'High',
-                'description': f'Missing critical skills mentioned in job description.'
+                'description': 'Missing critical skills mentioned in job description.'
             })
-    
-    def _check_irrelevant_experience(self, job_titles, job_description):
-        """Check if experience is relevant to the job"""
-        if not job_titles or job_titles == 'Not specified':
-            self.flags.append({
+
+    # ---- Job titles: any JD role keyword in the candidate's titles ----
+    roles = [keyword for keyword in ROLE_KEYWORDS if keyword in jd_lower]
+    relevant = np.zeros(n, dtype=bool)
+    for keyword in roles:
+        relevant |= np.char.find(batch.job_titles, keyword) >= 0
+    for i in range(n):
+        if not batch.has_titles[i]:
+            flags[i].append({
                 'type': 'No Job Titles',
                 'severity': 'Medium',
                 'description': 'No clear job titles or roles mentioned.'
             })
-            return
-        
-        # Extract job role keywords from JD
-        role_keywords = ['engineer', 'developer', 'analyst', 'manager', 'designer', 
-                         'architect', 'consultant', 'scientist', 'specialist', 'lead']
-        
-        jd_lower = job_description.lower()
-        titles_lower = job_titles.lower()
-        
-        # Check if any role keyword matches
-        has_relevant_role = any(keyword in titles_lower for keyword in role_keywords if keyword in jd_lower)
-        
-        if not has_relevant_role:
-            self.flags.append({
+        elif not relevant[i]:
+            flags[i].append({
                 'type': 'Irrelevant Experience',
                 'severity': 'High',
                 'description': 'Work experience does not align with job requirements.'
             })
-    
-    def _check_minimal_experience(self, experience_years, job_description):
-        """Check if candidate has minimal or no experience"""
-        # Extract required experience from JD
-        required_exp = self._extract_required_experience(job_description)
-        
-        if experience_years == 0:
-            self.flags.append({
+
+    # ---- Experience against the JD requirement ----
+    required_exp = extract_required_experience(job_description)
+    years = batch.experience_years
+    insufficient = (required_exp > 0) & (years < required_exp * rules.experience_ratio)
+    for i in range(n):
+        if years[i] == 0:
+            flags[i].append({
                 'type': 'No Experience',
                 'severity': 'High',
                 'description': 'No work experience mentioned in resume.'
             })
-        elif required_exp > 0 and experience_years < required_exp * 0.5:
-            self.flags.append({
+        elif insufficient[i]:
+            flags[i].append({
                 'type': 'Insufficient Experience',
                 'severity': 'High',
-                'description': f'Has {experience_years} years but requires {required_exp}+ years.'
+                'description': f'Has {batch.experience_values[i]} years but requires {required_exp}+ years.'
             })
-    
-    def _extract_required_experience(self, job_description):
-        """Extract required years of experience from JD"""
-        patterns = [
-            r'(\d+)\+?\s*years?\s+(?:of\s+)?experience',
-            r'experience\s+(?:of\s+)?(\d+)\+?\s*years?',
-            r'minimum\s+(\d+)\s+years?'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, job_description.lower())
-            if matches:
-                return int(matches[0])
-        
-        return 0
-    
-    def get_flags_summary(self):
-        """Get a summary of all detected flags"""
-        if not self.flags:
+
+    return flags
+
+
+class RedFlagDetector:
+    """Single-resume entry point of the engine; stateless, safe to share across threads"""
+
+    def __init__(self, rules=None):
+        self.rules = rules
+
+    def detect_all_flags(self, resume_data, job_description):
+        """Detect all red flags in the resume"""
+        return evaluate(CandidateBatch.from_resume_data([resume_data]), job_description, self.rules)[0]
+
+    def detect_batch(self, resumes, job_description=None):
+        """Flags for many resumes against one job description (or job-independent only)"""
+        if not resumes:
+            return []
+        return evaluate(CandidateBatch.from_resume_data(resumes), job_description, self.rules)
+
+    def get_flags_summary(self, flags):
+        """Get a summary of the given flags"""
+        if not flags:
             return "No red flags detected."
-        
-        high_severity = [f for f in self.flags if f['severity'] == 'High']
-        medium_severity = [f for f in self.flags if f['severity'] == 'Medium']
-        
+
+        high_severity = [f for f in flags if f['severity'] == 'High']
+        medium_severity = [f for f in flags if f['severity'] == 'Medium']
+
         summary = []
         if high_severity:
             summary.append(f"{len(high_severity)} High severity issues")
         if medium_severity:
             summary.append(f"{len(medium_severity)} Medium severity issues")
-        
+
         return " | ".join(summary)
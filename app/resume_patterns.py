@@ -0,0 +1,103 @@
+"""
+Compiled pattern bank for resume parsing and red flag detection
+
+Every regex the parser and the red flag checks apply to resume and job description
+text is compiled once here at import. Employment date ranges are found in a single
+scan per resume (find_employment_periods); experience years, job hopping and career
+gaps all read that list instead of each re-scanning the text.
+"""
+
+from bisect import bisect_right
+from datetime import datetime
+import re
+
+from app.resume_sections import ResumeSections
+
+# ---- Contact details ----
+# Email after a word boundary or common separator, so "ONmichael@..." yields "michael@..."
+EMAIL = re.compile(r'(?:^|[\s,|]|[0-9])([a-z][a-z0-9._%+-]*@[a-z0-9.-]+\.[a-z]{2,})', re.IGNORECASE | re.MULTILINE)
+EMAIL_FALLBACK = re.compile(r'[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}', re.IGNORECASE)
+# Formats such as +1 (555) 123-4567 and +91 9000239990
+PHONE = re.compile(r'\+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+
+# ---- Experience ----
+# Explicitly stated experience in resume text (applied to lowercased text)
+EXPERIENCE_PHRASES = [
+    re.compile(r'(\d+)\+?\s*years?\s+of\s+\w+\s+experience'),  # "20 years of IT experience"
+    re.compile(r'(\d+)\+?\s*years?\s+of\s+experience'),         # "20 years of experience"
+    re.compile(r'(\d+)\+?\s*years?\s+experience'),              # "20 years experience"
+    re.compile(r'experience\s+(?:of\s+)?(\d+)\+?\s*years?'),    # "experience of 20 years"
+    re.compile(r'(\d+)\+?\s*yrs?\s+(?:of\s+)?experience'),      # "20 yrs experience"
+    re.compile(r'over\s+(\d+)\s+years?'),                       # "over 20 years"
+    re.compile(r'more\s+than\s+(\d+)\s+years?'),                # "more than 20 years"
+    re.compile(r'(\d+)\+\s+years?\s+(?:of\s+)?experience')      # "20+ years experience"
+]
+
+# Required experience in a job description, first match wins (applied to lowercased text)
+JD_REQUIRED_EXPERIENCE = [
+    re.compile(r'(\d+)\+?\s*years?\s+(?:of\s+)?experience'),
+    re.compile(r'experience\s+(?:of\s+)?(\d+)\+?\s*years?'),
+    re.compile(r'minimum\s+(\d+)\s+years?')
+]
+
+# Optional month before a year: "Mar 2019", "March, 2019", "03/2019"
+_MONTH = (r'(?:\b(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+          r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?,?\s*'
+          r'|\b(0?[1-9]|1[0-2])\s*/\s*)?')
+# "2018 - 2021", "Mar 2019 – Present", "01/2020 to 06/2022"
+DATE_RANGE = re.compile(_MONTH + r'(20\d{2}|19\d{2})\s*(?:[-–—]|\bto\b)\s*' +
+                        _MONTH + r'(20\d{2}|19\d{2}|present|current)\b', re.IGNORECASE)
+CURRENT_MARKERS = ('present', 'current')
+MONTH_NAMES = ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec')
+
+# ---- Job description words ----
+JD_WORD = re.compile(r'\b[a-z]{3,}\b')
+
+# ---- Keyword retrieval (inverted index terms, applied to lowercased text) ----
+INDEX_TERM = re.compile(r'\w+')
+
+_NEWLINE = re.compile(r'\n')
+
+
+def _month(name, number):
+    """1-12 from a month name or number group, None for a bare year"""
+    if name:
+        return MONTH_NAMES.index(name[:3].lower()) + 1
+    return int(number) if number else None
+
+
+def find_employment_periods(text, sections=None):
+    """
+    Every date range in the resume, found in one scan of the text
+
+    Args:
+        text: Resume text
+        sections: ResumeSections of the same text (segments again if omitted)
+
+    Returns:
+        [{"start", "end", "start_month", "end_month", "current", "section", "span"}] in
+        document order. Years are ints (the current year for present/current ranges),
+        months 1-12 or None when only the year is given, "section" is the kind of the
+        section the range sits in and "span" its [start, end) character offsets in text.
+    """
+    if not text:
+        return []
+
+    sections = sections or ResumeSections(text)
+    line_starts = [0] + [match.end() for match in _NEWLINE.finditer(text)]
+    now = datetime.now()
+
+    periods = []
+    for match in DATE_RANGE.finditer(text):
+        start_name, start_number, start, end_name, end_number, end = match.groups()
+        current = end.lower() in CURRENT_MARKERS
+        periods.append({
+            'start': int(start),
+            'end': now.year if current else int(end),
+            'start_month': _month(start_name, start_number),
+            'end_month': now.month if current else _month(end_name, end_number),
+            'current': current,
+            'section': sections.kind_of_line(bisect_right(line_starts, match.start()) - 1),
+            'span': [match.start(), match.end()]
+        })
+    return periods
@@ -0,0 +1,112 @@
+"""
+Resume section segmentation
+
+Splits resume text into typed sections (experience, education, skills, projects,
+certifications, summary) in a single pass over its lines. The parser's field
+extractors and the red flag checks read the section they need from this map instead
+of each re-splitting and re-scanning the whole text.
+"""
+
+import re
+
+# Section kind -> heading phrases. A line is a heading when, without punctuation, it
+# is one of these phrases, optionally after one HEADING_PREFIXES word
+# ("Professional Experience", "Key Projects").
+SECTION_HEADINGS = {
+    'experience': ['experience', 'employment', 'employment history', 'work history',
+                   'career history', 'professional background', 'career'],
+    'education': ['education', 'academic', 'academics', 'academic background',
+                  'qualification', 'qualifications', 'education and training'],
+    'skills': ['skills', 'skill set', 'skillset', 'technical skills', 'technologies',
+               'competencies', 'expertise', 'tools', 'skills and expertise',
+               'skills and technologies'],
+    'projects': ['project', 'projects'],
+    'certifications': ['certification', 'certifications', 'certificates', 'licenses',
+                       'certifications and licenses'],
+    'summary': ['summary', 'profile', 'objective', 'about me'],
+}
+
+# Text before the first heading (name, contact details)
+HEADER = 'header'
+
+# Qualifiers allowed in front of a heading phrase
+HEADING_PREFIXES = ('professional', 'technical', 'work', 'relevant', 'key', 'personal', 'academic')
+
+_HEADING_CLEANUP = re.compile(r'[^a-z ]+')
+_HEADING_LOOKUP = {phrase: kind for kind, phrases in SECTION_HEADINGS.items() for phrase in phrases}
+
+
+def heading_kind(line):
+    """Section kind if the line is a section heading, else None"""
+    if not line or len(line) > 40 or any(ch.isdigit() for ch in line):
+        return None
+    words = _HEADING_CLEANUP.sub(' ', line.lower().replace('&', ' and ')).split()
+    if not words:
+        return None
+    # The whole line first, so "academic background" is not read as prefix + "background"
+    kind = _HEADING_LOOKUP.get(' '.join(words))
+    if kind is None and len(words) > 1 and words[0] in HEADING_PREFIXES:
+        kind = _HEADING_LOOKUP.get(' '.join(words[1:]))
+    return kind
+
+
+class ResumeSections:
+    """Typed sections of one resume with line offsets into its text"""
+
+    def __init__(self, text, spans=None):
+        """
+        Args:
+            text: Resume text
+            spans: Previously computed [{"kind", "start", "end"}] offsets (skips segmentation)
+        """
+        self.lines = [line.strip() for line in (text or '').split('\n')]
+        self.spans = spans if spans is not None else self._segment()
+
+    def _segment(self):
+        """Single pass: every heading line opens a section that runs to the next heading"""
+        spans = [{'kind': HEADER, 'start': 0, 'end': len(self.lines)}]
+        for number, line in enumerate(self.lines):
+            kind = heading_kind(line)
+            if kind:
+                spans[-1]['end'] = number
+                spans.append({'kind': kind, 'start': number, 'end': len(self.lines)})
+        return spans
+
+    @classmethod
+    def from_resume_data(cls, resume_data):
+        """Reuse the offsets the parser stored on resume_data (segments again if absent)"""
+        return cls(resume_data.get('raw_text', ''), resume_data.get('sections'))
+
+    def to_dict(self):
+        """JSON-serialisable offsets, stored on resume_data['sections']"""
+        return [dict(span) for span in self.spans]
+
+    def has(self, kind):
+        return any(span['kind'] == kind for span in self.spans)
+
+    def kind_of_line(self, number):
+        """Kind of the section containing line `number` (headings belong to their section)"""
+        for span in reversed(self.spans):
+            if span['start'] <= number:
+                return span['kind']
+        return HEADER
+
+    def lines_of(self, *kinds):
+        """Non-empty content lines of every section of the given kinds (headings excluded)"""
+        lines = []
+        for span in self.spans:
+            if span['kind'] in kinds:
+                first = span['start'] if span['kind'] == HEADER else span['start'] + 1
+                lines.extend(line for line in self.lines[first:span['end']] if line)
+        return lines
+
+    def lines_excluding(self, *kinds):
+        """Non-empty lines outside the given section kinds"""
+        lines = []
+        for span in self.spans:
+            if span['kind'] not in kinds:
+                lines.extend(line for line in self.lines[span['start']:span['end']] if line)
+        return lines
+
+    def all_lines(self):
+        return [line for line in self.lines if line]
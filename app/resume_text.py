@@ -0,0 +1,93 @@
+"""
+Full resume texts, stored apart from resume_data
+
+raw_text used to sit in the resume_data row next to the small parsed fields, so every
+listing that joined resume_data dragged the large TEXT value along. It now lives in
+resume_text (migrations/007_resume_text.sql), one row per resume_data row, compressed
+with the codec recorded next to it (RESUME_TEXT_CODEC for new rows; rows moved by the
+migration keep 'none'). text_length holds the trimmed length so the red flag checks
+never have to read the text itself, and summary the first SUMMARY_CHARS characters the
+RAG snapshot shows, so it never has to decompress a text for its listing.
+
+Only the code paths that need the text load it: re-matching stored resumes, the red
+flag timeline fallback for resumes without a stored timeline, and the RAG snapshot's
+keyword index.
+"""
+
+import zlib
+
+from config import Config
+from app.database import fetch_query
+
+CODECS = ('none', 'zlib')
+
+# Resume texts read per query
+LOAD_CHUNK = 200
+
+# Leading resume text stored as the summary
+SUMMARY_CHARS = 500
+
+# Whitespace trimmed for text_length, the same set migration 007 trims in SQL
+# (str.strip() with no argument would also strip Unicode spaces)
+WHITESPACE = ' \t\n\r\x0b\x0c'
+
+
+def text_length(text):
+    """Length of a resume text without leading and trailing whitespace"""
+    return len((text or '').strip(WHITESPACE))
+
+
+def encode_text(text, codec=None):
+    """(codec, stored bytes) of a text; falls back to 'none' when compression doesn't pay off"""
+    codec = codec or Config.RESUME_TEXT_CODEC
+    if codec not in CODECS:
+        raise ValueError(f"Unknown resume text codec '{codec}' (expected one of {', '.join(CODECS)})")
+    raw = (text or '').encode('utf-8')
+    if codec == 'zlib':
+        compressed = zlib.compress(raw)
+        if len(compressed) < len(raw):
+            return 'zlib', compressed
+    return 'none', raw
+
+
+def decode_text(codec, content):
+    """Text of a stored resume_text row"""
+    if content is None:
+        return ''
+    content = bytes(content)
+    if codec == 'zlib':
+        content = zlib.decompress(content)
+    elif codec != 'none':
+        raise ValueError(f"Unknown resume text codec '{codec}'")
+    return content.decode('utf-8')
+
+
+def resume_text_statement(text):
+    """
+    (query, params) storing the full text of the resume_data row just inserted on the
+    connection (LAST_INSERT_ID()), to run in the same transaction as that insert
+    """
+    codec, content = encode_text(text)
+    return ("""INSERT INTO resume_text (resume_id, codec, text_length, summary, content)
+               VALUES (LAST_INSERT_ID(), %s, %s, %s, %s)""",
+            (codec, text_length(text), (text or '')[:SUMMARY_CHARS], content))
+
+
+def load_resume_texts(conn, resume_ids):
+    """Full texts of the given resume_data rows: {resume id: text} (rows without text left out)"""
+    texts = {}
+    resume_ids = list(dict.fromkeys(int(i) for i in resume_ids))
+    for start in range(0, len(resume_ids), LOAD_CHUNK):
+        chunk = tuple(resume_ids[start:start + LOAD_CHUNK])
+        placeholders = ", ".join(["%s"] * len(chunk))
+        rows = fetch_query(conn,
+            f"SELECT resume_id, codec, content FROM resume_text WHERE resume_id IN ({placeholders})",
+            chunk)
+        for row in rows:
+            texts[row['resume_id']] = decode_text(row['codec'], row['content'])
+    return texts
+
+
+def load_resume_text(conn, resume_id):
+    """Full text of one resume_data row ('' when none is stored)"""
+    return load_resume_texts(conn, [resume_id]).get(int(resume_id), '')
@@ -0,0 +1,92 @@
+"""
+Scoring weights and tier thresholds
+
+The overall match score is a weighted average of the four component scores stored in
+analysis_results, and the tier is a cut of that score. Both can be set per job
+(job_descriptions.weight_* / *_tier_threshold, NULL = default), so changing them only
+needs a re-score of the stored components - no parsing or embedding.
+"""
+
+import math
+
+DEFAULT_WEIGHTS = {
+    "semantic": 0.30,
+    "keyword": 0.25,
+    "skill": 0.30,
+    "experience": 0.15
+}
+
+DEFAULT_TIER_THRESHOLDS = {
+    "top": 75.0,
+    "medium": 50.0
+}
+
+# analysis_results column of every weighted component
+COMPONENT_COLUMNS = {
+    "semantic": "semantic_similarity_score",
+    "keyword": "keyword_match_score",
+    "skill": "skill_match_score",
+    "experience": "experience_match_score"
+}
+
+WEIGHT_TOLERANCE = 0.001
+
+
+def _numbers(values, name):
+    """{key: float} of an optional mapping; TypeError when it is not a mapping"""
+    if values is None:
+        return {}
+    if not isinstance(values, dict):
+        raise TypeError(f"{name} must be an object of numbers")
+    return {k: float(v) for k, v in values.items()}
+
+
+class ScoringConfig:
+    """Weights and tier thresholds of one job (defaults where not set)"""
+
+    def __init__(self, weights=None, tier_thresholds=None):
+        self.weights = {**DEFAULT_WEIGHTS, **_numbers(weights, "weights")}
+        self.tier_thresholds = {**DEFAULT_TIER_THRESHOLDS, **_numbers(tier_thresholds, "tier_thresholds")}
+        self.validate()
+
+    def validate(self):
+        """Raise ValueError for unknown keys, non-finite values, negative weights,
+        weights not summing to 1 or thresholds out of order"""
+        unknown = (set(self.weights) - set(DEFAULT_WEIGHTS)) | \
+                  (set(self.tier_thresholds) - set(DEFAULT_TIER_THRESHOLDS))
+        if unknown:
+            raise ValueError(f"Unknown scoring keys: {', '.join(sorted(unknown))}")
+        if not all(math.isfinite(value) for value in (*self.weights.values(),
+                                                       *self.tier_thresholds.values())):
+            raise ValueError("Weights and thresholds must be finite numbers")
+        if any(weight < 0 for weight in self.weights.values()):
+            raise ValueError("Weights must not be negative")
+        if abs(sum(self.weights.values()) - 1.0) > WEIGHT_TOLERANCE:
+            raise ValueError(f"Weights must sum to 1 (got {sum(self.weights.values()):.3f})")
+        top, medium = self.tier_thresholds["top"], self.tier_thresholds["medium"]
+        if not 0 <= medium <= top <= 100:
+            raise ValueError("Tier thresholds must satisfy 0 <= medium <= top <= 100")
+
+    @classmethod
+    def from_job(cls, job):
+        """From a job_descriptions row (NULL columns fall back to the defaults)"""
+        weights = {name: job.get(f"weight_{name}") for name in DEFAULT_WEIGHTS}
+        thresholds = {name: job.get(f"{name}_tier_threshold") for name in DEFAULT_TIER_THRESHOLDS}
+        return cls({k: v for k, v in weights.items() if v is not None},
+                   {k: v for k, v in thresholds.items() if v is not None})
+
+    def to_dict(self):
+        return {"weights": dict(self.weights), "tier_thresholds": dict(self.tier_thresholds)}
+
+    def overall_score(self, components):
+        """Weighted average of {"semantic", "keyword", "skill", "experience"} scores"""
+        return sum(components[name] * weight for name, weight in self.weights.items())
+
+    def tier(self, score):
+        """Determine candidate tier based on score"""
+        if score >= self.tier_thresholds["top"]:
+            return "Top Tier"
+        elif score >= self.tier_thresholds["medium"]:
+            return "Medium Tier"
+        else:
+            return "Low Tier"
@@ -0,0 +1,171 @@
+"""
+Skill bitmap index for boolean skill questions in the RAG chat
+
+Every distinct stored skill (an entry of the comma-separated resume_data.skills, lowercased
+and stripped) gets a canonical skill id and one bitset over the candidates, packed eight
+candidates per byte. A skill in a question resolves to the ids whose name contains it
+(the same substring rule the chat applied to each candidate's skills string), so
+"who knows Python and Docker", "Python or Go" and "Java but not Spring Boot" become
+OR/AND/NOT over a few packed arrays, and counts are a popcount.
+
+Misspelled or variant skills ("pyton", "kubernets") resolve the same way: a trigram
+index over the words of the skill names proposes the close words, fuzz.ratio confirms
+them, and the query uses the ids of the names containing a confirmed word.
+"""
+
+import re
+import threading
+
+from fuzzywuzzy import fuzz
+import numpy as np
+
+# fuzz.ratio above which a skill-name word counts as the query skill misspelled
+FUZZY_RATIO = 80
+
+# Bits set in every byte value, for counting packed bitsets (numpy 1.x has no popcount)
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.int64)
+
+
+def split_skills(skills_lower):
+    """Canonical skill names of one lowercased skills string"""
+    return [skill.strip() for skill in (skills_lower or '').split(',') if skill.strip()]
+
+
+def trigrams(word):
+    """Trigrams of a word padded with two spaces on each side"""
+    padded = f"  {word}  "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SkillBitmap:
+    """
+    Packed candidate bitsets per canonical skill id
+
+    names: canonical skill names, the index is the skill id
+    bits: uint8 matrix, one packed bitset row per skill id (bit i = candidate row i)
+    """
+
+    def __init__(self, skills_lower):
+        """
+        Args:
+            skills_lower: Lowercased skills string of every candidate row
+        """
+        self.size = len(skills_lower)
+        self.width = (self.size + 7) // 8
+        ids = {}
+        rows, columns = [], []
+        for row, skills in enumerate(skills_lower):
+            for name in split_skills(skills):
+                columns.append(ids.setdefault(name, len(ids)))
+                rows.append(row)
+        self.names = list(ids)
+        self.bits = np.zeros((len(self.names), self.width), dtype=np.uint8)
+        if rows:
+            rows = np.array(rows, dtype=np.int64)
+            np.bitwise_or.at(self.bits, (np.array(columns, dtype=np.int64), rows >> 3),
+                             (0x80 >> (rows & 7)).astype(np.uint8))
+        self._resolved = {}
+        self._fuzzy_resolved = {}
+        self._word_trigrams = None
+        self._lock = threading.Lock()
+
+    def skill_ids(self, skill):
+        """Ids of the canonical skills matching a query skill (word match for 1-2 letter skills)"""
+        skill = skill.lower()
+        with self._lock:
+            if skill not in self._resolved:
+                if len(skill) <= 2:
+                    pattern = re.compile(r'\b' + re.escape(skill) + r'\b')
+                    matches = [i for i, name in enumerate(self.names) if pattern.search(name)]
+                else:
+                    matches = [i for i, name in enumerate(self.names) if skill in name]
+                self._resolved[skill] = np.array(matches, dtype=np.int64)
+            return self._resolved[skill]
+
+    def _trigram_index(self):
+        """{trigram: words of the skill names containing it}, {word: skill ids} (built on first use)"""
+        if self._word_trigrams is None:
+            word_ids = {}
+            for i, name in enumerate(self.names):
+                for word in name.split():
+                    word_ids.setdefault(word, []).append(i)
+            index = {}
+            for word in word_ids:
+                for trigram in trigrams(word):
+                    index.setdefault(trigram, []).append(word)
+            self._word_trigrams = (index, word_ids)
+        return self._word_trigrams
+
+    def fuzzy_skill_ids(self, skill):
+        """
+        Ids of the canonical skills having a word within FUZZY_RATIO of the query skill
+        (none for 1-2 letter skills, which only match exactly)
+        """
+        skill = skill.lower()
+        if len(skill) <= 2:
+            return np.zeros(0, dtype=np.int64)
+        with self._lock:
+            if skill not in self._fuzzy_resolved:
+                index, word_ids = self._trigram_index()
+                # Words sharing a trigram with the skill, of a length that can reach the ratio
+                candidates = {word for trigram in trigrams(skill) for word in index.get(trigram, ())}
+                matches = set()
+                for word in candidates:
+                    if 2 * min(len(word), len(skill)) * 100 > FUZZY_RATIO * (len(word) + len(skill)) \
+                            and fuzz.ratio(skill, word) > FUZZY_RATIO:
+                        matches.update(word_ids[word])
+                self._fuzzy_resolved[skill] = np.array(sorted(matches), dtype=np.int64)
+            return self._fuzzy_resolved[skill]
+
+    def has_fuzzy(self, skill):
+        """Bitset of the candidates having a skill word close to the query skill"""
+        ids = self.fuzzy_skill_ids(skill)
+        if not len(ids):
+            return self.none()
+        return np.bitwise_or.reduce(self.bits[ids], axis=0)
+
+    def none(self):
+        return np.zeros(self.width, dtype=np.uint8)
+
+    def all(self):
+        """Bitset of every candidate row (padding bits of the last byte left clear)"""
+        bits = np.full(self.width, 0xFF, dtype=np.uint8)
+        if self.size % 8:
+            bits[-1] = (0xFF << (8 - self.size % 8)) & 0xFF
+        return bits
+
+    def has(self, skill):
+        """Bitset of the candidates having the skill"""
+        ids = self.skill_ids(skill)
+        if not len(ids):
+            return self.none()
+        return np.bitwise_or.reduce(self.bits[ids], axis=0)
+
+    def has_any(self, skills):
+        """Bitset of the candidates having a skill, or one spelling of an alias group ("nlp", "natural language processing")"""
+        if isinstance(skills, str):
+            return self.has(skills)
+        return np.bitwise_or.reduce([self.has(skill) for skill in skills] or [self.none()])
+
+    def query(self, any_of=(), all_of=(), none_of=()):
+        """
+        Bitset of the candidates having at least one skill of any_of (ignored when
+        empty), every skill of all_of and none of none_of. Entries of all_of and none_of
+        may be alias groups (tuples of spellings), which match on any of their spellings.
+        """
+        result = self.all()
+        if any_of:
+            result = np.bitwise_or.reduce([self.has(skill) for skill in any_of])
+        for skills in all_of:
+            result &= self.has_any(skills)
+        for skills in none_of:
+            result &= ~self.has_any(skills)
+        return result
+
+    def count(self, bits):
+        """Number of candidates in a bitset"""
+        return int(_POPCOUNT[bits].sum())
+
+    def mask(self, bits):
+        """Bitset as a bool array over the candidate rows"""
+        return np.unpackbits(bits, count=self.size).astype(bool)
@@ -0,0 +1,272 @@
+"""
+Query Plan Audit
+
+Runs EXPLAIN for every SQL statement (string literals and f-strings) in the
+SOURCE_FILES modules against a seeded scratch database and fails when a large
+table is read with a full table scan.
+
+Usage:
+    python audit_query_plans.py                 # seed 5000 candidates, audit, drop scratch DB
+    python audit_query_plans.py --rows 20000    # bigger seed
+    python audit_query_plans.py --keep          # keep the scratch database for inspection
+
+Exit code is 1 when at least one statement does a full scan on a large table.
+"""
+
+import argparse
+import ast
+import glob
+import os
+import random
+import re
+import sys
+
+import mysql.connector
+from mysql.connector import Error
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from config import Config
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_FILES = [os.path.join(ROOT_DIR, 'app.py'),
+                os.path.join(ROOT_DIR, 'app', 'candidate_snapshot.py'),
+                os.path.join(ROOT_DIR, 'app', 'candidate_skills.py'),
+                os.path.join(ROOT_DIR, 'app', 'resume_text.py')]
+SCHEMA_FILES = [
+    os.path.join(ROOT_DIR, 'database_schema.sql'),
+    os.path.join(ROOT_DIR, 'database_admin_tables.sql'),
+]
+# Upper-case statement keyword followed by more SQL; case-sensitive so docstrings
+# ("Update category details"), route methods ('DELETE') and column names don't match
+SQL_STATEMENT = re.compile(r'(SELECT|UPDATE|DELETE|INSERT)\s+\S')
+
+# Migration statements the fresh schema has superseded: they reference
+# resume_data.raw_text, which migration 007 moved to resume_text. Keyed by migration
+# file, matched by a fragment of the statement.
+STALE_MIGRATION_STATEMENTS = {
+    '003_employment_timeline.sql': ('AFTER raw_text',),
+    '007_resume_text.sql': ('INSERT INTO resume_text', 'DROP COLUMN raw_text'),
+}
+
+# Full scans that are intentional: the route lists every row of the table.
+# Keyed by (function name, table alias as reported by EXPLAIN).
+ALLOWED_FULL_SCANS = {
+    ('bulk_analysis', 'c'): 'lists every bulk-uploaded candidate',
+    ('candidates', 'c'): 'unfiltered candidate listing',
+    ('_fetch_candidates', 'rd'): 'first load of the RAG candidate snapshot',
+    ('_fetch_scores', 'analysis_results'): 'first load of the RAG candidate snapshot',
+    # Re-flagging re-evaluates every stored resume against its latest analysis
+    ('_reflag_candidates', 'rd'): 're-flags every stored resume',
+    ('_reflag_candidates', 'analysis_results'): 'latest analysis of every candidate (window over all rows)',
+    ('_reflag_candidates', '<derived2>'): 'latest analysis of every candidate (materialized)',
+    ('_reflag_candidates', 'rf'): 'replaces the red flags of every stored resume',
+}
+
+
+def _module_constants(tree):
+    """Module-level string constants ({name: value}) that f-strings may interpolate"""
+    constants = {}
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant)
+                and isinstance(node.value.value, str)):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    constants[target.id] = node.value.value
+    return constants
+
+
+def _render_fstring(node, constants):
+    """
+    SQL text of an f-string: module constants are substituted, every other
+    interpolation ({placeholders}, computed expressions) becomes a %s placeholder
+    """
+    parts = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append(value.value)
+        elif isinstance(value.value, ast.Name) and value.value.id in constants:
+            parts.append(constants[value.value.id])
+        else:
+            parts.append('%s')
+    return ''.join(parts)
+
+
+def extract_statements(path):
+    """
+    Return (function_name, line, sql) for every SQL string literal in a module,
+    f-strings included (rendered by _render_fstring)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    constants = _module_constants(tree)
+
+    statements = []
+    for func in ast.walk(tree):
+        if not isinstance(func, ast.FunctionDef):
+            continue
+        # The literal parts of an f-string are audited as part of the whole statement
+        fragments = {id(part) for node in ast.walk(func) if isinstance(node, ast.JoinedStr)
+                     for part in ast.walk(node) if part is not node}
+        for node in ast.walk(func):
+            if id(node) in fragments:
+                continue
+            if isinstance(node, ast.JoinedStr):
+                sql = _render_fstring(node, constants).strip()
+            elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+                sql = node.value.strip()
+            else:
+                continue
+            if SQL_STATEMENT.match(sql):
+                statements.append((func.name, node.lineno, sql))
+    return statements
+
+
+def _split_sql_script(script, database):
+    """Split a .sql file into statements, pointing it at the scratch database"""
+    script = script.replace('resume_filter_db', database)
+    lines = [line for line in script.splitlines() if not line.strip().startswith('--')]
+    return [s.strip() for s in '\n'.join(lines).split(';') if s.strip()]
+
+
+def create_scratch_database(cursor, database):
+    """Create the scratch database from the schema files and migrations"""
+    cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+
+    files = SCHEMA_FILES + sorted(glob.glob(os.path.join(ROOT_DIR, 'migrations', '*.sql')))
+    for path in files:
+        stale = STALE_MIGRATION_STATEMENTS.get(os.path.basename(path), ())
+        with open(path, 'r', encoding='utf-8') as f:
+            for statement in _split_sql_script(f.read(), database):
+                if any(fragment in statement for fragment in stale):
+                    continue
+                try:
+                    cursor.execute(statement)
+                except Error as e:
+                    # Migrations re-apply indexes that the fresh schema already has
+                    if e.errno in (1061, 1060, 1091):  # duplicate key / column, can't drop
+                        continue
+                    raise
+    cursor.execute(f"USE `{database}`")
+
+
+def seed_database(connection, rows):
+    """Insert a deterministic synthetic data set sized like a busy install"""
+    rng = random.Random(42)
+    cursor = connection.cursor()
+    skills_pool = ['Python', 'Java', 'SQL', 'AWS', 'Docker', 'React', 'Kubernetes', 'Power BI']
+    tiers = ['Top Tier', 'Medium Tier', 'Low Tier']
+    severities = ['High', 'Medium', 'Low']
+    jobs = 20
+
+    cursor.executemany(
+        "INSERT INTO job_descriptions (title, description, required_experience) VALUES (%s, %s, %s)",
+        [(f"Job {i}", f"Job description {i}", i % 8) for i in range(1, jobs + 1)]
+    )
+    cursor.executemany(
+        "INSERT INTO candidates (name, email, phone, resume_path) VALUES (%s, %s, %s, %s)",
+        [(f"Candidate {i}", f"candidate{i}@example.com", '555-0100', f"uploads/c{i}.pdf")
+         for i in range(1, rows + 1)]
+    )
+    cursor.executemany(
+        """INSERT INTO resume_data (candidate_id, skills, experience_years, education,
+           projects, certifications, job_titles) VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+        [(i, ', '.join(rng.sample(skills_pool, 3)), rng.randint(0, 20), 'Bachelor',
+          'Not specified', 'None', 'Developer')
+         for i in range(1, rows + 1)]
+    )
+    cursor.executemany(
+        "INSERT INTO resume_text (resume_id, codec, text_length, content) VALUES (%s, %s, %s, %s)",
+        [(i, 'none', 2000, b'x' * 2000) for i in range(1, rows + 1)]
+    )
+    cursor.executemany(
+        """INSERT INTO analysis_results (candidate_id, job_description_id, match_score,
+           skill_match_score, experience_match_score, keyword_match_score,
+           semantic_similarity_score, tier, explanation)
+           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+        [(i, (i % jobs) + 1, rng.uniform(0, 100), 50, 50, 50, 50, rng.choice(tiers), '')
+         for i in range(1, rows + 1)]
+    )
+    cursor.executemany(
+        "INSERT INTO red_flags (candidate_id, flag_type, description, severity) VALUES (%s, %s, %s, %s)",
+        [(rng.randint(1, rows), 'Career Gap', '', rng.choice(severities)) for _ in range(rows * 2)]
+    )
+    connection.commit()
+
+    for table in ('job_descriptions', 'candidates', 'resume_data', 'resume_text', 'analysis_results', 'red_flags'):
+        cursor.execute(f"ANALYZE TABLE {table}")
+        cursor.fetchall()
+    cursor.close()
+
+
+def audit_statement(connection, sql, min_rows):
+    """EXPLAIN one statement and return the plan rows that full-scan a large table"""
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("EXPLAIN " + sql.replace('%s', '1'))
+        plan = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    return [row for row in plan
+            if row.get('type') == 'ALL' and (row.get('rows') or 0) >= min_rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN every SQL statement in app.py")
+    parser.add_argument('--rows', type=int, default=5000, help="Candidates to seed (default 5000)")
+    parser.add_argument('--keep', action='store_true', help="Keep the scratch database afterwards")
+    args = parser.parse_args()
+
+    database = Config.DB_CONFIG['database'] + '_plan_audit'
+    connection = mysql.connector.connect(
+        host=Config.DB_CONFIG['host'],
+        user=Config.DB_CONFIG['user'],
+        password=Config.DB_CONFIG['password']
+    )
+    cursor = connection.cursor()
+
+    print(f"Creating scratch database {database}...")
+    create_scratch_database(cursor, database)
+    print(f"Seeding {args.rows} candidates...")
+    seed_database(connection, args.rows)
+
+    # Anything bigger than a tenth of the seed counts as a large table
+    min_rows = max(100, args.rows // 10)
+    failures = []
+    audited = 0
+
+    for path in SOURCE_FILES:
+        for func_name, line, sql in extract_statements(path):
+            if sql.upper().startswith('INSERT') and 'SELECT' not in sql.upper():
+                continue  # plain INSERT ... VALUES has no read plan
+            audited += 1
+            try:
+                scans = audit_statement(connection, sql, min_rows)
+            except Error as e:
+                failures.append((path, func_name, line, f"EXPLAIN failed: {e}"))
+                continue
+
+            for row in scans:
+                alias = row.get('table')
+                if (func_name, alias) in ALLOWED_FULL_SCANS:
+                    continue
+                failures.append((path, func_name, line,
+                                 f"full scan on '{alias}' (~{row.get('rows')} rows)"))
+
+    if not args.keep:
+        cursor.execute(f"DROP DATABASE IF EXISTS `{database}`")
+    cursor.close()
+    connection.close()
+
+    print(f"\nAudited {audited} statements")
+    if failures:
+        for path, func_name, line, reason in failures:
+            print(f"  ❌ {os.path.basename(path)}:{line} {func_name}(): {reason}")
+        return 1
+
+    print("✅ No full table scans on large tables")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,416 @@
+"""
+Resume Pipeline Benchmark
+
+Generates a deterministic synthetic corpus (PDF and DOCX resumes of several sizes plus
+job descriptions), times every pipeline stage and writes the results as JSON. A stored
+baseline can be compared against with a regression threshold.
+
+Runs offline by default: embeddings come from a deterministic fake model and the skill
+configuration caches are warmed with the built-in fallback data, so neither the
+sentence-transformers download nor MySQL is needed.
+
+Usage:
+    python benchmark.py                                   # run, write benchmark_results.json
+    python benchmark.py --save-baseline baseline.json     # run and store as the baseline
+    python benchmark.py --baseline baseline.json          # fail when a stage is >20% slower
+    python benchmark.py --baseline baseline.json --threshold 0.1 --repeat 10
+    python benchmark.py --real-model --use-db             # real embeddings and skill tables
+
+Exit code is 1 when at least one stage regressed past the threshold, or when a RAG
+answer check (RAG_ALIAS_CHECKS) fails before timing starts.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import docx
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from app.resume_parser import ResumeParser
+from app.red_flag_detector import RedFlagDetector
+from app.agents.skills_agent import SkillsAssessmentAgent
+from app.agents.semantic_agent import SemanticMatchingAgent
+from app.agents.orchestrator import RankingOrchestratorAgent
+from app.agents.rag_agent import RAGAgent
+from app.candidate_snapshot import SnapshotVersion
+from app.resume_text import SUMMARY_CHARS
+from app import database_config
+
+# ============================================================
+# Synthetic corpus
+# ============================================================
+
+FIRST_NAMES = ['Alice', 'Bruno', 'Chen', 'Divya', 'Emeka', 'Fatima', 'Gustavo', 'Hana', 'Ivan', 'Julia']
+LAST_NAMES = ['Anderson', 'Borges', 'Cohen', 'Dubois', 'Eriksen', 'Fischer', 'Garcia', 'Hoffmann']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Wayne Tech',
+             'Hooli', 'Vandelay Imports', 'Soylent Systems', 'Tyrell Data']
+TITLES = ['Software Engineer', 'Senior Developer', 'Data Engineer', 'DevOps Engineer',
+          'Backend Developer', 'Full Stack Developer', 'Data Scientist', 'Team Lead']
+SKILLS = ['Python', 'Java', 'JavaScript', 'TypeScript', 'SQL', 'MySQL', 'PostgreSQL', 'MongoDB',
+          'React', 'Angular', 'Django', 'Flask', 'Spring', 'Node.js', 'AWS', 'Azure', 'GCP',
+          'Docker', 'Kubernetes', 'Terraform', 'Jenkins', 'Git', 'Machine Learning', 'TensorFlow',
+          'PyTorch', 'Pandas', 'NumPy', 'Spark', 'Kafka', 'Airflow', 'Power BI', 'Tableau']
+DEGREES = ['Bachelor of Science in Computer Science', 'Master of Science in Data Science',
+           'Bachelor of Engineering', 'MBA']
+CERTIFICATIONS = ['AWS Certified Solutions Architect', 'Certified Kubernetes Administrator',
+                  'Microsoft Certified: Azure Developer', 'Google Professional Data Engineer']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+FILLER = ('Designed and delivered {skill} services used by {n} internal teams, improving '
+          'throughput and reliability while mentoring engineers and reviewing code.')
+
+# Resume size profiles: jobs held, skills listed, bullet points per job
+SIZES = {
+    'small': {'jobs': 2, 'skills': 6, 'bullets': 2},
+    'medium': {'jobs': 5, 'skills': 14, 'bullets': 4},
+    'large': {'jobs': 12, 'skills': 26, 'bullets': 8},
+}
+
+RAG_QUESTIONS = [
+    'Who has Python and AWS experience?',
+    'Find candidates with more than 5 years of experience',
+    'Show me data engineers who know Spark and Kafka',
+    'Who is the best candidate for a DevOps role?',
+]
+
+# Answer checks run before timing: AND/NOT skill questions written with an abbreviation
+# must match candidates who list the full name (question, skills that must match)
+RAG_ALIAS_CHECKS = [
+    ('Who knows Python and NLP?', 'Python, Natural Language Processing'),
+    ('Who knows Python and ML?', 'Python, Machine Learning'),
+    ('Who knows JS and React?', 'JavaScript, React'),
+]
+
+
+def generate_resume_lines(rng, size):
+    """Text lines of one synthetic resume"""
+    profile = SIZES[size]
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    skills = rng.sample(SKILLS, profile['skills'])
+
+    lines = [f"{first} {last}",
+             f"{first.lower()}.{last.lower()}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+             "Summary",
+             f"{rng.choice(TITLES)} with hands-on experience in {', '.join(skills[:4])}.",
+             "Experience"]
+
+    year = 2025
+    for _ in range(profile['jobs']):
+        length = rng.randint(1, 4)
+        gap = rng.choice([0, 0, 0, 1])  # occasional career gap
+        end_year, start_year = year, year - length
+        end = 'Present' if end_year == 2025 else f"{rng.choice(MONTHS)} {end_year}"
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)}  {rng.choice(MONTHS)} {start_year} - {end}")
+        for _ in range(profile['bullets']):
+            lines.append("- " + FILLER.format(skill=rng.choice(skills), n=rng.randint(2, 40)))
+        year = start_year - gap
+
+    lines += ["Education", f"{rng.choice(DEGREES)}, State University {year - 4} - {year}",
+              "Skills", ', '.join(skills),
+              "Projects", f"Built a {rng.choice(skills)} pipeline for analytics",
+              "Certifications", rng.choice(CERTIFICATIONS)]
+    return lines
+
+
+def generate_job_description(rng, size):
+    """Synthetic job description; larger sizes list more skills and duties"""
+    profile = SIZES[size]
+    skills = rng.sample(SKILLS, max(3, profile['skills'] // 2))
+    duties = [FILLER.format(skill=rng.choice(skills), n=rng.randint(2, 40)) for _ in range(profile['bullets'] * 2)]
+    return (f"We are hiring a {rng.choice(TITLES)}. Required skills: {', '.join(skills)}. "
+            f"{rng.randint(2, 8)}+ years of experience required. " + ' '.join(duties))
+
+
+def write_docx(path, lines):
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_pdf(path, lines, lines_per_page=55):
+    """Minimal text-only PDF (Helvetica) that PyPDF2 can extract; no extra dependency"""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in pages:
+        body = "BT /F1 10 Tf 50 790 Td 13 TL\n" + "".join(f"({_pdf_escape(line)}) Tj T*\n" for line in page) + "ET"
+        objects.append(f"<< /Length {len(body.encode('latin-1', 'replace'))} >>\nstream\n{body}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode('latin-1', 'replace')
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+def generate_corpus(directory, per_size, seed):
+    """Write per_size PDF and per_size DOCX resumes for every size; returns (resumes, jds)"""
+    rng = random.Random(seed)
+    resumes = []
+    for size in SIZES:
+        for i in range(per_size):
+            lines = generate_resume_lines(rng, size)
+            for ext, writer in (('pdf', write_pdf), ('docx', write_docx)):
+                path = os.path.join(directory, f"{size}_{i:02d}.{ext}")
+                writer(path, lines)
+                resumes.append({'path': path, 'size': size, 'format': ext})
+    jds = {size: generate_job_description(rng, size) for size in SIZES}
+    return resumes, jds
+
+
+# ============================================================
+# Offline mode
+# ============================================================
+
+class FakeEmbeddingModel:
+    """Deterministic stand-in for SentenceTransformer.encode (hash-seeded unit vectors)"""
+
+    dimensions = 384
+
+    def encode(self, texts, **kwargs):
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'little')
+            vector = np.random.default_rng(seed).standard_normal(self.dimensions).astype('float32')
+            vectors.append(vector / np.linalg.norm(vector))
+        return np.array(vectors)
+
+
+def use_fake_embeddings(*agents):
+    for agent in agents:
+        agent.model = FakeEmbeddingModel()
+        agent._model_loaded = True
+
+
+def warm_config_caches():
+    """Serve skills/variations/roles from the built-in fallback data (no MySQL round trips)"""
+    database_config._skills_cache = list(database_config.FALLBACK_SKILLS)
+    database_config._variations_cache = dict(database_config.FALLBACK_VARIATIONS)
+    database_config._roles_cache = dict(database_config.FALLBACK_ROLES)
+
+
+# ============================================================
+# Timing
+# ============================================================
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Millisecond statistics for one stage"""
+    ms = [s * 1000 for s in samples]
+    return {
+        'n': len(ms),
+        'mean_ms': round(statistics.mean(ms), 3),
+        'p50_ms': round(statistics.median(ms), 3),
+        'p95_ms': round(_percentile(ms, 95), 3),
+        'min_ms': round(min(ms), 3),
+        'max_ms': round(max(ms), 3),
+    }
+
+
+def time_call(samples, func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):  # agents print progress
+        start = time.perf_counter()
+        result = func(*args)
+        samples.append(time.perf_counter() - start)
+    return result
+
+
+def check_rag_aliases(real_model):
+    """Questions of RAG_ALIAS_CHECKS whose candidate is missing from the answer"""
+    rag_agent = RAGAgent()
+    if not real_model:
+        use_fake_embeddings(rag_agent)
+    failures = []
+    for question, skills in RAG_ALIAS_CHECKS:
+        candidates = [
+            {'id': 1, 'name': 'Alias Match', 'email': '', 'skills': skills, 'experience': '3 years',
+             'summary': skills, 'match_score': 0, 'skill_match_score': 0, 'experience_match_score': 0},
+            {'id': 2, 'name': 'No Match', 'email': '', 'skills': 'Python, Excel', 'experience': '3 years',
+             'summary': 'Python, Excel', 'match_score': 0, 'skill_match_score': 0, 'experience_match_score': 0},
+        ]
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = rag_agent.query(question, candidates)
+        if [c['name'] for c in result['candidates']] != ['Alias Match']:
+            failures.append(question)
+    return failures
+
+
+def run_benchmark(resumes, jds, repeat, real_model):
+    parser = ResumeParser()
+    detector = RedFlagDetector()
+    skills_agent = SkillsAssessmentAgent()
+    semantic_agent = SemanticMatchingAgent()
+    orchestrator = RankingOrchestratorAgent()
+    rag_agent = RAGAgent()
+    if not real_model:
+        use_fake_embeddings(semantic_agent, orchestrator.semantic_agent, rag_agent)
+
+    stages = {name: [] for name in ('parse_resume', 'extract_skills', 'skills_agent', 'semantic_agent',
+                                    'red_flags', 'orchestrator', 'rag_query')}
+
+    # Parse once up front: later stages take parsed data as input, as in the pipeline
+    with contextlib.redirect_stdout(io.StringIO()):
+        parsed = [parser.parse_resume(r['path']) for r in resumes]
+
+    # The RAG chat reads a snapshot version (inverted index included), as /api/rag/query does
+    snapshot = SnapshotVersion.from_rows([{
+        'id': i + 1,
+        'resume_id': i + 1,
+        'name': data['name'],
+        'email': data['email'],
+        'skills': data['skills'],
+        'experience_years': data['experience_years'],
+        'summary': data['raw_text'][:SUMMARY_CHARS],
+        'updated_at': None
+    } for i, data in enumerate(parsed)], {i + 1: data['raw_text'] for i, data in enumerate(parsed)})
+
+    def rag_query(question):
+        plan = rag_agent.plan_query(question, snapshot)
+        return rag_agent.query(question, snapshot.candidate_dicts(None, **plan['filters']), None, plan)
+
+    for iteration in range(repeat + 1):  # iteration 0 warms caches and lazy models, untimed
+        samples = stages if iteration else {name: [] for name in stages}
+        for resume, data in zip(resumes, parsed):
+            jd = jds[resume['size']]
+            skills = [s.strip() for s in data['skills'].split(',') if s.strip() and s.strip() != 'Not specified']
+
+            time_call(samples['parse_resume'], parser.parse_resume, resume['path'])
+            time_call(samples['extract_skills'], parser._extract_skills, data['raw_text'])
+            time_call(samples['skills_agent'], skills_agent.execute,
+                      {'resume_skills': skills, 'job_description': jd})
+            time_call(samples['semantic_agent'], semantic_agent.execute,
+                      {'resume_text': data['raw_text'], 'job_description': jd})
+            time_call(samples['red_flags'], detector.detect_all_flags, data, jd)
+            time_call(samples['orchestrator'], orchestrator.execute,
+                      {'file_path': resume['path'], 'job_description': jd, 'required_experience': 3})
+        for question in RAG_QUESTIONS:
+            time_call(samples['rag_query'], rag_query, question)
+
+    return {name: summarize(samples) for name, samples in stages.items()}
+
+
+def compare(results, baseline, threshold):
+    """Stages whose p50 grew by more than threshold (fraction) versus the baseline"""
+    regressions = []
+    for stage, current in results['stages'].items():
+        previous = baseline.get('stages', {}).get(stage)
+        if not previous or not previous['p50_ms']:
+            continue
+        change = current['p50_ms'] / previous['p50_ms'] - 1
+        current['baseline_p50_ms'] = previous['p50_ms']
+        current['change'] = round(change, 4)
+        if change > threshold:
+            regressions.append((stage, previous['p50_ms'], current['p50_ms'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the resume analysis pipeline")
+    parser.add_argument('--per-size', type=int, default=3, help="Resumes per size and format (default 3)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed passes over the corpus (default 5)")
+    parser.add_argument('--seed', type=int, default=42, help="Corpus seed (default 42)")
+    parser.add_argument('--output', default='benchmark_results.json', help="Results file")
+    parser.add_argument('--baseline', help="Baseline results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Allowed p50 slowdown per stage as a fraction (default 0.2 = 20%%)")
+    parser.add_argument('--save-baseline', help="Also write the results to this baseline file")
+    parser.add_argument('--corpus-dir', help="Keep the generated corpus in this directory")
+    parser.add_argument('--real-model', action='store_true', help="Use sentence-transformers embeddings")
+    parser.add_argument('--use-db', action='store_true', help="Load skills/variations from MySQL")
+    args = parser.parse_args()
+
+    logging.getLogger("agents").setLevel(logging.WARNING)
+    if not args.use_db:
+        warm_config_caches()
+
+    failures = check_rag_aliases(args.real_model)
+    if failures:
+        print(f"❌ RAG skill alias check failed for: {', '.join(failures)}")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.corpus_dir or tmp
+        os.makedirs(directory, exist_ok=True)
+        print(f"Generating corpus ({args.per_size} per size/format, seed {args.seed}) in {directory}...")
+        resumes, jds = generate_corpus(directory, args.per_size, args.seed)
+        print(f"Timing {len(resumes)} resumes x {args.repeat} passes...")
+        stages = run_benchmark(resumes, jds, args.repeat, args.real_model)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'per_size': args.per_size,
+            'repeat': args.repeat,
+            'resumes': len(resumes),
+            'embeddings': 'sentence-transformers' if args.real_model else 'fake',
+            'skill_config': 'database' if args.use_db else 'fallback',
+        },
+        'stages': stages
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    print(f"\n{'Stage':<16}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'n':>6}{'vs base':>10}")
+    for stage, stats in stages.items():
+        change = f"{stats['change']:+.1%}" if 'change' in stats else '-'
+        print(f"{stage:<16}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['mean_ms']:>10.3f}"
+              f"{stats['n']:>6}{change:>10}")
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {path}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} stage(s) slower than the baseline by more than {args.threshold:.0%}:")
+        for stage, before, after, change in regressions:
+            print(f"  {stage}: {before:.3f} ms -> {after:.3f} ms ({change:+.1%})")
+        return 1
+
+    if args.baseline:
+        print(f"\n✅ No stage regressed by more than {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
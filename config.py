@@ -16,3 +16,45 @@ class Config:
         'password': os.getenv('DB_PASSWORD', ''),
         'database': os.getenv('DB_NAME', 'resume_filter_db')
     }
+    
+    # Cascade scoring: skip AI semantic matching for candidates whose best possible
+    # overall score (semantic = 100) is still below the job's Medium Tier cutoff
+    CASCADE_SCORING = os.getenv('CASCADE_SCORING', 'false').lower() == 'true'
+    
+    # Batch matching (/api/match_candidates/batch): resumes per semantic forward pass
+    MATCH_BATCH_SIZE = int(os.getenv('MATCH_BATCH_SIZE', 16))
+    
+    # Codec of newly stored resume texts (resume_text table): zlib or none
+    RESUME_TEXT_CODEC = os.getenv('RESUME_TEXT_CODEC', 'zlib').lower()
+    
+    # RAG chat candidate snapshot: seconds between checks for changed rows (0 = every query)
+    RAG_SNAPSHOT_MAX_AGE = float(os.getenv('RAG_SNAPSHOT_MAX_AGE', 5))
+    # BM25 inverted index over skills and resume text, reloaded on start (empty = memory only)
+    RAG_INDEX_PATH = os.getenv('RAG_INDEX_PATH', 'indexes/rag_bm25.npz')
+    # Chat answers cached per question, job and snapshot version (size 0 disables)
+    RAG_CACHE_SIZE = int(os.getenv('RAG_CACHE_SIZE', 256))
+    RAG_CACHE_TTL = float(os.getenv('RAG_CACHE_TTL', 600))
+    # Question embeddings kept by the RAG agent (LRU)
+    RAG_EMBEDDING_CACHE_SIZE = int(os.getenv('RAG_EMBEDDING_CACHE_SIZE', 512))
+    
+    # Agent logging: level (DEBUG, INFO, WARNING, ERROR or OFF) and per-agent ring buffer size
+    AGENT_LOG_LEVEL = os.getenv('AGENT_LOG_LEVEL', 'INFO')
+    AGENT_LOG_BUFFER_SIZE = int(os.getenv('AGENT_LOG_BUFFER_SIZE', 500))
+    
+    # Agent execution telemetry (agent_executions table): rows per batched insert, max seconds between flushes
+    TELEMETRY_BATCH_SIZE = int(os.getenv('TELEMETRY_BATCH_SIZE', 50))
+    TELEMETRY_FLUSH_INTERVAL = float(os.getenv('TELEMETRY_FLUSH_INTERVAL', 30))
+    
+    # Opt-in profiling (X-Profile: 1 header or ?profile=1 on /upload and /api/match_candidate);
+    # off by default - any client could otherwise profile a request
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_STORE_SIZE = int(os.getenv('PROFILE_STORE_SIZE', 20))
+    PROFILE_FOLDER = 'profiles'
+    
+    # Red flag rule thresholds (re-flag stored candidates with POST /api/admin/reflag after changing)
+    RED_FLAG_MIN_POSITIONS = int(os.getenv('RED_FLAG_MIN_POSITIONS', 4))
+    RED_FLAG_SHORT_TENURE_YEARS = float(os.getenv('RED_FLAG_SHORT_TENURE_YEARS', 2.5))
+    RED_FLAG_VERY_SHORT_TENURE_YEARS = float(os.getenv('RED_FLAG_VERY_SHORT_TENURE_YEARS', 1.5))
+    RED_FLAG_GAP_MONTHS = int(os.getenv('RED_FLAG_GAP_MONTHS', 24))
+    RED_FLAG_LONG_GAP_MONTHS = int(os.getenv('RED_FLAG_LONG_GAP_MONTHS', 36))
+    RED_FLAG_EXPERIENCE_RATIO = float(os.getenv('RED_FLAG_EXPERIENCE_RATIO', 0.5))
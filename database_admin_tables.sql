@@ -82,6 +82,22 @@ CREATE TABLE IF NOT EXISTS role_skills (
         ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Candidate Skills Table (canonical skill ids of each candidate's resume, written on save)
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    candidate_id INT NOT NULL,
+    skill_id INT NOT NULL,
+    PRIMARY KEY (candidate_id, skill_id),
+    INDEX idx_skill_candidate (skill_id, candidate_id),
+    CONSTRAINT fk_candidateskill_candidate 
+        FOREIGN KEY (candidate_id) 
+        REFERENCES candidates(id) 
+        ON DELETE CASCADE,
+    CONSTRAINT fk_candidateskill_skill 
+        FOREIGN KEY (skill_id) 
+        REFERENCES skills(id) 
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- Insert skill categories
 INSERT INTO skill_categories (category_name, description, display_order, icon, color) VALUES
 ('Programming Languages', 'General purpose and scripting languages', 1, '💻', '#667eea'),
@@ -18,7 +18,14 @@ CREATE TABLE IF NOT EXISTS job_descriptions (
     description TEXT NOT NULL,
     required_skills TEXT,
     required_experience INT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    weight_semantic DECIMAL(5,4) NULL,
+    weight_keyword DECIMAL(5,4) NULL,
+    weight_skill DECIMAL(5,4) NULL,
+    weight_experience DECIMAL(5,4) NULL,
+    top_tier_threshold DECIMAL(5,2) NULL,
+    medium_tier_threshold DECIMAL(5,2) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_created_at (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Candidates table
@@ -28,7 +35,8 @@ CREATE TABLE IF NOT EXISTS candidates (
     email VARCHAR(255),
     phone VARCHAR(50),
     resume_path VARCHAR(500),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_created_at (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Resume Data table
@@ -42,14 +50,32 @@ CREATE TABLE IF NOT EXISTS resume_data (
     projects TEXT,
     certifications TEXT,
     job_titles TEXT,
-    raw_text TEXT,
+    employment_timeline JSON NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_candidate_id (candidate_id),
+    INDEX idx_updated_at (updated_at),
     CONSTRAINT fk_resume_candidate 
         FOREIGN KEY (candidate_id) 
         REFERENCES candidates(id) 
         ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Resume Text table
+-- Full resume text of each resume_data row, kept out of resume_data so listing joins
+-- don't read it (codec: 'none' or 'zlib', text_length: trimmed length in characters,
+-- summary: first 500 characters for the RAG chat listing)
+CREATE TABLE IF NOT EXISTS resume_text (
+    resume_id INT PRIMARY KEY,
+    codec VARCHAR(10) NOT NULL DEFAULT 'none',
+    text_length INT NOT NULL DEFAULT 0,
+    summary VARCHAR(500),
+    content LONGBLOB,
+    CONSTRAINT fk_text_resume 
+        FOREIGN KEY (resume_id) 
+        REFERENCES resume_data(id) 
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- Analysis Results table
 -- Stores AI-generated match scores and analysis for each candidate-job pair
 CREATE TABLE IF NOT EXISTS analysis_results (
@@ -61,13 +87,20 @@ CREATE TABLE IF NOT EXISTS analysis_results (
     experience_match_score FLOAT NOT NULL,
     keyword_match_score FLOAT NOT NULL,
     semantic_similarity_score FLOAT NOT NULL,
+    semantic_pruned BOOLEAN NOT NULL DEFAULT FALSE,
     tier VARCHAR(20) NOT NULL,
     red_flags TEXT,
     explanation TEXT,
     analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_candidate_id (candidate_id),
     INDEX idx_job_id (job_description_id),
     INDEX idx_match_score (match_score),
+    INDEX idx_tier (tier),
+    INDEX idx_analyzed_at (analyzed_at),
+    INDEX idx_job_score (job_description_id, match_score),
+    INDEX idx_updated_at (updated_at),
+    UNIQUE KEY uq_candidate_job (candidate_id, job_description_id),
     CONSTRAINT fk_analysis_candidate 
         FOREIGN KEY (candidate_id) 
         REFERENCES candidates(id) 
@@ -89,16 +122,46 @@ CREATE TABLE IF NOT EXISTS red_flags (
     detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     INDEX idx_candidate_id (candidate_id),
     INDEX idx_severity (severity),
+    INDEX idx_candidate_severity (candidate_id, severity),
     CONSTRAINT fk_redflag_candidate 
         FOREIGN KEY (candidate_id) 
         REFERENCES candidates(id) 
         ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Agent Executions table
+-- One row per pipeline stage of an orchestrator run, plus a 'Workflow' row with the
+-- end-to-end time and a 'DatabaseWrite' row with the time spent saving the results.
+-- Rows of one run share run_id (the correlation id of the agent logs).
+CREATE TABLE IF NOT EXISTS agent_executions (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    run_id VARCHAR(32) NOT NULL,
+    candidate_id INT NOT NULL,
+    job_description_id INT NULL,
+    pipeline VARCHAR(50) NOT NULL,
+    stage VARCHAR(100) NOT NULL,
+    duration_ms DECIMAL(10, 2) NOT NULL,
+    queue_wait_ms DECIMAL(10, 2) DEFAULT 0,
+    start_offset_ms DECIMAL(10, 2) DEFAULT 0,
+    executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_run_id (run_id),
+    INDEX idx_stage_executed (stage, executed_at),
+    INDEX idx_candidate_job (candidate_id, job_description_id),
+    CONSTRAINT fk_agent_exec_candidate
+        FOREIGN KEY (candidate_id)
+        REFERENCES candidates(id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_agent_exec_job
+        FOREIGN KEY (job_description_id)
+        REFERENCES job_descriptions(id)
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- Notes:
 -- 1. All tables use utf8mb4 character set to support emojis and special characters
 -- 2. All foreign keys have ON DELETE CASCADE to automatically clean up related data
 -- 3. Indexes added on frequently queried columns for better performance
+--    (existing databases: apply the files in migrations/ in order)
 -- 4. InnoDB engine ensures ACID compliance and foreign key support
 -- 5. IMPORTANT: Tables MUST be InnoDB (not MyISAM) for foreign keys to work
 
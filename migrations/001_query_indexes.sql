@@ -0,0 +1,55 @@
+-- Migration 001: Indexes for hot dashboard, listing and matching queries
+-- Apply once to an existing database:
+--   Get-Content migrations/001_query_indexes.sql | mysql -u root -p
+-- Fresh installs already get these indexes from database_schema.sql
+
+USE resume_filter_db;
+
+-- ============================================================
+-- analysis_results
+-- ============================================================
+
+-- Remove duplicate (candidate, job) analyses before adding the unique key.
+-- Keeps the most recent row (highest id) for every pair.
+DELETE older
+FROM analysis_results older
+JOIN analysis_results newer
+    ON older.candidate_id = newer.candidate_id
+   AND older.job_description_id = newer.job_description_id
+   AND older.id < newer.id;
+
+-- One analysis per candidate/job pair (enables INSERT ... ON DUPLICATE KEY UPDATE)
+ALTER TABLE analysis_results
+    ADD UNIQUE KEY uq_candidate_job (candidate_id, job_description_id);
+
+-- Dashboard tier counters
+ALTER TABLE analysis_results
+    ADD INDEX idx_tier (tier);
+
+-- Recent analyses / agent monitoring (ORDER BY analyzed_at DESC LIMIT n)
+ALTER TABLE analysis_results
+    ADD INDEX idx_analyzed_at (analyzed_at);
+
+-- Ranked candidate list for a job (WHERE job_description_id = ? ORDER BY match_score DESC)
+ALTER TABLE analysis_results
+    ADD INDEX idx_job_score (job_description_id, match_score);
+
+-- ============================================================
+-- candidates / job_descriptions
+-- ============================================================
+
+-- Candidate listings ordered by upload time
+ALTER TABLE candidates
+    ADD INDEX idx_created_at (created_at);
+
+-- Job dropdowns ordered by creation time
+ALTER TABLE job_descriptions
+    ADD INDEX idx_created_at (created_at);
+
+-- ============================================================
+-- red_flags
+-- ============================================================
+
+-- Per-candidate severity counters (COUNT(*) ... WHERE candidate_id = ? AND severity = ?)
+ALTER TABLE red_flags
+    ADD INDEX idx_candidate_severity (candidate_id, severity);
@@ -0,0 +1,34 @@
+-- Migration 002: Per-run, per-stage agent timings for the Agent Monitoring dashboard
+-- Apply once to an existing database:
+--   Get-Content migrations/002_agent_executions.sql | mysql -u root -p
+-- Fresh installs already get this table from database_schema.sql
+-- The dashboard percentiles use window functions (MySQL 8.0+)
+
+USE resume_filter_db;
+
+-- One row per pipeline stage of an orchestrator run, plus a 'Workflow' row with the
+-- end-to-end time and a 'DatabaseWrite' row with the time spent saving the results.
+-- Rows of one run share run_id (the correlation id of the agent logs).
+CREATE TABLE IF NOT EXISTS agent_executions (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    run_id VARCHAR(32) NOT NULL,
+    candidate_id INT NOT NULL,
+    job_description_id INT NULL,
+    pipeline VARCHAR(50) NOT NULL,
+    stage VARCHAR(100) NOT NULL,
+    duration_ms DECIMAL(10, 2) NOT NULL,
+    queue_wait_ms DECIMAL(10, 2) DEFAULT 0,
+    start_offset_ms DECIMAL(10, 2) DEFAULT 0,
+    executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_run_id (run_id),
+    INDEX idx_stage_executed (stage, executed_at),
+    INDEX idx_candidate_job (candidate_id, job_description_id),
+    CONSTRAINT fk_agent_exec_candidate
+        FOREIGN KEY (candidate_id)
+        REFERENCES candidates(id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_agent_exec_job
+        FOREIGN KEY (job_description_id)
+        REFERENCES job_descriptions(id)
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,12 @@
+-- Migration 003: Stored employment timeline for re-matching saved candidates
+-- Apply once to an existing database:
+--   Get-Content migrations/003_employment_timeline.sql | mysql -u root -p
+-- Fresh installs already get this column from database_schema.sql
+
+USE resume_filter_db;
+
+-- Positions and merged intervals (month precision) built once by the parser.
+-- Experience years, job hopping and career gap checks read it; rows saved before this
+-- migration stay NULL and are parsed from the resume file again on the next match.
+ALTER TABLE resume_data
+    ADD COLUMN employment_timeline JSON NULL AFTER raw_text;
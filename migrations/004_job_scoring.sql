@@ -0,0 +1,18 @@
+-- Migration 004: Per-job scoring weights and tier thresholds
+-- Apply once to an existing database:
+--   Get-Content migrations/004_job_scoring.sql | mysql -u root -p
+-- Fresh installs already get these columns from database_schema.sql
+
+USE resume_filter_db;
+
+-- NULL keeps the defaults of app/scoring.py (weights 0.30/0.25/0.30/0.15, tiers 75/50).
+-- Changing them re-scores the job's analysis_results from the stored component scores
+-- (PUT /api/jobs/<id>/scoring) without re-running any agent.
+ALTER TABLE job_descriptions
+    ADD COLUMN weight_semantic DECIMAL(5,4) NULL AFTER required_experience,
+    ADD COLUMN weight_keyword DECIMAL(5,4) NULL AFTER weight_semantic,
+    ADD COLUMN weight_skill DECIMAL(5,4) NULL AFTER weight_keyword,
+    ADD COLUMN weight_experience DECIMAL(5,4) NULL AFTER weight_skill,
+    ADD COLUMN top_tier_threshold DECIMAL(5,2) NULL AFTER weight_experience,
+    ADD COLUMN medium_tier_threshold DECIMAL(5,2) NULL AFTER top_tier_threshold;
+
@@ -0,0 +1,18 @@
+-- Migration 005: Change markers for the in-process RAG candidate snapshot
+-- Apply once to an existing database:
+--   Get-Content migrations/005_change_markers.sql | mysql -u root -p
+-- Fresh installs already get these columns from database_schema.sql
+
+USE resume_filter_db;
+
+-- updated_at moves on every insert and update (including re-scores, which keep
+-- analyzed_at). The RAG chat snapshot (app/candidate_snapshot.py) compares the latest
+-- updated_at and the row count of both tables and fetches only rows changed since
+-- its last refresh.
+ALTER TABLE resume_data
+    ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP AFTER employment_timeline,
+    ADD INDEX idx_updated_at (updated_at);
+
+ALTER TABLE analysis_results
+    ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP AFTER analyzed_at,
+    ADD INDEX idx_updated_at (updated_at);
@@ -0,0 +1,27 @@
+-- Migration 006: Normalized candidate skills
+-- Apply once to an existing database (after database_admin_tables.sql):
+--   Get-Content migrations/006_candidate_skills.sql | mysql -u root -p
+-- Fresh installs already get this table from database_admin_tables.sql
+-- Then fill it for the resumes stored before this migration:
+--   curl -X POST http://localhost:5000/api/admin/candidate_skills/backfill
+
+USE resume_filter_db;
+
+-- One row per (candidate, canonical skill of the admin skills table), written when a
+-- resume is saved. resume_data.skills stays the display string; skill lookups, per-skill
+-- counts and role matching join on these ids through either composite index instead of
+-- LIKE scans or splitting the comma-separated string in Python.
+CREATE TABLE IF NOT EXISTS candidate_skills (
+    candidate_id INT NOT NULL,
+    skill_id INT NOT NULL,
+    PRIMARY KEY (candidate_id, skill_id),
+    INDEX idx_skill_candidate (skill_id, candidate_id),
+    CONSTRAINT fk_candidateskill_candidate
+        FOREIGN KEY (candidate_id)
+        REFERENCES candidates(id)
+        ON DELETE CASCADE,
+    CONSTRAINT fk_candidateskill_skill
+        FOREIGN KEY (skill_id)
+        REFERENCES skills(id)
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
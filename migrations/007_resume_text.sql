@@ -0,0 +1,34 @@
+-- Migration 007: Move resume_data.raw_text to its own resume_text table
+-- Apply once to an existing database:
+--   Get-Content migrations/007_resume_text.sql | mysql -u root -p
+-- Fresh installs already get this table from database_schema.sql
+
+USE resume_filter_db;
+
+-- Listing queries join resume_data for skills and experience only; with the full text
+-- in a separate table they no longer read it. content holds the UTF-8 text encoded
+-- with codec ('none' or 'zlib', see app/resume_text.py); text_length is the trimmed
+-- length used by the red flag checks and summary the leading text the RAG chat lists.
+CREATE TABLE IF NOT EXISTS resume_text (
+    resume_id INT PRIMARY KEY,
+    codec VARCHAR(10) NOT NULL DEFAULT 'none',
+    text_length INT NOT NULL DEFAULT 0,
+    summary VARCHAR(500),
+    content LONGBLOB,
+    CONSTRAINT fk_text_resume
+        FOREIGN KEY (resume_id)
+        REFERENCES resume_data(id)
+        ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Existing texts are copied uncompressed; resumes saved from now on use RESUME_TEXT_CODEC.
+-- TRIM() strips spaces only: trim the same six characters as resume_text.WHITESPACE
+-- (space, tab, newline, carriage return, vertical tab, form feed)
+INSERT INTO resume_text (resume_id, codec, text_length, summary, content)
+SELECT id, 'none',
+       CHAR_LENGTH(REGEXP_REPLACE(raw_text, '^[ \\t\\n\\r\\x{0B}\\f]+|[ \\t\\n\\r\\x{0B}\\f]+$', '')),
+       LEFT(raw_text, 500), raw_text
+FROM resume_data
+WHERE raw_text IS NOT NULL;
+
+ALTER TABLE resume_data DROP COLUMN raw_text;
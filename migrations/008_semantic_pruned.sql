@@ -0,0 +1,13 @@
+-- Migration 008: Mark analyses whose semantic stage was skipped by cascade scoring
+-- Apply once to an existing database:
+--   Get-Content migrations/008_semantic_pruned.sql | mysql -u root -p
+-- Fresh installs already get this column from database_schema.sql
+
+USE resume_filter_db;
+
+-- A pruned analysis stores semantic_similarity_score = 0 because the candidate could
+-- not reach the job's Medium Tier cutoff at the time. Re-scoring the job (new weights
+-- or cutoffs) must not trust that 0, so these rows are re-matched instead of being
+-- recomputed from their stored components.
+ALTER TABLE analysis_results
+    ADD COLUMN semantic_pruned BOOLEAN NOT NULL DEFAULT FALSE AFTER semantic_similarity_score;